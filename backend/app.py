@@ -1,8 +1,12 @@
 from app_factory import create_app
 from extensions import socketio
+from utils.tts_cache import prewarm_tts_cache
+from utils.voice_assistant_manager import FALLBACK_PHRASES
 
 # Create the Flask app instance for Gunicorn
 app = create_app()
+# Only the web process answers voice queries; workers skip the prewarm.
+prewarm_tts_cache(app, FALLBACK_PHRASES)
 
 if __name__ == "__main__":
     socketio.run(app, debug=True)
@@ -1,5 +1,5 @@
 from dotenv import load_dotenv
-from flask import Flask
+from flask import Flask, g
 from flask_jwt_extended import JWTManager
 from flask_smorest import Api
 from flask_security import Security, SQLAlchemyUserDatastore, login_user
@@ -8,8 +8,18 @@ from flask_cors import CORS
 # Core models and DB
 from models import User, Role
 from utils.jwt_flask_security_bridge import load_user_from_jwt
+from utils.identity import resolve_user
 from utils.oauth_setup import init_oauth
 from utils.add_roles import add_core_roles
+from utils.schema_sync import (
+    add_missing_columns,
+    convert_text_uuids,
+    convert_uuids_command,
+    create_indexes_command,
+    text_uuids_present,
+)
+from utils.uploads import UploadRequest
+from utils.pagination import NEXT_CURSOR_HEADER
 
 from routes.auth import auth_blp
 from routes.oauth import oauth_blp
@@ -27,8 +37,10 @@ from routes.accessibility import accessibility_bp
 from routes.reports import reports_blp
 
 from routes.chat import chat_blp
+from routes.caregiver_chat import caregiver_chat_blp
 
 from config import Config
+from db.db_session import init_db_engine
 
 # Extensions
 from extensions import db, socketio, mail
@@ -39,6 +51,7 @@ load_dotenv()
 def create_app(config_class=None):
     """Application factory pattern"""
     app = Flask(__name__)
+    app.request_class = UploadRequest
 
     # Use provided config class or default to Config
     if config_class is None:
@@ -47,7 +60,7 @@ def create_app(config_class=None):
     app.config.from_object(config_class)
 
     # Initialize extensions
-    db.init_app(app)
+    init_db_engine(app, db)
     socketio.init_app(app)
     mail.init_app(app)
     jwt = JWTManager(app)
@@ -57,6 +70,7 @@ def create_app(config_class=None):
         origins="*",
         methods=["GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "Authorization"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     user_datastore = SQLAlchemyUserDatastore(db, User, Role)
@@ -81,21 +95,30 @@ def create_app(config_class=None):
     api.register_blueprint(reports_blp)
 
     api.register_blueprint(chat_blp)
+    api.register_blueprint(caregiver_chat_blp)
 
     with app.app_context():
         db.create_all()
+        add_missing_columns()
+        # Keys written before the switch to binary UUIDs cannot be read
+        # until they are converted.
+        if text_uuids_present():
+            convert_text_uuids()
         add_core_roles()
 
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
-        identity = jwt_data["sub"]
-        user = User.query.filter_by(user_id=identity).one_or_none()
+        # Reuses the user the before_request bridge already resolved and
+        # logged in, instead of loading it a second time.
+        user = resolve_user(jwt_data["sub"])
 
-        if user:
+        if user and g.get("_login_user") is not user:
             login_user(user)
         return user
 
     app.before_request(load_user_from_jwt)
+    app.cli.add_command(create_indexes_command)
+    app.cli.add_command(convert_uuids_command)
 
     @app.route("/")
     def hello_world():
@@ -21,6 +21,7 @@ def create_celery():
         timezone=Config.CELERY_TIMEZONE,
         enable_utc=Config.CELERY_ENABLE_UTC,
         beat_schedule=Config.CELERY_BEAT_SCHEDULE,
+        task_routes=Config.CELERY_TASK_ROUTES,
         task_track_started=True,
         task_time_limit=30 * 60,  # 30 minutes
         task_soft_time_limit=60,  # 1 minute
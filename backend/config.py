@@ -19,6 +19,27 @@ class Config:
         "SQLALCHEMY_DATABASE_URI",
         "sqlite:///" + os.path.join(instance_path, "senior_citizen.db"),
     )
+    # Database engine (db/db_session.py). SQLite connections use WAL with
+    # synchronous=NORMAL, a busy timeout and memory-mapped reads so the app,
+    # workers and beat sweeps can share the file; server databases use a
+    # pre-pinged connection pool of DB_POOL_SIZE + DB_MAX_OVERFLOW.
+    DB_SQLITE_WAL = os.environ.get("DB_SQLITE_WAL", "true").lower() in [
+        "true",
+        "on",
+        "1",
+    ]
+    DB_SQLITE_SYNCHRONOUS = os.environ.get("DB_SQLITE_SYNCHRONOUS", "NORMAL")
+    DB_SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("DB_SQLITE_BUSY_TIMEOUT_MS", 5000))
+    DB_SQLITE_MMAP_SIZE = int(os.environ.get("DB_SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_TIMEOUT_SECONDS = int(os.environ.get("DB_POOL_TIMEOUT_SECONDS", 30))
+    DB_POOL_RECYCLE_SECONDS = int(os.environ.get("DB_POOL_RECYCLE_SECONDS", 1800))
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in [
+        "true",
+        "on",
+        "1",
+    ]
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "your-very-secret-key")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)  # 24 hours
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -34,6 +55,19 @@ class Config:
     )
     FRONTEND_URL = os.environ.get("FRONTEND_URL", "http://localhost:5173")
     NEWSAPI_KEY = os.environ.get("NEWSAPI_KEY", "")
+    # News proxy cache; set NEWS_CACHE_REDIS_URL to share it across workers
+    NEWS_CACHE_TTL_SECONDS = int(os.environ.get("NEWS_CACHE_TTL_SECONDS", 300))
+    NEWS_CACHE_STALE_SECONDS = int(os.environ.get("NEWS_CACHE_STALE_SECONDS", 1800))
+    NEWS_CACHE_REDIS_URL = os.environ.get("NEWS_CACHE_REDIS_URL") or None
+    # Seconds a resolved user (roles and profile rows) may be reused across
+    # requests in this process; 0 keeps the cache per-request only.
+    IDENTITY_CACHE_TTL = int(os.environ.get("IDENTITY_CACHE_TTL", 0))
+    # Caregiver -> assigned seniors map used by authorization checks; set
+    # ASSIGNMENT_CACHE_REDIS_URL to share it (and its invalidation) across workers.
+    ASSIGNMENT_CACHE_TTL_SECONDS = int(
+        os.environ.get("ASSIGNMENT_CACHE_TTL_SECONDS", 300)
+    )
+    ASSIGNMENT_CACHE_REDIS_URL = os.environ.get("ASSIGNMENT_CACHE_REDIS_URL") or None
     BASE_URL = os.environ.get("BASE_URL", "http://localhost:5001")
     API_SPEC_OPTIONS = {
         "servers": [{"url": BASE_URL}],
@@ -59,6 +93,10 @@ class Config:
     CELERY_TIMEZONE = "UTC"
     CELERY_ENABLE_UTC = True
     CELERY_BEAT_SCHEDULE = {
+        "dispatch-due-reminders-every-15-seconds": {
+            "task": "tasks.dispatch_due_reminders",
+            "schedule": 15.0,
+        },
         "check-missed-medications-every-30-seconds": {
             "task": "tasks.check_missed_medications",
             "schedule": 30.0,
@@ -67,11 +105,98 @@ class Config:
             "task": "tasks.send_daily_news_update",
             "schedule": crontab(hour=9, minute=0),
         },
-        "check-missed-appointments-every-hour": {
+        "check-missed-appointments-every-30-seconds": {
             "task": "tasks.check_missed_appointments",
             "schedule": 30.0,
         },
+        "dispatch-sms-outbox-every-5-seconds": {
+            "task": "tasks.dispatch_outbox",
+            "schedule": 5.0,
+            "args": ("sms",),
+        },
+        "dispatch-email-outbox-every-5-seconds": {
+            "task": "tasks.dispatch_outbox",
+            "schedule": 5.0,
+            "args": ("email",),
+        },
+        "extend-medication-schedules-every-hour": {
+            "task": "tasks.extend_medication_schedules",
+            "schedule": 3600.0,
+        },
+        "fail-stalled-reports-every-10-minutes": {
+            "task": "tasks.fail_stalled_reports",
+            "schedule": 600.0,
+        },
+        "prune-dispatched-reminders-every-night": {
+            "task": "tasks.prune_dispatched_reminders",
+            "schedule": crontab(hour=3, minute=0),
+        },
+        "prune-outbox-every-night": {
+            "task": "tasks.prune_outbox",
+            "schedule": crontab(hour=3, minute=30),
+        },
     }
+    # Outbox drains run on their own queue so slow providers never hold up
+    # the sweeps; start a worker with `-Q celery,notifications` (or a
+    # dedicated `-Q notifications` worker) to consume it.
+    CELERY_TASK_ROUTES = {"tasks.dispatch_outbox": {"queue": "notifications"}}
+    # Reminder scheduler: due rows claimed per batch, and how long a claim may
+    # stay unfinished before another tick is allowed to take it over.
+    REMINDER_DISPATCH_BATCH_SIZE = int(
+        os.environ.get("REMINDER_DISPATCH_BATCH_SIZE", 500)
+    )
+    REMINDER_CLAIM_TIMEOUT_SECONDS = int(
+        os.environ.get("REMINDER_CLAIM_TIMEOUT_SECONDS", 300)
+    )
+    # Days dispatched reminders are kept (by due time) before the nightly
+    # prune deletes them.
+    REMINDER_RETENTION_DAYS = int(os.environ.get("REMINDER_RETENTION_DAYS", 30))
+    # Missed-medication sweep: overdue doses processed per bulk UPDATE batch.
+    MISSED_MEDICATION_BATCH_SIZE = int(
+        os.environ.get("MISSED_MEDICATION_BATCH_SIZE", 1000)
+    )
+    # Recurring medication schedules: how far ahead dose rows are created
+    # (the hourly beat task keeps extending it), and the most doses one
+    # schedule may add in a single expansion.
+    MEDICATION_SCHEDULE_HORIZON_DAYS = int(
+        os.environ.get("MEDICATION_SCHEDULE_HORIZON_DAYS", 14)
+    )
+    MEDICATION_SCHEDULE_MAX_DOSES = int(
+        os.environ.get("MEDICATION_SCHEDULE_MAX_DOSES", 500)
+    )
+    # Missed-appointment sweep: rows per batch, and how far behind the stored
+    # watermark each run re-checks to catch appointments written late.
+    MISSED_APPOINTMENT_BATCH_SIZE = int(
+        os.environ.get("MISSED_APPOINTMENT_BATCH_SIZE", 500)
+    )
+    MISSED_APPOINTMENT_LOOKBACK_SECONDS = int(
+        os.environ.get("MISSED_APPOINTMENT_LOOKBACK_SECONDS", 300)
+    )
+    # Emergency alert fan-out: concurrent deliveries, the time budget for a
+    # single delivery attempt, and how many times a failed delivery is retried.
+    EMERGENCY_ALERT_MAX_WORKERS = int(os.environ.get("EMERGENCY_ALERT_MAX_WORKERS", 8))
+    EMERGENCY_DELIVERY_TIMEOUT_SECONDS = float(
+        os.environ.get("EMERGENCY_DELIVERY_TIMEOUT_SECONDS", 10)
+    )
+    EMERGENCY_DELIVERY_RETRIES = int(os.environ.get("EMERGENCY_DELIVERY_RETRIES", 2))
+    # Notification outbox: rows claimed per batch, per-channel send rate
+    # (messages/second), retry policy, and how long one drain may run.
+    OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", 100))
+    OUTBOX_RATE_LIMITS = {
+        "sms": float(os.environ.get("OUTBOX_SMS_PER_SECOND", 10)),
+        "email": float(os.environ.get("OUTBOX_EMAIL_PER_SECOND", 20)),
+    }
+    OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", 5))
+    OUTBOX_RETRY_BACKOFF_SECONDS = int(
+        os.environ.get("OUTBOX_RETRY_BACKOFF_SECONDS", 30)
+    )
+    OUTBOX_CLAIM_TIMEOUT_SECONDS = int(
+        os.environ.get("OUTBOX_CLAIM_TIMEOUT_SECONDS", 300)
+    )
+    OUTBOX_DRAIN_MAX_SECONDS = int(os.environ.get("OUTBOX_DRAIN_MAX_SECONDS", 50))
+    # Days sent and failed outbox rows are kept before the nightly prune
+    # deletes them; their dedupe keys stop blocking duplicates after that.
+    OUTBOX_RETENTION_DAYS = int(os.environ.get("OUTBOX_RETENTION_DAYS", 30))
     MAIL_SERVER = os.environ.get("MAIL_SERVER")
     MAIL_PORT = int(os.environ.get("MAIL_PORT", 587))
     MAIL_USE_TLS = os.environ.get("MAIL_USE_TLS", "true").lower() in ["true", "on", "1"]
@@ -80,7 +205,88 @@ class Config:
     MAIL_DEFAULT_SENDER = os.environ.get(
         "MAIL_DEFAULT_SENDER", os.environ.get("MAIL_USERNAME")
     )
-    UPLOAD_FOLDER = os.environ.get("UPLOAD_FOLDER", "static/uploads")
+    # SMTP socket timeout, so a stalled mail server fails the send instead of
+    # holding the worker.
+    MAIL_TIMEOUT_SECONDS = float(os.environ.get("MAIL_TIMEOUT_SECONDS", 10))
+    # Every upload folder hangs off one root next to the app's static files,
+    # so the web and Celery workers resolve the same paths wherever they are
+    # started from.
+    UPLOAD_FOLDER = os.environ.get(
+        "UPLOAD_FOLDER", os.path.join(basedir, "static", "uploads")
+    )
+    # Uploads are streamed here while the request is read, then renamed into
+    # place; keep it on the same volume as the upload folders.
+    UPLOAD_TMP_FOLDER = os.environ.get(
+        "UPLOAD_TMP_FOLDER", os.path.join(UPLOAD_FOLDER, ".incoming")
+    )
+    UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", 25 * 1024 * 1024))
+    # Uploaded reports; must be reachable by both the web and Celery workers.
+    REPORT_UPLOAD_FOLDER = os.environ.get(
+        "REPORT_UPLOAD_FOLDER", os.path.join(UPLOAD_FOLDER, "reports")
+    )
+    # Concurrent page OCR jobs per report; unset uses one per CPU core.
+    OCR_MAX_WORKERS = int(os.environ.get("OCR_MAX_WORKERS", 0)) or None
+    # Report chat retrieval: chunk size/overlap in words and chunks sent per
+    # question.
+    REPORT_CHUNK_WORDS = int(os.environ.get("REPORT_CHUNK_WORDS", 150))
+    REPORT_CHUNK_OVERLAP_WORDS = int(os.environ.get("REPORT_CHUNK_OVERLAP_WORDS", 30))
+    REPORT_CHAT_TOP_K = int(os.environ.get("REPORT_CHAT_TOP_K", 4))
+    # Streaming: how often the worker saves a partial summary, and how often
+    # and for how long GET /api/reports/<id>/stream checks for more.
+    REPORT_SUMMARY_FLUSH_SECONDS = float(
+        os.environ.get("REPORT_SUMMARY_FLUSH_SECONDS", 0.5)
+    )
+    REPORT_STREAM_POLL_SECONDS = float(
+        os.environ.get("REPORT_STREAM_POLL_SECONDS", 0.5)
+    )
+    REPORT_STREAM_TIMEOUT_SECONDS = int(
+        os.environ.get("REPORT_STREAM_TIMEOUT_SECONDS", 300)
+    )
+    # Chat sessions: once more than MAX unsummarised messages pile up, all but
+    # the RECENT newest are folded into the session's running summary.
+    CHAT_SESSION_MAX_MESSAGES = int(os.environ.get("CHAT_SESSION_MAX_MESSAGES", 12))
+    CHAT_SESSION_RECENT_MESSAGES = int(
+        os.environ.get("CHAT_SESSION_RECENT_MESSAGES", 6)
+    )
+    # Caregiver chat / voice queries whose local rule match is at least this
+    # confident skip the LLM intent call.
+    INTENT_RULE_MIN_CONFIDENCE = float(
+        os.environ.get("INTENT_RULE_MIN_CONFIDENCE", 0.75)
+    )
+    # Every this many classifications, log how many the rules answered
+    # without the LLM (per process; 0 turns the log line off).
+    INTENT_METRICS_LOG_EVERY = int(os.environ.get("INTENT_METRICS_LOG_EVERY", 500))
+    # Seconds a senior's assistant context snapshot is reused; changes made in
+    # this process clear it sooner. Set SENIOR_CONTEXT_CACHE_REDIS_URL to share
+    # it (and its invalidation) across workers, so the Celery sweeps' updates
+    # show up at once rather than after the TTL.
+    SENIOR_CONTEXT_CACHE_TTL_SECONDS = int(
+        os.environ.get("SENIOR_CONTEXT_CACHE_TTL_SECONDS", 30)
+    )
+    SENIOR_CONTEXT_CACHE_REDIS_URL = (
+        os.environ.get("SENIOR_CONTEXT_CACHE_REDIS_URL") or None
+    )
+    # How far ahead the snapshot lists appointments and medications, so a
+    # long-running recurring schedule does not grow every snapshot. The next
+    # appointment and medication are found however far ahead they are.
+    SENIOR_CONTEXT_HORIZON_DAYS = int(os.environ.get("SENIOR_CONTEXT_HORIZON_DAYS", 31))
+    # Voice assistant speech: "google" or the offline "stub" backend. Audio is
+    # cached by text, voice and encoding in memory and under TTS_CACHE_FOLDER
+    # (unset to keep it in memory only). The backend is created on first use;
+    # TTS_PREWARM synthesizes the fixed fallback answers when the web process
+    # (app.py) starts.
+    TTS_BACKEND = os.environ.get("TTS_BACKEND", "google")
+    TTS_VOICE_NAME = os.environ.get("TTS_VOICE_NAME", "en-US-Wavenet-D")
+    TTS_LANGUAGE_CODE = os.environ.get("TTS_LANGUAGE_CODE", "en-US")
+    TTS_AUDIO_ENCODING = os.environ.get("TTS_AUDIO_ENCODING", "MP3")
+    TTS_CACHE_FOLDER = os.environ.get("TTS_CACHE_FOLDER", "instance/tts_cache")
+    TTS_CACHE_MAX_ENTRIES = int(os.environ.get("TTS_CACHE_MAX_ENTRIES", 256))
+    TTS_PREWARM = os.environ.get("TTS_PREWARM", "true").lower() in ["true", "on", "1"]
+    # List endpoints: page size when a ?cursor= comes without ?limit=, and
+    # the most a client may ask for in one page. Requests with neither are
+    # not paginated.
+    PAGINATION_DEFAULT_LIMIT = int(os.environ.get("PAGINATION_DEFAULT_LIMIT", 100))
+    PAGINATION_MAX_LIMIT = int(os.environ.get("PAGINATION_MAX_LIMIT", 500))
 
     # Sample ENV configuration for Flask-Mail
     # MAIL_SERVER = "smtp.gmail.com"
@@ -1,10 +1,87 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, scoped_session
-from models import Base
-
-engine = create_engine(
-    "sqlite:///senior_citizen.db", connect_args={"check_same_thread": False}
-)
-Base.metadata.bind = engine
-Base.metadata.create_all(engine)
-Session = scoped_session(sessionmaker(bind=engine))
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+
+
+def _is_sqlite(uri):
+    return make_url(uri).get_backend_name() == "sqlite"
+
+
+def engine_options(uri, config):
+    """
+    create_engine() keyword arguments for uri under the DB_* settings in
+    config. Server databases get a tuned, pre-pinged connection pool; SQLite
+    gets cross-thread connections and a busy timeout, its other settings
+    being applied per connection by sqlite_pragmas().
+    """
+    if _is_sqlite(uri):
+        return {
+            "connect_args": {
+                "check_same_thread": False,
+                "timeout": config.get("DB_SQLITE_BUSY_TIMEOUT_MS", 5000) / 1000,
+            }
+        }
+
+    return {
+        "pool_size": config.get("DB_POOL_SIZE", 10),
+        "max_overflow": config.get("DB_MAX_OVERFLOW", 20),
+        "pool_timeout": config.get("DB_POOL_TIMEOUT_SECONDS", 30),
+        "pool_recycle": config.get("DB_POOL_RECYCLE_SECONDS", 1800),
+        "pool_pre_ping": config.get("DB_POOL_PRE_PING", True),
+    }
+
+
+def sqlite_pragmas(config):
+    """The PRAGMA statements run on every new SQLite connection."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(config.get('DB_SQLITE_BUSY_TIMEOUT_MS', 5000))}"
+    ]
+    if config.get("DB_SQLITE_WAL", True):
+        # WAL lets readers proceed while one writer commits, so the web app,
+        # workers and beat sweeps stop blocking each other on the file.
+        pragmas.append("PRAGMA journal_mode = WAL")
+    pragmas.append(
+        f"PRAGMA synchronous = {config.get('DB_SQLITE_SYNCHRONOUS', 'NORMAL')}"
+    )
+    pragmas.append(f"PRAGMA mmap_size = {int(config.get('DB_SQLITE_MMAP_SIZE', 0))}")
+    return pragmas
+
+
+def configure_engine(engine, config):
+    """Applies the per-connection settings for config to engine."""
+    if engine.dialect.name != "sqlite":
+        return engine
+
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
+
+
+def create_db_engine(uri, config):
+    """An engine for uri configured like the app's, for code outside Flask."""
+    return configure_engine(create_engine(uri, **engine_options(uri, config)), config)
+
+
+def init_db_engine(app, db):
+    """
+    Makes the app's SQLAlchemy engine follow the DB_* settings: fills in
+    SQLALCHEMY_ENGINE_OPTIONS (explicit options win) before db.init_app and
+    installs the connection pragmas on the engine it creates. The web app
+    and Celery workers both go through create_app, so they share this setup.
+    """
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **engine_options(uri, app.config),
+        **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+    }
+    db.init_app(app)
+    with app.app_context():
+        configure_engine(db.engine, app.config)
@@ -0,0 +1,87 @@
+import os
+import time
+import uuid
+
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+
+def uuid7():
+    """
+    A time-ordered UUID (RFC 9562 version 7): 48 bits of Unix milliseconds
+    followed by random bits. Keys created one after another land next to
+    each other in an index instead of at random pages.
+    """
+    milliseconds = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (milliseconds & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | (rand >> 62 & 0xFFF) << 64
+        | 0b10 << 62
+        | rand & 0x3FFF_FFFF_FFFF_FFFF
+    )
+    return uuid.UUID(int=value)
+
+
+def new_id():
+    """Default for primary keys: a new UUIDv7 as a canonical string."""
+    return str(uuid7())
+
+
+def as_uuid(value):
+    """value as a uuid.UUID, or None if it is not a UUID."""
+    if isinstance(value, uuid.UUID):
+        return value
+    if isinstance(value, (bytes, memoryview)):
+        value = bytes(value)
+        return uuid.UUID(bytes=value) if len(value) == 16 else None
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+class _UUIDBytes(LargeBinary):
+    """16-byte column whose raw values are left for BinaryUUID to convert."""
+
+    def result_processor(self, dialect, coltype):
+        return None
+
+
+class BinaryUUID(TypeDecorator):
+    """
+    A UUID key stored compactly: the native uuid type on PostgreSQL and 16
+    raw bytes elsewhere, instead of 36 characters of text.
+
+    Python sees canonical lowercase strings both ways, so ids in routes,
+    JWT identities and schemas are unchanged; uuid.UUID objects are
+    accepted as well. A value that is not a UUID is bound as NULL, so
+    looking up a malformed id finds nothing rather than failing. UUIDs
+    still stored as text (see utils.schema_sync.convert_text_uuids) read
+    back the same as converted ones.
+    """
+
+    impl = _UUIDBytes(16)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        if dialect.name in ("mysql", "mariadb"):
+            return dialect.type_descriptor(mysql.BINARY(16))
+        return dialect.type_descriptor(_UUIDBytes(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        value = as_uuid(value)
+        if value is None or dialect.name == "postgresql":
+            return value
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        value = as_uuid(value)
+        return str(value) if value is not None else None
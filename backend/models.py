@@ -1,10 +1,10 @@
 from flask_security import UserMixin, RoleMixin
 import enum
 import secrets
-import uuid
 from datetime import datetime, timezone
 from sqlalchemy.orm import relationship
 
+from db.types import BinaryUUID, new_id
 from extensions import db
 
 
@@ -15,8 +15,8 @@ class AlertType(enum.Enum):
 
 roles_users = db.Table(
     "roles_users",
-    db.Column("user_id", db.String(36), db.ForeignKey("user.user_id")),
-    db.Column("role_id", db.String(36), db.ForeignKey("role.id")),
+    db.Column("user_id", BinaryUUID, db.ForeignKey("user.user_id")),
+    db.Column("role_id", BinaryUUID, db.ForeignKey("role.id")),
 )
 
 
@@ -28,7 +28,7 @@ class ReferenceType(enum.Enum):
 
 class Role(db.Model, RoleMixin):
     __tablename__ = "role"
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     name = db.Column(db.String(80), unique=True)
     description = db.Column(db.String(255))
     users = db.relationship("User", secondary=roles_users, back_populates="roles")
@@ -36,9 +36,7 @@ class Role(db.Model, RoleMixin):
 
 class User(db.Model, UserMixin):
     __tablename__ = "user"
-    user_id = db.Column(
-        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    user_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     username = db.Column(db.String(255), unique=True, nullable=False)
     email = db.Column(db.String(255), unique=True, nullable=True)
     password = db.Column(db.String(255), nullable=False)
@@ -86,7 +84,7 @@ class User(db.Model, UserMixin):
 class SeniorCitizen(db.Model):
     __tablename__ = "seniorcitizen"
     user_id = db.Column(
-        db.String(36),
+        BinaryUUID,
         db.ForeignKey("user.user_id", ondelete="CASCADE"),
         primary_key=True,
     )
@@ -119,7 +117,7 @@ class SeniorCitizen(db.Model):
 class Caregiver(db.Model):
     __tablename__ = "caregiver"
     user_id = db.Column(
-        db.String(36),
+        BinaryUUID,
         db.ForeignKey("user.user_id", ondelete="CASCADE"),
         primary_key=True,
     )
@@ -133,62 +131,145 @@ class Caregiver(db.Model):
 class CaregiverAssignment(db.Model):
     __tablename__ = "caregiver_assignment"
     caregiver_id = db.Column(
-        db.String(36),
+        BinaryUUID,
         db.ForeignKey("caregiver.user_id", ondelete="CASCADE"),
         primary_key=True,
     )
     senior_id = db.Column(
-        db.String(36),
+        BinaryUUID,
         db.ForeignKey("seniorcitizen.user_id", ondelete="CASCADE"),
         primary_key=True,
     )
+    # Orders a caregiver's seniors by when they were assigned; rows from
+    # before this column existed are NULL and sort first.
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
     caregiver = relationship("Caregiver", back_populates="assignments")
     senior = relationship("SeniorCitizen", back_populates="caregiver_assignments")
 
+    __table_args__ = (
+        # The primary key leads with caregiver_id; lookups by senior need this
+        db.Index("ix_caregiver_assignment_senior_id", "senior_id"),
+    )
+
 
 class Appointment(db.Model):
     __tablename__ = "appointment"
-    appointment_id = db.Column(
-        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    appointment_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     title = db.Column(db.String)
     date_time = db.Column(db.DateTime)
     location = db.Column(db.String)
     reminder_time = db.Column(db.DateTime, nullable=True)
     senior_id = db.Column(
-        db.String(36), db.ForeignKey("seniorcitizen.user_id", ondelete="CASCADE")
+        BinaryUUID, db.ForeignKey("seniorcitizen.user_id", ondelete="CASCADE")
     )
     reminder_task_id = db.Column(db.String(36), nullable=True)
     status = db.Column(db.String(50), default="Scheduled", nullable=False)
+    updated_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
 
     senior = relationship("SeniorCitizen", back_populates="appointments")
 
+    __table_args__ = (
+        # Covers the missed-appointment sweep: status = ? AND date_time range
+        db.Index("ix_appointment_status_date_time", "status", "date_time"),
+        # Covers per-senior lists and upcoming/this-month lookups
+        db.Index("ix_appointment_senior_id_date_time", "senior_id", "date_time"),
+        # Covers the missed-appointment sweep's pass over late writes
+        db.Index("ix_appointment_status_updated_at", "status", "updated_at"),
+    )
+
+
+class MedicationSchedule(db.Model):
+    """A recurring medication, expanded into Medication dose rows.
+
+    Doses are only materialised up to a rolling horizon; ``expanded_until``
+    records how far, and the beat task extends it as time passes.
+    """
+
+    __tablename__ = "medication_schedule"
+    schedule_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
+    name = db.Column(db.String, nullable=False)
+    dosage = db.Column(db.String, nullable=False)
+    rrule = db.Column(db.String(500), nullable=False)
+    dtstart = db.Column(db.DateTime, nullable=False)  # Naive UTC
+    expanded_until = db.Column(db.DateTime, nullable=False)  # Naive UTC
+    active = db.Column(db.Boolean, nullable=False, default=True)
+    senior_id = db.Column(
+        BinaryUUID,
+        db.ForeignKey("seniorcitizen.user_id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    doses = relationship("Medication", back_populates="schedule", passive_deletes=True)
+
+    __table_args__ = (
+        # Covers the horizon sweep, which looks for active schedules that
+        # have not been expanded far enough yet.
+        db.Index(
+            "ix_medication_schedule_active_expanded_until", "active", "expanded_until"
+        ),
+    )
+
 
 class Medication(db.Model):
     __tablename__ = "medication"
-    medication_id = db.Column(
-        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    medication_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     name = db.Column(db.String)
     dosage = db.Column(db.String)
     time = db.Column(db.DateTime)
     isTaken = db.Column(db.Boolean, default=False)
     missed_counted = db.Column(db.Boolean, default=False)
     senior_id = db.Column(
-        db.String(36), db.ForeignKey("seniorcitizen.user_id", ondelete="CASCADE")
+        BinaryUUID, db.ForeignKey("seniorcitizen.user_id", ondelete="CASCADE")
     )
 
     reminder_task_id = db.Column(db.String(36), nullable=True)
+    updated_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    # Set on doses generated from a recurring schedule
+    schedule_id = db.Column(
+        BinaryUUID,
+        # Stopped schedules can be deleted; their past doses stay as history
+        db.ForeignKey("medication_schedule.schedule_id", ondelete="SET NULL"),
+        nullable=True,
+        index=True,
+    )
 
     senior = relationship("SeniorCitizen", back_populates="medications")
+    schedule = relationship("MedicationSchedule", back_populates="doses")
+
+    __table_args__ = (
+        # Covers per-senior lists and next/past-week lookups
+        db.Index("ix_medication_senior_id_time", "senior_id", "time"),
+    )
+
+
+# Covers the missed-medication sweep, which seeks the overdue range
+# (time <= cutoff) and reads it in time order. Only doses that are neither
+# taken nor counted as missed yet are indexed, so the index stays small and
+# upcoming doses beyond the cutoff are never visited.
+db.Index(
+    "ix_medication_pending_time_senior_id",
+    Medication.time,
+    Medication.senior_id,
+    sqlite_where=Medication.isTaken.is_(False) & Medication.missed_counted.is_(False),
+    postgresql_where=Medication.isTaken.is_(False)
+    & Medication.missed_counted.is_(False),
+)
 
 
 class EmergencyContact(db.Model):
     __tablename__ = "emergency_contact"
-    contact_id = db.Column(
-        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    contact_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     name = db.Column(db.String)
     relation = db.Column(db.String)
     phone = db.Column(db.String)
@@ -196,7 +277,12 @@ class EmergencyContact(db.Model):
     email = db.Column(db.String)
 
     senior_id = db.Column(
-        db.String(36), db.ForeignKey("user.user_id", ondelete="CASCADE")
+        BinaryUUID, db.ForeignKey("user.user_id", ondelete="CASCADE"), index=True
+    )
+    updated_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
     )
 
     senior = relationship("User", back_populates="emergency_contacts")
@@ -204,9 +290,7 @@ class EmergencyContact(db.Model):
 
 class Feedback(db.Model):
     __tablename__ = "news"
-    news_id = db.Column(
-        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    news_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     api_article_id = db.Column(db.String)
     title = db.Column(db.String)
     description = db.Column(db.Text)
@@ -219,7 +303,7 @@ class Feedback(db.Model):
 class ServiceProvider(db.Model):
     __tablename__ = "service_provider"
     user_id = db.Column(
-        db.String(36),
+        BinaryUUID,
         db.ForeignKey("user.user_id", ondelete="CASCADE"),
         primary_key=True,
     )
@@ -227,6 +311,11 @@ class ServiceProvider(db.Model):
     contact_email = db.Column(db.String, nullable=True)
     phone_number = db.Column(db.String)
     services_offered = db.Column(db.String)
+    updated_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
     user = relationship("User", back_populates="service_provider")
     events = relationship(
         "Event", back_populates="service_provider", cascade="all, delete-orphan"
@@ -235,17 +324,20 @@ class ServiceProvider(db.Model):
 
 class Event(db.Model):
     __tablename__ = "event"
-    event_id = db.Column(
-        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    event_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     name = db.Column(db.String)
-    date_time = db.Column(db.DateTime(timezone=True))
+    date_time = db.Column(db.DateTime(timezone=True), index=True)
     location = db.Column(db.String)
     description = db.Column(db.Text)
     service_provider_id = db.Column(
-        db.String(36),
+        BinaryUUID,
         db.ForeignKey("service_provider.user_id", ondelete="CASCADE"),
     )
+    updated_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
 
     service_provider = relationship("ServiceProvider", back_populates="events")
     attendance = relationship(
@@ -256,12 +348,12 @@ class Event(db.Model):
 class EventAttendance(db.Model):
     __tablename__ = "event_attendance"
     senior_id = db.Column(
-        db.String(36),
+        BinaryUUID,
         db.ForeignKey("seniorcitizen.user_id", ondelete="CASCADE"),
         primary_key=True,
     )
     event_id = db.Column(
-        db.String(36),
+        BinaryUUID,
         db.ForeignKey("event.event_id", ondelete="CASCADE"),
         primary_key=True,
     )
@@ -276,11 +368,9 @@ class EventAttendance(db.Model):
 
 class Alert(db.Model):
     __tablename__ = "alert"
-    alert_id = db.Column(
-        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    alert_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     recipient_user_id = db.Column(
-        db.String(36), db.ForeignKey("user.user_id", ondelete="CASCADE")
+        BinaryUUID, db.ForeignKey("user.user_id", ondelete="CASCADE"), index=True
     )
     alert_type = db.Column(db.Enum(AlertType))
     message = db.Column(db.Text)
@@ -294,17 +384,18 @@ class Alert(db.Model):
 
 class Report(db.Model):
     __tablename__ = "report"
-    report_id = db.Column(
-        db.String(36), primary_key=True, default=lambda: str(uuid.uuid4())
-    )
+    report_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
     original_filename = db.Column(db.String, nullable=False)
     stored_filename = db.Column(db.String, nullable=False, unique=True)
+    content_hash = db.Column(db.String(64), nullable=True, index=True)  # SHA-256
     extracted_text = db.Column(db.Text, nullable=True)
     summary = db.Column(db.Text, nullable=True)
     status = db.Column(db.String, nullable=False, default="processing")
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     senior_id = db.Column(
-        db.String(36), db.ForeignKey("seniorcitizen.user_id", ondelete="CASCADE")
+        BinaryUUID,
+        db.ForeignKey("seniorcitizen.user_id", ondelete="CASCADE"),
+        index=True,
     )
 
     senior = relationship("SeniorCitizen", back_populates="reports")
@@ -314,3 +405,151 @@ class Report(db.Model):
 SeniorCitizen.reports = relationship(
     "Report", back_populates="senior", cascade="all, delete-orphan"
 )
+
+
+class ExtractedTextCache(db.Model):
+    """Text extracted from an uploaded file, keyed by the file's SHA-256."""
+
+    __tablename__ = "extracted_text_cache"
+    content_hash = db.Column(db.String(64), primary_key=True)
+    extracted_text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class SummaryCache(db.Model):
+    """An analyze_report() result, keyed by the text's SHA-256 and prompt version."""
+
+    __tablename__ = "summary_cache"
+    text_hash = db.Column(db.String(64), primary_key=True)
+    prompt_version = db.Column(db.String(20), primary_key=True)
+    summary = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class ReportIndex(db.Model):
+    """A report text's BM25 chunk index (utils.report_index), keyed by the text's SHA-256."""
+
+    __tablename__ = "report_index"
+    text_hash = db.Column(db.String(64), primary_key=True)
+    index = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+
+class ChatSession(db.Model):
+    """
+    A user's conversation about one report. Turns up to ``summarized_seq``
+    have been folded into ``summary``; only later turns are sent verbatim.
+    """
+
+    __tablename__ = "chat_session"
+    session_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
+    report_id = db.Column(
+        BinaryUUID,
+        db.ForeignKey("report.report_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    user_id = db.Column(
+        BinaryUUID, db.ForeignKey("user.user_id", ondelete="CASCADE"), nullable=False
+    )
+    summary = db.Column(db.Text, nullable=True)
+    summarized_seq = db.Column(db.Integer, nullable=False, default=0)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    turns = relationship(
+        "ChatTurn", back_populates="session", cascade="all, delete-orphan"
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint("report_id", "user_id", name="uq_chat_session_report_user"),
+    )
+
+
+class ChatTurn(db.Model):
+    """One message of a ChatSession; role is "user" or "model"."""
+
+    __tablename__ = "chat_turn"
+    session_id = db.Column(
+        BinaryUUID,
+        db.ForeignKey("chat_session.session_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    seq = db.Column(db.Integer, primary_key=True)
+    role = db.Column(db.String(10), nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    session = relationship("ChatSession", back_populates="turns")
+
+
+class ScheduledReminder(db.Model):
+    """A future reminder waiting to be dispatched by the beat scheduler.
+
+    Rows are keyed by ``dedupe_key`` so rescheduling a reminder is an update
+    of ``due_at`` rather than a new broker message plus a revoke broadcast.
+    """
+
+    __tablename__ = "scheduled_reminder"
+    reminder_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
+    dedupe_key = db.Column(db.String(255), unique=True, nullable=False)
+    task_name = db.Column(db.String(255), nullable=False)
+    task_args = db.Column(db.JSON, nullable=False, default=list)
+    reference_type = db.Column(db.Enum(ReferenceType), nullable=True)
+    reference_id = db.Column(db.String(36), nullable=True)
+    due_at = db.Column(db.DateTime, nullable=False)  # Naive UTC
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    claim_token = db.Column(db.String(36), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        db.Index("ix_scheduled_reminder_status_due_at", "status", "due_at"),
+        db.Index("ix_scheduled_reminder_reference", "reference_type", "reference_id"),
+    )
+
+
+class SweepWatermark(db.Model):
+    """High-water mark of a periodic sweep, so each run only scans new rows."""
+
+    __tablename__ = "sweep_watermark"
+    name = db.Column(db.String(100), primary_key=True)
+    watermark = db.Column(db.DateTime, nullable=False)  # Naive UTC
+    updated_at = db.Column(
+        db.DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+
+class NotificationOutbox(db.Model):
+    """An SMS or email waiting to be delivered by the outbox dispatcher.
+
+    Producers insert rows in the same transaction as the state change that
+    caused them; ``dedupe_key`` makes re-running a producer a no-op.
+    """
+
+    __tablename__ = "notification_outbox"
+    outbox_id = db.Column(BinaryUUID, primary_key=True, default=new_id)
+    dedupe_key = db.Column(db.String(255), unique=True, nullable=False)
+    channel = db.Column(db.String(10), nullable=False)  # "sms" or "email"
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=True)
+    body = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    claim_token = db.Column(db.String(36), nullable=True)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False)  # Naive UTC
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index(
+            "ix_notification_outbox_channel_status_next",
+            "channel",
+            "status",
+            "next_attempt_at",
+        ),
+    )
@@ -3,12 +3,20 @@ from flask.views import MethodView
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_security import roles_accepted
 from flask import request
-from models import Appointment, db, User, CaregiverAssignment
+from models import Appointment, db, User, ReferenceType
 import pytz
 
-import uuid
+from db.types import new_id
 from tasks import send_reminder_notification
-from celery_app import celery_app
+from utils.identity import resolve_user
+from utils.authorization import assigned_senior_ids, is_assigned
+from utils.pagination import PageArgsSchema, paginated_response
+from utils.reminder_scheduler import (
+    schedule_reminder,
+    cancel_reminder,
+    cancel_reminders_for,
+    has_pending_reminder,
+)
 from schemas.appointments import (
     AppointmentSchema,
     AppointmentResponseSchema,
@@ -24,10 +32,39 @@ appointments_blp = Blueprint(
 )
 
 
+def reminder_key(appointment_id):
+    return f"appointment:{appointment_id}"
+
+
+def schedule_appointment_reminder(appt, senior_user):
+    """Registers (or moves) the reminder row for an appointment."""
+    local_tz = pytz.timezone("Asia/Kolkata")
+    date_time = appt.date_time
+    if date_time.tzinfo is None:
+        date_time = pytz.utc.localize(date_time)
+
+    schedule_reminder(
+        reminder_key(appt.appointment_id),
+        send_reminder_notification.name,
+        [
+            str(appt.appointment_id),
+            appt.title,
+            appt.location,
+            # Pass the local ISO format for display purposes
+            date_time.astimezone(local_tz).isoformat(),
+            senior_user.email,
+        ],
+        appt.reminder_time,
+        reference_type=ReferenceType.appointment,
+        reference_id=str(appt.appointment_id),
+        assume_tz=local_tz,
+    )
+
+
 class AppointmentUtils:
     @staticmethod
     def get_senior_id(user_id, requested_senior_id=None):
-        user = User.query.get(user_id)
+        user = resolve_user(user_id)
         if user.roles[0].name == "senior_citizen":
             # If a specific senior's resource is requested, ensure the
             # logged-in senior is that same person.
@@ -38,21 +75,15 @@ class AppointmentUtils:
         elif user.caregiver:
             # If specific senior_id is requested, validate caregiver has access
             if requested_senior_id:
-                assignment = CaregiverAssignment.query.filter_by(
-                    caregiver_id=str(user.user_id), senior_id=str(requested_senior_id)
-                ).first()
-
-                if assignment:
+                if is_assigned(user.user_id, requested_senior_id):
                     return requested_senior_id
                 else:
                     abort(403, message="You are not assigned to this senior citizen.")
 
             # If no specific senior requested, return first assigned senior (backward compatibility)
-            assignments = CaregiverAssignment.query.filter_by(
-                caregiver_id=user.user_id
-            ).all()
-            if assignments:
-                return assignments[0].senior_id
+            senior_ids = assigned_senior_ids(user.user_id)
+            if senior_ids:
+                return senior_ids[0]
             else:
                 abort(404, message="Caregiver is not assigned to any senior citizen.")
         abort(404, message="Senior citizen not found.")
@@ -62,18 +93,25 @@ class AppointmentUtils:
 class AppointmentListResource(MethodView):
     @jwt_required()
     @roles_accepted("senior_citizen", "caregiver")
+    @appointments_blp.arguments(PageArgsSchema, location="query", as_kwargs=True)
     @appointments_blp.response(200, AppointmentResponseSchema(many=True))
     @appointments_blp.doc(
         summary="Get information about all the appointments of the specified or logged in senior citizen."
     )
-    def get(self):
+    def get(self, **page_args):
         user_id = get_jwt_identity()
         # Get senior_id from query parameter if provided
         requested_senior_id = request.args.get("senior_id")
         senior_id = AppointmentUtils.get_senior_id(user_id, requested_senior_id)
         # Convert to string for SQLite compatibility
-        appointments = Appointment.query.filter_by(senior_id=str(senior_id)).all()
-        return appointments
+        return paginated_response(
+            Appointment.query.filter_by(senior_id=str(senior_id)),
+            page_args,
+            AppointmentResponseSchema,
+            key_column=Appointment.appointment_id,
+            sort_column=Appointment.date_time,
+            updated_column=Appointment.updated_at,
+        )
 
     @jwt_required()
     @roles_accepted("caregiver", "senior_citizen")
@@ -96,7 +134,7 @@ class AppointmentListResource(MethodView):
             aware_date_time = local_tz.localize(data["date_time"])
 
             appointment = Appointment(
-                appointment_id=str(uuid.uuid4()),
+                appointment_id=new_id(),
                 title=data["title"],
                 # Convert the aware local time to UTC before saving to the DB
                 date_time=aware_date_time.astimezone(pytz.utc),
@@ -106,20 +144,7 @@ class AppointmentListResource(MethodView):
             )
 
             if appointment.reminder_time:
-                # This part for the reminder remains the same
-                aware_reminder_time = local_tz.localize(appointment.reminder_time)
-                task = send_reminder_notification.apply_async(
-                    args=[
-                        str(appointment.appointment_id),
-                        appointment.title,
-                        appointment.location,
-                        # Pass the original ISO format for display purposes
-                        aware_date_time.isoformat(),
-                        senior_user.email,
-                    ],
-                    eta=aware_reminder_time,
-                )
-                appointment.reminder_task_id = task.id
+                schedule_appointment_reminder(appointment, senior_user)
 
             db.session.add(appointment)
             db.session.commit()
@@ -209,32 +234,20 @@ class AppointmentDetailResource(MethodView):
                 )
                 db.session.add(senior_user.senior_citizen)
 
-        if appt.reminder_task_id:
-            celery_app.control.revoke(appt.reminder_task_id)
-            appt.reminder_task_id = None
-
-        if "reminder_time" in data and data["reminder_time"] is not None:
-            appt.reminder_time = data["reminder_time"]
+        if "reminder_time" in data:
+            reminder_dt = data["reminder_time"]
+            if reminder_dt is not None and reminder_dt.tzinfo is not None:
+                # Stored as naive local time, the same as on create
+                reminder_dt = reminder_dt.astimezone(local_tz).replace(tzinfo=None)
+            appt.reminder_time = reminder_dt
+
+        key = reminder_key(appt.appointment_id)
+        if appt.reminder_time is None:
+            cancel_reminder(key)
+        elif "reminder_time" in data or has_pending_reminder(key):
+            # Moving the reminder (or refreshing its message) is a row update.
             senior_user = User.query.get(str(appt.senior_id))
-
-            reminder_dt = appt.reminder_time
-            if reminder_dt.tzinfo is None:
-                # If naive, localize it
-                aware_reminder_time = local_tz.localize(reminder_dt)
-            else:
-                aware_reminder_time = reminder_dt
-
-            task = send_reminder_notification.apply_async(
-                args=[
-                    str(appt.appointment_id),
-                    appt.title,
-                    appt.location,
-                    appt.date_time.isoformat(),
-                    senior_user.email,
-                ],
-                eta=aware_reminder_time,
-            )
-            appt.reminder_task_id = task.id
+            schedule_appointment_reminder(appt, senior_user)
 
         db.session.add(appt)
         db.session.commit()
@@ -282,13 +295,13 @@ class AppointmentDetailResource(MethodView):
                         0, senior_user.senior_citizen.appointments_missed - 1
                     )
 
-                if appt.reminder_task_id:
-                    celery_app.control.revoke(appt.reminder_task_id)
-                    appt.reminder_task_id = None
+                cancel_reminders_for(ReferenceType.appointment, appt.appointment_id)
 
                 db.session.add(senior_user.senior_citizen)
             else:
                 appt.status = new_status
+                if new_status == "Cancelled":
+                    cancel_reminders_for(ReferenceType.appointment, appt.appointment_id)
 
         db.session.add(appt)
         db.session.commit()
@@ -313,8 +326,7 @@ class AppointmentDetailResource(MethodView):
         except PermissionError:
             abort(403, message="You are not authorized to delete this appointment.")
 
-        if appt.reminder_task_id:
-            celery_app.control.revoke(appt.reminder_task_id)
+        cancel_reminders_for(ReferenceType.appointment, appt.appointment_id)
 
         db.session.delete(appt)
         db.session.commit()
@@ -4,6 +4,7 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_security import roles_accepted
 from marshmallow import Schema, fields
 from models import db, CaregiverAssignment, Caregiver, SeniorCitizen, User
+from utils.authorization import assigned_senior_ids, invalidate_assignments
 
 assignment_bp = Blueprint(
     "Assignment",
@@ -73,6 +74,9 @@ class AssignCaregiverAPI(MethodView):
         assignment = CaregiverAssignment(caregiver_id=caregiver_id, senior_id=senior_id)
         db.session.add(assignment)
         db.session.commit()
+        # The flush already invalidated the cache; repeat after commit so a
+        # reader that refilled it in between cannot keep the old senior set.
+        invalidate_assignments(caregiver_id)
         return {"message": "Caregiver assigned to senior."}, 201
 
 
@@ -86,13 +90,11 @@ class MySeniorsAPI(MethodView):
     )
     @assignment_bp.response(200, SeniorSchema(many=True))
     def get(self):
-        caregiver_id = get_jwt_identity()
-        assignments = CaregiverAssignment.query.filter_by(
-            caregiver_id=caregiver_id
-        ).all()
-        seniors = []
-        for assignment in assignments:
-            senior_user = User.query.get(assignment.senior_id)
-            if senior_user:
-                seniors.append(senior_user)
-        return seniors
+        senior_ids = assigned_senior_ids(get_jwt_identity())
+        if not senior_ids:
+            return []
+        seniors = {
+            str(user.user_id): user
+            for user in User.query.filter(User.user_id.in_(senior_ids))
+        }
+        return [seniors[sid] for sid in map(str, senior_ids) if sid in seniors]
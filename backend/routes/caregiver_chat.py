@@ -1,8 +1,11 @@
 from flask import request, jsonify
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
-from flask_jwt_extended import jwt_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
 
+from utils.action_resolver import resolve_actions
+from utils.ai_manager import KNOWN_INTENTS
+from utils.authorization import is_assigned
 from utils.caregiver_chat_manager import process_caregiver_query
 
 caregiver_chat_blp = Blueprint(
@@ -18,6 +21,9 @@ class CaregiverChat(MethodView):
     @jwt_required()
     def post(self, senior_id):
         """Send a message to the caregiver chatbot for a specific senior."""
+        if not is_assigned(get_jwt_identity(), senior_id):
+            abort(403, message="You are not assigned to this senior citizen.")
+
         json_data = request.get_json()
         query_text = json_data.get("message")
 
@@ -27,3 +33,25 @@ class CaregiverChat(MethodView):
         response_text = process_caregiver_query(query_text, senior_id)
 
         return jsonify({"response": response_text}), 200
+
+
+@caregiver_chat_blp.route("/<string:senior_id>/summary")
+class CaregiverChatSummary(MethodView):
+    @jwt_required()
+    def post(self, senior_id):
+        """Answer several intents about a specific senior in one call."""
+        if not is_assigned(get_jwt_identity(), senior_id):
+            abort(403, message="You are not assigned to this senior citizen.")
+
+        json_data = request.get_json()
+        intents = json_data.get("intents")
+
+        if not isinstance(intents, list) or not intents:
+            abort(400, message="'intents' must be a non-empty list.")
+        unknown = [intent for intent in intents if intent not in KNOWN_INTENTS]
+        if unknown:
+            abort(400, message=f"Unknown intents: {', '.join(map(str, unknown))}.")
+
+        answers = resolve_actions(intents, senior_id)
+
+        return jsonify({"answers": answers}), 200
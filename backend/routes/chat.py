@@ -1,10 +1,22 @@
 from flask import request, jsonify
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
-from flask_jwt_extended import jwt_required
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 
-from models import Report
-from utils.ai_manager import chat_with_report
+from models import ChatSession, db
+from routes.reports import get_viewable_report
+from tasks import compact_chat_session
+from utils.ai_manager import chat_with_report, stream_chat_with_report
+from utils.chat_sessions import (
+    all_turns,
+    append_exchange,
+    context_turns,
+    get_or_create_session,
+    needs_compaction,
+)
+from utils.report_index import relevant_chunks
+from utils.sse import sse_event, sse_response
 
 chat_blp = Blueprint(
     "chat",
@@ -14,29 +26,160 @@ chat_blp = Blueprint(
 )
 
 
+CONFLICT_MESSAGE = "The conversation changed meanwhile. Please retry."
+
+
+def prepare_question(report_id):
+    """
+    Validates a chat request and gathers what the model is sent: returns
+    (session, question, report excerpts, unsummarised history).
+    """
+    json_data = request.get_json()
+    user_question = json_data.get("message")
+
+    if not user_question:
+        abort(400, message="'message' is a required field.")
+
+    report = get_viewable_report(report_id)
+
+    if not report.extracted_text:
+        abort(
+            422,
+            message="Cannot chat about this report as its text could not be extracted.",
+        )
+
+    user_id = get_jwt_identity()
+    requested_session = json_data.get("session_id")
+    if requested_session:
+        session = ChatSession.query.filter_by(session_id=requested_session).first()
+        if session is None or session.report_id != report.report_id:
+            abort(404, message="Chat session not found.")
+        # A session is only ever continued by the user who started it, even
+        # when others (e.g. an assigned caregiver) may view the same report.
+        if str(session.user_id) != str(user_id):
+            abort(403, message="You are not allowed to continue this conversation.")
+    else:
+        session = get_or_create_session(report.report_id, user_id)
+
+    # Older turns are only sent as the session's running summary.
+    history = context_turns(session)
+
+    # Only the chunks relevant to the question are sent, so the cost of a
+    # question does not grow with the length of the report. The previous
+    # question is included so follow-ups retrieve the same passages.
+    previous = next((t["text"] for t in reversed(history) if t["role"] == "user"), "")
+    excerpts = relevant_chunks(
+        report.extracted_text, f"{previous} {user_question}".strip()
+    )
+    return session, user_question, excerpts, history
+
+
+def record_exchange(session, question, answer):
+    """
+    Stores an answered question, queueing compaction once the session grows
+    too long. Returns False if a concurrent question got there first.
+    """
+    append_exchange(session, question, answer)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+    if needs_compaction(session):
+        try:
+            compact_chat_session.delay(session.session_id)
+        except Exception as e:
+            # Compaction is retried after the next question.
+            print(f"Could not queue chat compaction: {e}")
+    return True
+
+
 @chat_blp.route("/<string:report_id>")
 class Chat(MethodView):
+    @jwt_required()
+    @chat_blp.doc(
+        summary="Get the conversation about a specific medical report",
+        description="This endpoint returns the current user's conversation about a report: its session_id and every message exchanged so far, oldest first. The session_id is null if the user has not asked about the report yet.",
+    )
+    def get(self, report_id):
+        """Get the current user's conversation about a report."""
+        get_viewable_report(report_id)
+        session = ChatSession.query.filter_by(
+            report_id=report_id, user_id=get_jwt_identity()
+        ).first()
+        messages = (
+            [{"role": t.role, "text": t.text} for t in all_turns(session)]
+            if session
+            else []
+        )
+        return (
+            jsonify(
+                {
+                    "session_id": session.session_id if session else None,
+                    "messages": messages,
+                }
+            ),
+            200,
+        )
+
     @jwt_required()
     @chat_blp.doc(
         summary="Chat with a specific medical report",
-        description="This endpoint enables users to send a message to the chatbot for a specific medical report. By providing a report ID and a user question, the system leverages AI to analyze the report's content and generate a relevant, context-aware response. This interactive feature makes it easier for users to engage with their health documents and extract meaningful information.",
+        description="This endpoint enables users to send a message to the chatbot for a specific medical report. By providing a report ID and a user question, the system retrieves the most relevant passages of the report and leverages AI to analyze the report's content and generate a relevant, context-aware response. The conversation is kept on the server per report and user, so follow-up questions can refer to earlier answers; the response includes its session_id, which may be sent back as 'session_id' to make sure the expected conversation is continued. This interactive feature makes it easier for users to engage with their health documents and extract meaningful information.",
     )
     def post(self, report_id):
         """Send a message to the chatbot for a specific report."""
-        json_data = request.get_json()
-        user_question = json_data.get("message")
+        session, user_question, excerpts, history = prepare_question(report_id)
+        ai_response = chat_with_report(
+            excerpts, user_question, history, session.summary
+        )
 
-        if not user_question:
-            abort(400, message="'message' is a required field.")
+        if not ai_response.startswith("Error"):
+            if not record_exchange(session, user_question, ai_response):
+                abort(409, message=CONFLICT_MESSAGE)
 
-        report = Report.query.get_or_404(report_id)
+        return (
+            jsonify({"response": ai_response, "session_id": session.session_id}),
+            200,
+        )
 
-        if not report.extracted_text:
-            abort(
-                422,
-                message="Cannot chat about this report as its text could not be extracted.",
-            )
 
-        ai_response = chat_with_report(report.extracted_text, user_question)
+@chat_blp.route("/<string:report_id>/stream")
+class ChatStream(MethodView):
+    @jwt_required()
+    @chat_blp.doc(
+        summary="Chat with a specific medical report, streaming the answer",
+        description="This endpoint takes the same request as POST /api/chat/<report_id> but answers with a Server-Sent Events stream, so the reply can be shown while the AI is still writing it. A 'session' event carries {session_id}, each 'answer' event carries the next piece of the reply as {delta}, and a final 'done' event carries the full {response, session_id}. If the reply cannot be generated an 'error' event carrying {message} ends the stream and nothing is added to the conversation.",
+    )
+    def post(self, report_id):
+        """Send a message to the chatbot for a specific report and stream the answer."""
+        session, user_question, excerpts, history = prepare_question(report_id)
+        conversation_summary = session.summary
+
+        def events():
+            yield sse_event({"session_id": session.session_id}, event="session")
+            pieces = []
+            try:
+                for piece in stream_chat_with_report(
+                    excerpts, user_question, history, conversation_summary
+                ):
+                    pieces.append(piece)
+                    yield sse_event({"delta": piece}, event="answer")
+            except Exception as e:
+                print(f"Error streaming chat answer: {e}")
+                yield sse_event(
+                    {"message": "Sorry, the answer could not be generated."},
+                    event="error",
+                )
+                return
+
+            answer = "".join(pieces)
+            if not record_exchange(session, user_question, answer):
+                yield sse_event({"message": CONFLICT_MESSAGE}, event="error")
+                return
+            yield sse_event(
+                {"response": answer, "session_id": session.session_id}, event="done"
+            )
 
-        return jsonify({"response": ai_response}), 200
+        return sse_response(events())
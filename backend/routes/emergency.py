@@ -2,7 +2,7 @@ from flask_smorest import Blueprint, abort
 from flask.views import MethodView
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from tasks import send_emergency_alert
-from models import User
+from utils.identity import resolve_user
 from marshmallow import Schema, fields
 from flask import request
 
@@ -30,7 +30,7 @@ class EmergencyTrigger(MethodView):
     @emergency_blp.response(200, description="Emergency alert triggered successfully")
     def post(self):
         user_id = get_jwt_identity()
-        senior = User.query.get(user_id)
+        senior = resolve_user(user_id)
 
         if not senior or "senior_citizen" not in [role.name for role in senior.roles]:
             abort(403, message="Only senior citizens can trigger emergency alerts.")
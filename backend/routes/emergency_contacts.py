@@ -2,7 +2,7 @@ from flask_smorest import Blueprint, abort
 from flask.views import MethodView
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask import request
-from models import EmergencyContact, db, User, CaregiverAssignment
+from models import EmergencyContact, db
 
 from schemas.emergency_contact import (
     EmergencyContactSchema,
@@ -10,6 +10,9 @@ from schemas.emergency_contact import (
     EmergencyContactAddResponseSchema,
 )
 from flask_security import roles_accepted
+from utils.identity import resolve_user
+from utils.authorization import is_assigned
+from utils.pagination import PageArgsSchema, paginated_response
 
 emergency_contacts_blp = Blueprint(
     "Emergency Contacts",
@@ -23,7 +26,7 @@ emergency_contacts_blp = Blueprint(
 class EmergencyContactsResource(MethodView):
     @staticmethod
     def get_senior_id_from_user(user_id):
-        user = User.query.get(user_id)
+        user = resolve_user(user_id)
         user_roles = [role.name for role in user.roles]
 
         if "senior_citizen" in user_roles:
@@ -40,13 +43,7 @@ class EmergencyContactsResource(MethodView):
 
             # Verify that the logged-in caregiver (user.user_id) is linked to the
             # senior they are trying to access (senior_id).
-            is_authorized = (
-                db.session.query(CaregiverAssignment)
-                .filter_by(caregiver_id=user.user_id, senior_id=senior_id)
-                .first()
-            )
-
-            if not is_authorized:
+            if not is_assigned(user.user_id, senior_id):
                 abort(
                     403, message="You are not authorized to access this senior's data."
                 )
@@ -60,17 +57,21 @@ class EmergencyContactsResource(MethodView):
     @emergency_contacts_blp.doc(
         summary="Get all emergency contacts of the logged in senior citizen"
     )
+    @emergency_contacts_blp.arguments(PageArgsSchema, location="query", as_kwargs=True)
     @emergency_contacts_blp.response(200, EmergencyContactResponseSchema(many=True))
-    def get(self):
+    def get(self, **page_args):
         user_id = get_jwt_identity()
         senior_id = self.get_senior_id_from_user(user_id)
 
         session = db.session
         try:
-            contacts = (
-                session.query(EmergencyContact).filter_by(senior_id=senior_id).all()
+            return paginated_response(
+                session.query(EmergencyContact).filter_by(senior_id=senior_id),
+                page_args,
+                EmergencyContactResponseSchema,
+                key_column=EmergencyContact.contact_id,
+                updated_column=EmergencyContact.updated_at,
             )
-            return contacts
         finally:
             session.close()
 
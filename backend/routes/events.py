@@ -2,13 +2,23 @@ from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_security import roles_accepted
-from models import db, Event, EventAttendance, User
+from models import db, Event, EventAttendance, User, ReferenceType
 from marshmallow import Schema, fields
-from tasks import send_event_reminder, celery_app
+from tasks import send_event_reminder
+from utils.reminder_scheduler import (
+    schedule_reminder,
+    cancel_reminder,
+    cancel_reminders_for,
+)
+from utils.pagination import PageArgsSchema, paginated_response
 from datetime import datetime
 import pytz
 
 
+def reminder_key(event_id, senior_id):
+    return f"event:{event_id}:{senior_id}"
+
+
 class EventSchema(Schema):
     event_id = fields.Str(dump_only=True)
     name = fields.Str(required=True)
@@ -17,6 +27,7 @@ class EventSchema(Schema):
     location = fields.Str(required=True)
     description = fields.Str()
     service_provider_id = fields.Str()
+    updated_at = fields.DateTime(dump_only=True)
 
     class Meta:
         unknown = "exclude"
@@ -49,10 +60,17 @@ class EventList(MethodView):
         summary="Get a list of all events.",
         description="This endpoint returns a list of all events that have been created by service providers. This allows senior citizens to browse and discover new activities to participate in.",
     )
+    @events_bp.arguments(PageArgsSchema, location="query", as_kwargs=True)
     @events_bp.response(200, EventSchema(many=True))
-    def get(self):
-        events = Event.query.all()
-        return events
+    def get(self, **page_args):
+        return paginated_response(
+            Event.query,
+            page_args,
+            EventSchema,
+            key_column=Event.event_id,
+            sort_column=Event.date_time,
+            updated_column=Event.updated_at,
+        )
 
     @events_bp.doc(
         summary="Create a new event.",
@@ -102,6 +120,7 @@ class EventResource(MethodView):
     @events_bp.response(204)
     def delete(self, event_id):
         event = Event.query.get_or_404(event_id)
+        cancel_reminders_for(ReferenceType.event, event.event_id)
         db.session.delete(event)
         db.session.commit()
 
@@ -139,7 +158,6 @@ class EventJoin(MethodView):
         # Create attendance
         attendance = EventAttendance(senior_id=senior_id, event_id=event_id)
         db.session.add(attendance)
-        db.session.commit()
 
         # --- SIMPLIFIED SCHEDULING ---
         now_utc = datetime.now(pytz.UTC)
@@ -156,8 +174,6 @@ class EventJoin(MethodView):
         print(f"DEBUG - Event time UTC from DB: {event_time_utc}")
 
         if event_time_utc > now_utc:
-            delay_seconds = (event_time_utc - now_utc).total_seconds()
-
             # For the task, we can still format it nicely for the user message.
             ist_tz = pytz.timezone("Asia/Kolkata")
             event_time_ist_display = event_time_utc.astimezone(ist_tz)
@@ -169,17 +185,18 @@ class EventJoin(MethodView):
                 event_time_ist_display.isoformat(),  # Pass IST string for display
             ]
 
-            print(f"DEBUG - Scheduling reminder in {delay_seconds:.2f} seconds")
-            result = send_event_reminder.apply_async(
-                args=task_args, countdown=delay_seconds
+            schedule_reminder(
+                reminder_key(event_id, senior_id),
+                send_event_reminder.name,
+                task_args,
+                event_time_utc,
+                reference_type=ReferenceType.event,
+                reference_id=str(event_id),
             )
-            print(f"DEBUG - Task scheduled with ID: {result.id}")
-            # --- SAVE THE TASK ID ---
-            attendance.reminder_task_id = result.id
+            print(f"DEBUG - Reminder scheduled for {event_time_utc}")
         else:
             print("DEBUG - Event is in the past, not scheduling reminder")
-        # Now add the attendance record (with the task_id if applicable) and commit
-        db.session.add(attendance)
+        # Commit the attendance and its reminder row together
         db.session.commit()
 
         return {"message": "Successfully joined event and reminder scheduled"}, 200
@@ -227,16 +244,8 @@ class EventUnjoin(MethodView):
         if not attendance:
             abort(404, message="You are not attending this event.")
 
-        # --- REVOKE THE CELERY TASK ---
-        if attendance.reminder_task_id:
-            try:
-                celery_app.control.revoke(attendance.reminder_task_id)
-                print(f"DEBUG - Revoked Celery task: {attendance.reminder_task_id}")
-            except Exception as e:
-                # Log the error but don't block the unjoin process
-                print(
-                    f"ERROR - Could not revoke Celery task {attendance.reminder_task_id}: {e}"
-                )
+        # --- CANCEL THE REMINDER ---
+        cancel_reminder(reminder_key(event_id, senior_id))
 
         # Now delete the attendance record from the database
         db.session.delete(attendance)
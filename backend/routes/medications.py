@@ -1,12 +1,12 @@
 from flask_smorest import Blueprint, abort
 from flask.views import MethodView
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import Medication, db, User, CaregiverAssignment
+from models import Medication, MedicationSchedule, db, ReferenceType
 from tasks import (
     send_medication_reminder,
-    celery_app,
     notify_caregiver_medication_taken,
 )
+from utils.reminder_scheduler import schedule_reminder, cancel_reminder
 from flask import request
 import pytz
 
@@ -15,9 +15,20 @@ from schemas.medication import (
     MedicationSchema,
     MedicationResponseSchema,
     MedicationAddResponseSchema,
+    MedicationScheduleSchema,
+    MedicationScheduleResponseSchema,
+    MedicationScheduleAddResponseSchema,
 )
 
 from flask_security import roles_accepted
+from utils.identity import resolve_user
+from utils.authorization import is_assigned
+from utils.pagination import PageArgsSchema, paginated_response
+from utils.medication_schedule import (
+    create_schedule,
+    reminder_key,
+    stop_schedule,
+)
 
 IST = pytz.timezone("Asia/Kolkata")
 
@@ -29,11 +40,23 @@ medications_blp = Blueprint(
 )
 
 
+def schedule_medication_reminder(med):
+    """Registers (or moves) the due-time reminder for a medication row."""
+    schedule_reminder(
+        reminder_key(med.medication_id),
+        send_medication_reminder.name,
+        [str(med.medication_id)],
+        med.time,
+        reference_type=ReferenceType.medication,
+        reference_id=str(med.medication_id),
+    )
+
+
 @medications_blp.route("")
 class MedicationsResource(MethodView):
     @staticmethod
     def get_senior_id_from_user(user_id):
-        user = User.query.get(user_id)
+        user = resolve_user(user_id)
         user_roles = [role.name for role in user.roles]
 
         if "senior_citizen" in user_roles:
@@ -48,12 +71,7 @@ class MedicationsResource(MethodView):
                 )
 
             # --- AUTHORIZATION CHECK ---
-            is_authorized = (
-                db.session.query(CaregiverAssignment)
-                .filter_by(caregiver_id=user.user_id, senior_id=senior_id)
-                .first()
-            )
-            if not is_authorized:
+            if not is_assigned(user.user_id, senior_id):
                 abort(
                     403, message="You are not authorized to access this senior's data."
                 )
@@ -68,13 +86,21 @@ class MedicationsResource(MethodView):
         summary="Get all medications for the specified senior citizen.",
         description="This endpoint returns a list of all medications for a specific senior citizen. A caregiver can access this information by providing the senior's ID as a query parameter. This helps caregivers and seniors to keep track of all the medications that need to be taken.",
     )
+    @medications_blp.arguments(PageArgsSchema, location="query", as_kwargs=True)
     @medications_blp.response(200, MedicationResponseSchema(many=True))
-    def get(self):
+    def get(self, **page_args):
         user_id = get_jwt_identity()
         senior_id = self.get_senior_id_from_user(user_id)
         session = db.session
         try:
-            return session.query(Medication).filter_by(senior_id=senior_id).all()
+            return paginated_response(
+                session.query(Medication).filter_by(senior_id=senior_id),
+                page_args,
+                MedicationResponseSchema,
+                key_column=Medication.medication_id,
+                sort_column=Medication.time,
+                updated_column=Medication.updated_at,
+            )
         finally:
             session.close()
 
@@ -129,12 +155,9 @@ class MedicationsResource(MethodView):
             senior_id=senior_id,
         )
 
-        result = send_medication_reminder.apply_async(
-            args=[str(medication.medication_id)], eta=medication_time
-        )
-        medication.reminder_task_id = result.id
-
         db.session.add(medication)
+        db.session.flush()  # Assigns medication_id for the reminder row
+        schedule_medication_reminder(medication)
         db.session.commit()
 
         return {
@@ -240,7 +263,7 @@ class MedicationByIdResource(MethodView):
     @medications_blp.response(200, MedicationResponseSchema)
     def put(self, data, medication_id):
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = resolve_user(user_id)
         user_roles = [role.name for role in user.roles]
 
         if "isTaken" in data:
@@ -270,21 +293,15 @@ class MedicationByIdResource(MethodView):
             if new_time.tzinfo is None:
                 new_time = IST.localize(new_time)
 
-            if new_time != med.time:
-                if med.reminder_task_id:
-                    celery_app.control.revoke(med.reminder_task_id)
-                result = send_medication_reminder.apply_async(
-                    args=[medication_id], eta=new_time
-                )
-                med.reminder_task_id = result.id
+            time_changed = new_time != med.time
             med.time = new_time
+            if time_changed:
+                schedule_medication_reminder(med)
 
         # ... The rest of the function remains the same
         if "isTaken" in data and data["isTaken"] is True and med.isTaken is False:
             notify_caregiver_medication_taken.apply_async(args=[medication_id])
-            if med.reminder_task_id:
-                celery_app.control.revoke(med.reminder_task_id)
-                med.reminder_task_id = None
+            cancel_reminder(reminder_key(med.medication_id))
 
         if "name" in data:
             med.name = data["name"]
@@ -316,10 +333,86 @@ class MedicationByIdResource(MethodView):
         if not med:
             abort(404, message="Medication not found")
 
-        # --- REVOKE THE TASK BEFORE DELETING ---
-        if med.reminder_task_id:
-            celery_app.control.revoke(med.reminder_task_id)
+        # --- CANCEL THE REMINDER BEFORE DELETING ---
+        cancel_reminder(reminder_key(med.medication_id))
 
         db.session.delete(med)
         db.session.commit()
         return {"message": "Medication deleted"}
+
+
+@medications_blp.route("/schedules")
+class MedicationSchedulesResource(MethodView):
+    @jwt_required()
+    @roles_accepted("senior_citizen", "caregiver")
+    @medications_blp.doc(
+        summary="Get the recurring medication schedules of the specified senior citizen.",
+        description="This endpoint returns the recurring schedules (for example 'twice daily for 30 days') of a senior citizen, including whether they are still active and how far ahead their doses have been created.",
+    )
+    @medications_blp.response(200, MedicationScheduleResponseSchema(many=True))
+    def get(self):
+        user_id = get_jwt_identity()
+        senior_id = MedicationsResource.get_senior_id_from_user(user_id)
+        return (
+            MedicationSchedule.query.filter_by(senior_id=senior_id)
+            .order_by(MedicationSchedule.created_at)
+            .all()
+        )
+
+    @jwt_required()
+    @roles_accepted("caregiver", "senior_citizen")
+    @medications_blp.doc(
+        summary="Add a recurring medication schedule for the specified senior citizen.",
+        description="This endpoint takes an RRULE recurrence (RFC 5545, e.g. 'FREQ=DAILY;BYHOUR=8,20;COUNT=60' for twice daily for 30 days) and a start time, and creates every dose in one request together with its reminder. Doses are only created a rolling number of days ahead; later ones are added automatically as time passes.",
+    )
+    @medications_blp.arguments(MedicationScheduleSchema())
+    @medications_blp.response(201, MedicationScheduleAddResponseSchema())
+    def post(self, data):
+        user_id = get_jwt_identity()
+        senior_id = MedicationsResource.get_senior_id_from_user(user_id)
+
+        start = data["start"]
+        if start.tzinfo is None:
+            start = IST.localize(start)
+
+        try:
+            schedule, doses_created = create_schedule(
+                senior_id, data["name"], data["dosage"], data["rrule"], start
+            )
+        except ValueError as e:
+            abort(400, message=f"Invalid recurrence rule: {e}")
+        db.session.commit()
+
+        return {
+            "message": "Medication schedule added and reminders scheduled",
+            "schedule_id": schedule.schedule_id,
+            "doses_created": doses_created,
+        }
+
+
+@medications_blp.route("/schedules/<string:schedule_id>")
+class MedicationScheduleByIdResource(MethodView):
+    @jwt_required()
+    @roles_accepted("caregiver", "senior_citizen")
+    @medications_blp.doc(
+        summary="Stop a recurring medication schedule.",
+        description="This endpoint stops a recurring schedule: its upcoming doses that have not been taken are removed and their reminders canceled. Doses in the past are kept for the medication history.",
+    )
+    @medications_blp.response(200, MedicationScheduleAddResponseSchema)
+    def delete(self, schedule_id):
+        user_id = get_jwt_identity()
+        senior_id = MedicationsResource.get_senior_id_from_user(user_id)
+        schedule = MedicationSchedule.query.filter_by(
+            schedule_id=schedule_id, senior_id=senior_id
+        ).first()
+
+        if not schedule:
+            abort(404, message="Medication schedule not found")
+
+        removed = stop_schedule(schedule)
+        db.session.commit()
+        return {
+            "message": "Medication schedule stopped",
+            "schedule_id": schedule.schedule_id,
+            "doses_removed": removed,
+        }
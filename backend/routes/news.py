@@ -6,19 +6,12 @@ from flask_jwt_extended import jwt_required
 from flask_security import roles_accepted
 import requests
 import logging
+import json
 
-# type: ignore
-
+from utils.cache import TTLCache
+from utils.news_client import NEWSAPI_CATEGORIES, fetch_top_headlines
 
-NEWSAPI_CATEGORIES = [
-    "business",
-    "entertainment",
-    "general",
-    "health",
-    "science",
-    "sports",
-    "technology",
-]
+# type: ignore
 
 
 class NewsQuerySchema(Schema):
@@ -55,17 +48,37 @@ def get_categories():
 
 def fetch_news_from_api(params: dict) -> dict:
     """Helper to fetch news from NewsAPI.org and handle errors."""
-    url = "https://newsapi.org/v2/top-headlines"
     try:
-        response = requests.get(url, params=params, timeout=5)
-        response.raise_for_status()
-        return response.json()
+        return fetch_top_headlines(params, timeout=5)
     except requests.RequestException as e:
         logging.error(f"NewsAPI request failed: {e}")
         abort(502, message="Failed to fetch news from NewsAPI.")
     return {}
 
 
+def get_news_cache():
+    """The app's shared headline cache, built from config on first use."""
+    cache = current_app.extensions.get("news_cache")
+    if cache is None:
+        config = current_app.config
+        cache = TTLCache(
+            ttl=config.get("NEWS_CACHE_TTL_SECONDS", 300),
+            stale_ttl=config.get("NEWS_CACHE_STALE_SECONDS", 0),
+            redis_url=config.get("NEWS_CACHE_REDIS_URL"),
+            namespace="news",
+        )
+        current_app.extensions["news_cache"] = cache
+    return cache
+
+
+def news_cache_key(params: dict) -> str:
+    """Normalises the query so equivalent requests share one cache entry."""
+    category = (params.get("category") or "").strip().lower()
+    q = " ".join((params.get("q") or "").lower().split())
+    language = (params.get("language") or "en").strip().lower()
+    return json.dumps([category, q, language])
+
+
 @news_bp.route("/")
 class NewsResource(MethodView):
     """Resource for fetching news articles from NewsAPI.org."""
@@ -88,4 +101,6 @@ class NewsResource(MethodView):
             params["q"] = args["q"]
         if args.get("category"):
             params["category"] = args["category"]
-        return fetch_news_from_api(params)
+        return get_news_cache().get_or_load(
+            news_cache_key(params), lambda: fetch_news_from_api(params)
+        )
@@ -13,6 +13,7 @@ from schemas.profile import (
     AvatarUploadSchema,
     SeniorSchema,
 )
+from utils.uploads import save_upload
 
 
 profile_bp = Blueprint(
@@ -109,7 +110,7 @@ class AvatarUploadResource(MethodView):
             upload_folder = current_app.config["UPLOAD_FOLDER"]
             avatar_folder = os.path.join(upload_folder, "avatars")
             os.makedirs(avatar_folder, exist_ok=True)
-            file.save(os.path.join(avatar_folder, filename))
+            save_upload(file, os.path.join(avatar_folder, filename))
             timestamp = datetime.now().timestamp()
             user.avatar_url = f"static/uploads/avatars/{filename}?t={timestamp}"
             db.session.commit()
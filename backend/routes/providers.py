@@ -5,6 +5,7 @@ from flask_security import roles_accepted
 from models import db, ServiceProvider
 from routes.events import EventSchema
 from marshmallow import Schema, fields
+from utils.pagination import PageArgsSchema, paginated_response
 
 
 class ServiceProviderSchema(Schema):
@@ -13,6 +14,7 @@ class ServiceProviderSchema(Schema):
     contact_email = fields.Email(required=False)
     phone_number = fields.Str()
     services_offered = fields.Str()
+    updated_at = fields.DateTime(dump_only=True)
 
 
 providers_bp = Blueprint(
@@ -31,9 +33,16 @@ class ServiceProviderList(MethodView):
         summary="Get a list of all service providers.",
         description="This endpoint returns a list of all service providers, along with basic information about them. This allows users to see who is providing services in their community.",
     )
+    @providers_bp.arguments(PageArgsSchema, location="query", as_kwargs=True)
     @providers_bp.response(200, ServiceProviderSchema(many=True))
-    def get(self):
-        return ServiceProvider.query.all()
+    def get(self, **page_args):
+        return paginated_response(
+            ServiceProvider.query,
+            page_args,
+            ServiceProviderSchema,
+            key_column=ServiceProvider.user_id,
+            updated_column=ServiceProvider.updated_at,
+        )
 
     @jwt_required()
     @roles_accepted("service_provider", "senior_citizen")
@@ -5,6 +5,8 @@ from flask.views import MethodView
 from flask_jwt_extended import jwt_required
 from schemas.reminder import ReminderSchema, MsgSchema  # you’ll define this schema
 from tasks import send_reminder_notification
+from models import db, ReferenceType
+from utils.reminder_scheduler import schedule_reminder
 from datetime import datetime, timedelta, timezone
 
 reminder_blp = Blueprint(
@@ -37,21 +39,21 @@ class ReminderResource(MethodView):
         except Exception:
             abort(400, message="Invalid date_time format")
 
-        time_formats = [1440, 60, 30, 10]  # Minutes before appointment
+        # Minutes before appointment, with a final reminder at the exact time
+        time_formats = [1440, 60, 30, 10, 0]
+        task_args = [appointment_id, title, location, date_time, user_email]
 
         for mins in time_formats:
             eta = date_time_obj - timedelta(minutes=mins)
             if eta > datetime.now(timezone.utc):
-                send_reminder_notification.apply_async(
-                    args=[appointment_id, title, location, date_time, user_email],
-                    eta=eta,
+                schedule_reminder(
+                    f"appointment:{appointment_id}:{mins}",
+                    send_reminder_notification.name,
+                    task_args,
+                    eta,
+                    reference_type=ReferenceType.appointment,
+                    reference_id=appointment_id,
                 )
-
-        # Final reminder at exact time
-        if date_time_obj > datetime.now(timezone.utc):
-            send_reminder_notification.apply_async(
-                args=[appointment_id, title, location, date_time, user_email],
-                eta=date_time_obj,
-            )
+        db.session.commit()
 
         return {"message": "Reminders scheduled"}, 200
@@ -1,6 +1,8 @@
 import os
+import time
 import uuid
-from flask import request, jsonify, Response
+from celery import chain
+from flask import request, jsonify, Response, current_app, url_for
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity
@@ -10,8 +12,11 @@ from fpdf import FPDF
 from extensions import db
 from models import Report
 from schemas.reports import ReportSchema
-from utils.text_extractor import extract_text_from_file
-from utils.ai_manager import analyze_report
+from tasks import extract_report_text, index_report, summarize_report
+from utils.authorization import is_assigned
+from utils.report_cache import cached_summary, cached_text
+from utils.sse import sse_event, sse_response
+from utils.uploads import save_upload
 
 reports_blp = Blueprint(
     "reports",
@@ -20,23 +25,31 @@ reports_blp = Blueprint(
     description="This blueprint handles the management of medical reports. It includes endpoints for uploading new reports, which are then processed to extract text and generate an AI-powered summary. Users can download the summary of the analysis. This functionality is key to helping users digitize and understand their medical history.",
 )
 
-UPLOAD_FOLDER = "backend/static/uploads/reports"
 ALLOWED_EXTENSIONS = {"pdf", "png", "jpg", "jpeg"}
 
-if not os.path.exists(UPLOAD_FOLDER):
-    os.makedirs(UPLOAD_FOLDER)
-
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def get_viewable_report(report_id):
+    """The report, if the current user uploaded it or is the senior's caregiver."""
+    report = Report.query.get_or_404(report_id)
+
+    user_id = get_jwt_identity()
+    if str(report.senior_id) != str(user_id) and not is_assigned(
+        user_id, report.senior_id
+    ):
+        abort(403, message="You are not authorized to view this report.")
+    return report
+
+
 @reports_blp.route("/summarize")
 class ReportUpload(MethodView):
     @jwt_required()
     @reports_blp.doc(
         summary="Upload a medical report for summarization",
-        description="This endpoint allows users to upload a medical report for summarization. The system processes the uploaded file to extract its text content and then uses an AI model to generate a concise and informative summary. This helps users quickly grasp the key findings of their medical reports without having to read through lengthy documents.",
+        description="This endpoint allows users to upload a medical report for summarization. The file is stored and a report is returned immediately with status 'processing' (HTTP 202); text extraction and AI summarization then run in the background. Poll GET /api/reports/<report_id> or listen for the 'report_status' Socket.IO event to learn when the status becomes 'completed' or 'failed'.",
     )
     def post(self):
         senior_id = get_jwt_identity()
@@ -51,30 +64,29 @@ class ReportUpload(MethodView):
         if file and allowed_file(file.filename):
             original_filename = secure_filename(file.filename)
             stored_filename = f"{uuid.uuid4().hex}_{original_filename}"
-            filepath = os.path.join(UPLOAD_FOLDER, stored_filename)
-
-            file.save(filepath)
-
-            extracted_text = extract_text_from_file(filepath)
-            summary = None
-            if extracted_text:
-                summary = analyze_report(extracted_text)
-                status = "completed"
-            else:
-                status = "failed"
+            upload_folder = current_app.config["REPORT_UPLOAD_FOLDER"]
+            os.makedirs(upload_folder, exist_ok=True)
+            content_hash = save_upload(
+                file, os.path.join(upload_folder, stored_filename)
+            )
 
             new_report = Report(
                 senior_id=senior_id,
                 original_filename=original_filename,
                 stored_filename=stored_filename,
-                extracted_text=extracted_text,
-                summary=summary,
-                status=status,
+                content_hash=content_hash,
+                status="processing",
             )
-            db.session.add(new_report)
-            db.session.commit()
 
-            if status == "completed":
+            # A byte-identical file seen before resolves without OCR or LLM calls.
+            extracted_text = cached_text(content_hash)
+            summary = cached_summary(extracted_text)
+            if summary is not None:
+                new_report.extracted_text = extracted_text
+                new_report.summary = summary
+                new_report.status = "completed"
+                db.session.add(new_report)
+                db.session.commit()
                 return (
                     jsonify(
                         {
@@ -84,16 +96,92 @@ class ReportUpload(MethodView):
                     ),
                     200,
                 )
-            else:
-                return (
-                    jsonify({"message": "Failed to extract text from the file."}),
-                    422,
-                )
+
+            db.session.add(new_report)
+            db.session.commit()
+
+            try:
+                chain(
+                    extract_report_text.s(new_report.report_id),
+                    summarize_report.s(),
+                    index_report.s(),
+                ).apply_async()
+            except Exception as e:
+                print(f"Failed to queue report {new_report.report_id}: {e}")
+                new_report.status = "failed"
+                db.session.commit()
+                abort(503, message="Report processing is temporarily unavailable.")
+
+            status_url = url_for("reports.ReportStatus", report_id=new_report.report_id)
+            return (
+                jsonify(
+                    {
+                        "message": "File accepted for processing.",
+                        "report": ReportSchema().dump(new_report),
+                        "status_url": status_url,
+                    }
+                ),
+                202,
+                {"Location": status_url},
+            )
 
         else:
             abort(400, message="File type not allowed.")
 
 
+@reports_blp.route("/<string:report_id>")
+class ReportStatus(MethodView):
+    @jwt_required()
+    @reports_blp.doc(
+        summary="Get a report's processing status",
+        description="This endpoint returns a report with its current status ('processing', 'completed' or 'failed') and, once completed, its summary. Clients poll it after uploading a report. It is available to the senior who uploaded the report and to their assigned caregiver.",
+    )
+    def get(self, report_id):
+        report = get_viewable_report(report_id)
+
+        return jsonify(ReportSchema().dump(report)), 200
+
+
+@reports_blp.route("/<string:report_id>/stream")
+class ReportStream(MethodView):
+    @jwt_required()
+    @reports_blp.doc(
+        summary="Stream a report's summary as it is generated",
+        description="This endpoint is a Server-Sent Events stream of a report's analysis. 'summary' events carry each newly generated piece of the summary as {delta}, so the text can be shown while the AI is still writing it; a final 'status' event carries {report_id, status} once the report is 'completed' or 'failed'. Reports that are already finished produce their whole summary and the status at once. It is available to the senior who uploaded the report and to their assigned caregiver.",
+    )
+    def get(self, report_id):
+        report = get_viewable_report(report_id)
+
+        config = current_app.config
+        poll_seconds = config.get("REPORT_STREAM_POLL_SECONDS", 0.5)
+        timeout = config.get("REPORT_STREAM_TIMEOUT_SECONDS", 300)
+
+        def events():
+            # The worker saves the partial summary as it streams from the
+            # model; relay whatever was added since the last check.
+            sent = 0
+            deadline = time.monotonic() + timeout
+            while True:
+                db.session.refresh(report)
+                summary = report.summary or ""
+                if len(summary) > sent:
+                    yield sse_event({"delta": summary[sent:]}, event="summary")
+                    sent = len(summary)
+                if report.status != "processing":
+                    yield sse_event(
+                        {"report_id": report.report_id, "status": report.status},
+                        event="status",
+                    )
+                    return
+                if time.monotonic() >= deadline:
+                    return
+                # Release the connection between checks.
+                db.session.commit()
+                time.sleep(poll_seconds)
+
+        return sse_response(events())
+
+
 @reports_blp.route("/<string:report_id>/download")
 class ReportDownload(MethodView):
     @jwt_required()
@@ -104,7 +192,7 @@ class ReportDownload(MethodView):
     def get(self, report_id):
         report = Report.query.get_or_404(report_id)
 
-        if not report.summary:
+        if not report.summary or report.status != "completed":
             abort(404, message="Summary not available for this report.")
 
         format = request.args.get("format")
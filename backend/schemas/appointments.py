@@ -42,6 +42,7 @@ class AppointmentResponseSchema(Schema):
     reminder_time = fields.DateTime(allow_none=True)
     senior_id = fields.UUID(required=True)
     status = fields.String(required=True)
+    updated_at = fields.DateTime(dump_only=True)
 
 
 class AppointmentAddResponseSchema(Schema):
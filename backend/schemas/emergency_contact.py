@@ -13,6 +13,7 @@ class EmergencyContactResponseSchema(Schema):
     relation = fields.Str()
     phone = fields.Str()
     senior_id = fields.UUID()
+    updated_at = fields.DateTime(dump_only=True)
 
 
 class EmergencyContactAddResponseSchema(Schema):
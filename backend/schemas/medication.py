@@ -15,8 +15,39 @@ class MedicationResponseSchema(Schema):
     time = fields.Str()
     isTaken = fields.Boolean()
     senior_id = fields.UUID()
+    updated_at = fields.DateTime(dump_only=True)
 
 
 class MedicationAddResponseSchema(Schema):
     message = fields.Str()
     medication_id = fields.UUID()
+
+
+class MedicationScheduleSchema(Schema):
+    name = fields.Str(required=True)
+    dosage = fields.Str(required=True)
+    rrule = fields.Str(
+        required=True,
+        metadata={
+            "description": "RFC 5545 recurrence rule, e.g. 'FREQ=DAILY;BYHOUR=8,20;COUNT=60'. Hours are India Standard Time (Asia/Kolkata)."
+        },
+    )
+    start = fields.DateTime(required=True)
+
+
+class MedicationScheduleResponseSchema(Schema):
+    schedule_id = fields.UUID()
+    name = fields.Str()
+    dosage = fields.Str()
+    rrule = fields.Str()
+    dtstart = fields.DateTime()
+    expanded_until = fields.DateTime()
+    active = fields.Boolean()
+    senior_id = fields.UUID()
+
+
+class MedicationScheduleAddResponseSchema(Schema):
+    message = fields.Str()
+    schedule_id = fields.UUID()
+    doses_created = fields.Int()
+    doses_removed = fields.Int()
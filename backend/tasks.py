@@ -1,14 +1,18 @@
 import os
 import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import requests
 import pytz
+from celery.exceptions import SoftTimeLimitExceeded
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from celery_app import celery_app
 from extensions import socketio
-from utils.notification import send_sms, send_email
+from utils.notification import send_sms, send_email, send_many
 from models import User, Appointment, CaregiverAssignment, db
 
 
@@ -24,6 +28,54 @@ def get_flask_app():
     return _flask_app
 
 
+@celery_app.task
+def dispatch_due_reminders():
+    """
+    Beat tick that claims due rows from the reminder table in batches and
+    publishes each one to its task for immediate execution.
+    """
+    app = get_flask_app()
+    with app.app_context():
+        from utils.reminder_scheduler import dispatch_reminders
+
+        dispatched = dispatch_reminders(
+            lambda task_name, args: celery_app.send_task(task_name, args=args)
+        )
+        if dispatched:
+            print(f"Dispatched {dispatched} due reminder(s).")
+
+
+@celery_app.task
+def prune_dispatched_reminders():
+    """
+    Daily beat task that deletes dispatched reminders older than
+    REMINDER_RETENTION_DAYS.
+    """
+    app = get_flask_app()
+    with app.app_context():
+        from utils.reminder_scheduler import prune_dispatched_reminders
+
+        deleted = prune_dispatched_reminders()
+        if deleted:
+            print(f"Pruned {deleted} dispatched reminder(s).")
+        return deleted
+
+
+@celery_app.task
+def extend_medication_schedules():
+    """
+    Hourly beat task that creates the doses of recurring medication schedules
+    that have come within the rolling horizon, with their reminders.
+    """
+    app = get_flask_app()
+    with app.app_context():
+        from utils.medication_schedule import extend_schedules
+
+        added = extend_schedules()
+        if added:
+            print(f"Added {added} scheduled medication dose(s).")
+
+
 @celery_app.task
 def send_reminder_notification(appointment_id, title, location, date_time, user_email):
     """
@@ -53,14 +105,22 @@ def send_reminder_notification(appointment_id, title, location, date_time, user_
         )
         email_subject = f"Reminder: {title}"
 
-        # --- 3. Send Email and SMS ---
-        if user.phone_number:
-            send_sms(user.phone_number, message)
-            print(f"✅ Sent appointment SMS reminder to {user.username}")
-
-        if user.email:
-            send_email(app, user.email, email_subject, message)
-            print(f"✅ Sent appointment email reminder to {user.username}")
+        # --- 3. Queue Email and SMS on the outbox ---
+        from utils.outbox import enqueue_notifications
+
+        # One reminder per appointment time: a redelivered task finds its rows
+        # already queued, while a rescheduled appointment is reminded again.
+        enqueue_notifications(
+            _notifications_for(
+                user.phone_number,
+                user.email,
+                email_subject,
+                message,
+                dedupe_key=f"appointment-reminder:{appointment_id}:{date_time}",
+            )
+        )
+        db.session.commit()
+        print(f"✅ Queued appointment reminder for {user.username}")
 
         # --- 4. Keep the original real-time notification ---
         socketio.emit(
@@ -100,22 +160,22 @@ def send_medication_reminder(medication_id):
 
         print(f"User '{senior_user.username}' found. Preparing reminders.")
 
-        # --- 1. Reminder for the Senior (Corrected Logic) ---
-        senior_msg = f"Reminder: It's time to take {med.dosage} of {med.name}."
+        from utils.outbox import enqueue_notifications
 
-        # Check for phone number and send SMS if it exists
-        if senior_user.phone_number:
-            send_sms(senior_user.phone_number, senior_msg)
-            print(f"Sent SMS reminder to senior {senior_user.username}")
-        else:
-            print(f"Senior {senior_user.username} has no phone number. Skipping SMS.")
+        # One reminder per dose: a redelivered task finds its rows already queued.
+        dose_key = f"medication-reminder:{med.medication_id}:{med.time.isoformat()}"
 
-        # Check for email and send if it exists
-        if senior_user.email:
-            send_email(app, senior_user.email, "Medication Reminder", senior_msg)
-            print(f"Sent email reminder to senior {senior_user.username}")
-        else:
-            print(f"Senior {senior_user.username} has no email. Skipping email.")
+        # --- 1. Reminder for the Senior (Corrected Logic) ---
+        senior_msg = f"Reminder: It's time to take {med.dosage} of {med.name}."
+        messages = _notifications_for(
+            senior_user.phone_number,
+            senior_user.email,
+            "Medication Reminder",
+            senior_msg,
+            dedupe_key=f"{dose_key}:senior",
+        )
+        if not messages:
+            print(f"Senior {senior_user.username} has no phone number or email.")
 
         assignment = CaregiverAssignment.query.filter_by(
             senior_id=senior_user.user_id
@@ -129,13 +189,17 @@ def send_medication_reminder(medication_id):
                 f"{med.dosage} of {med.name}. Please ensure it is marked as taken."
             )
             email_subject = f"Medication Due for {senior_user.username}"
+            messages += _notifications_for(
+                caregiver_user.phone_number,
+                caregiver_user.email,
+                email_subject,
+                caregiver_msg,
+                dedupe_key=f"{dose_key}:caregiver",
+            )
 
-            if caregiver_user.phone_number:
-                send_sms(caregiver_user.phone_number, caregiver_msg)
-                print(f"Sent SMS notification to caregiver {caregiver_user.username}")
-            if caregiver_user.email:
-                send_email(app, caregiver_user.email, email_subject, caregiver_msg)
-                print(f"Sent email notification to caregiver {caregiver_user.username}")
+        enqueue_notifications(messages)
+        db.session.commit()
+        print(f"Queued {len(messages)} medication reminder notification(s).")
 
 
 @celery_app.task
@@ -198,29 +262,20 @@ def send_event_reminder(user_id, event_name, event_location, event_time):
                 f"on {formatted_time}. We look forward to seeing you there!"
             )
 
-            # Send SMS if a phone number is available
-            if user.phone_number:
-                try:
-                    print(
-                        f"Attempting to send SMS to {user.username} ({user.phone_number})"
-                    )
-                    send_sms(user.phone_number, message)
-                    print(
-                        f"Sent event SMS reminder to {user.username} ({user.phone_number})"
-                    )
-                except Exception as e:
-                    print(f"Failed to send SMS to {user.username}: {e}")
-
-            # Send email if an email address is available
-            if user.email:
-                try:
-                    print(f"Attempting to send email to {user.username} ({user.email})")
-                    send_email(app, user.email, email_subject, email_body)
-                    print(
-                        f"Sent event email reminder to {user.username} ({user.email})"
-                    )
-                except Exception as e:
-                    print(f"Failed to send email to {user.username}: {e}")
+            # Queue the SMS and email (each has its own wording) on the outbox
+            from utils.outbox import enqueue_notifications
+
+            event_key = f"event-reminder:{user_id}:{event_name}:{event_time}"
+            enqueue_notifications(
+                _notifications_for(
+                    user.phone_number, None, email_subject, message, event_key
+                )
+                + _notifications_for(
+                    None, user.email, email_subject, email_body, event_key
+                )
+            )
+            db.session.commit()
+            print(f"Queued event reminder for {user.username}")
 
             print(f"Event reminder task completed for user {user_id}")
 
@@ -232,156 +287,296 @@ def send_event_reminder(user_id, event_name, event_location, event_time):
 
 @celery_app.task
 def send_daily_news_update():
+    """
+    Emails every user a digest of top headlines for their news categories.
+
+    Users are grouped by category first, so each distinct NewsAPI category is
+    fetched once per run over a pooled session rather than once per user.
+    """
     app = get_flask_app()
     with app.app_context():
+        from sqlalchemy.orm import joinedload
         from models import User
-
-        users_to_notify = User.query.all()
-        print(f"Found {len(users_to_notify)} users for daily news update.")
+        from utils.news_client import fetch_top_headlines, parse_categories
 
         api_key = app.config.get("NEWSAPI_KEY")
         if not api_key:
             print("News API key not set, aborting daily news task.")
             return
 
-        # Loop through each user and send them the news
-        for user in users_to_notify:
-            if not user.email:
-                print(
-                    f"Skipping user {user.username} (ID: {user.user_id}) - no email address."
-                )
-                continue
+        users_to_notify = (
+            User.query.options(joinedload(User.senior_citizen))
+            .filter(User.email.isnot(None), User.email != "")
+            .all()
+        )
+        print(f"Found {len(users_to_notify)} users for daily news update.")
 
+        categories_by_user = {
+            user.user_id: parse_categories(
+                user.senior_citizen.news_categories if user.senior_citizen else None
+            )
+            for user in users_to_notify
+        }
+
+        # --- 1. Fetch each distinct category once ---
+        headlines = {}
+        for category in sorted(
+            {c for categories in categories_by_user.values() for c in categories}
+        ):
             try:
-                category = "general"
-                if (
-                    hasattr(user, "senior_citizen")
-                    and user.senior_citizen
-                    and getattr(user.senior_citizen, "news_categories", None)
-                ):
-                    category = user.senior_citizen.news_categories
-
-                resp = requests.get(
-                    f"https://newsapi.org/v2/top-headlines?country=us"
-                    f"&category={category}&apiKey={api_key}"
+                data = fetch_top_headlines(
+                    {"country": "us", "category": category, "apiKey": api_key}
                 )
-                resp.raise_for_status()
-                articles = resp.json().get("articles", [])[:5]
+                headlines[category] = data.get("articles", [])[:5]
+            except requests.RequestException as e:
+                print(f"Failed to fetch news for category '{category}'. Error: {e}")
+                headlines[category] = []
+        print(f"Fetched headlines for {len(headlines)} categories.")
+
+        # --- 2. Render each digest from the shared results onto the outbox ---
+        from utils.outbox import enqueue_notifications
 
+        today = datetime.now(pytz.utc).date().isoformat()
+        messages = []
+        for user in users_to_notify:
+            try:
+                articles = _merge_headlines(
+                    [headlines[c] for c in categories_by_user[user.user_id]]
+                )
                 if not articles:
-                    print(
-                        f"No articles found for category '{category}' for user {user.username}."
-                    )
+                    print(f"No articles found for user {user.username}.")
                     continue
 
                 summary = "Your Daily News Update:\n\n" + "".join(
                     f"- {a['title']} ({a['source']['name']})\n  Read more: {a['url']}\n\n"
                     for a in articles
                 )
-                send_email(app, user.email, "Daily News Update", summary)
-                print(
-                    f"Successfully sent daily news update to {user.username} at {user.email}"
+                messages += _notifications_for(
+                    None,
+                    user.email,
+                    "Daily News Update",
+                    summary,
+                    dedupe_key=f"daily-news:{today}:{user.user_id}",
                 )
 
             except Exception as e:
-                print(f"Failed to send news to {user.username}. Error: {e}")
+                print(f"Failed to build news for {user.username}. Error: {e}")
+
+        enqueue_notifications(messages)
+        db.session.commit()
+        print(f"Queued {len(messages)} daily news update(s).")
+
+
+def _merge_headlines(article_lists, limit=5):
+    """Interleaves per-category headlines, dropping duplicates, up to limit."""
+    merged = []
+    seen_urls = set()
+    for position in range(max((len(a) for a in article_lists), default=0)):
+        for articles in article_lists:
+            if position < len(articles) and articles[position]["url"] not in seen_urls:
+                seen_urls.add(articles[position]["url"])
+                merged.append(articles[position])
+    return merged[:limit]
+
+
+def _notifications_for(phone_number, email, subject, body, dedupe_key=None):
+    """
+    Renders one SMS and/or email message for a recipient's contact details.
+    With dedupe_key, each message gets "<dedupe_key>:<channel>" as its outbox key.
+    """
+    messages = []
+    if phone_number:
+        messages.append({"channel": "sms", "to": phone_number, "body": body})
+    if email:
+        messages.append(
+            {"channel": "email", "to": email, "subject": subject, "body": body}
+        )
+    if dedupe_key:
+        for message in messages:
+            message["dedupe_key"] = f"{dedupe_key}:{message['channel']}"
+    return messages
+
+
+@celery_app.task
+def dispatch_outbox(channel):
+    """
+    Drains the notification outbox for one channel ("sms" or "email").
+
+    Runs on the notifications queue. Each batch is claimed and committed
+    before any network I/O, then delivered over one SMTP session or the
+    pooled Twilio client.
+    """
+    app = get_flask_app()
+    with app.app_context():
+        from utils.outbox import drain_outbox
+
+        sent = drain_outbox(channel, lambda messages: send_many(app, messages))
+        if sent:
+            print(f"Delivered {sent} {channel} notification(s) from the outbox.")
+        return sent
+
+
+@celery_app.task
+def prune_outbox():
+    """
+    Daily beat task that deletes sent and failed outbox rows older than
+    OUTBOX_RETENTION_DAYS.
+    """
+    app = get_flask_app()
+    with app.app_context():
+        from utils.outbox import prune_outbox
+
+        deleted = prune_outbox()
+        if deleted:
+            print(f"Pruned {deleted} finished outbox notification(s).")
+        return deleted
 
 
 @celery_app.task
 def check_missed_medications():
+    """
+    Marks overdue, untaken medications as missed and notifies the senior and
+    their caregiver.
+
+    Works set-based: one joined query per batch fetches the doses together
+    with the senior, senior profile and caregiver, the counters are updated
+    with bulk UPDATE statements, and the notifications are written to the
+    outbox in the same transaction.
+    """
     app = get_flask_app()
     with app.app_context():
-        from models import User, Medication, CaregiverAssignment, db
+        from sqlalchemy import bindparam, func, update
+        from sqlalchemy.orm import aliased
+        from models import User, Medication, SeniorCitizen, CaregiverAssignment, db
+        from utils.outbox import enqueue_notifications
+        from utils.senior_context import invalidate_context
 
         print("Running 'check_missed_medications' task...")
         now = datetime.now()
         cutoff = now - timedelta(minutes=10)
-
-        missed_meds = Medication.query.filter(
-            Medication.isTaken.is_(False),
-            Medication.time <= cutoff,
-            Medication.missed_counted.is_(False),
-        ).all()
-
-        if not missed_meds:
-            print("No missed medications found.")
-            return
-
-        print(
-            f"Found {len(missed_meds)} missed medication(s). Processing notifications..."
+        batch_size = app.config.get("MISSED_MEDICATION_BATCH_SIZE", 1000)
+
+        CaregiverUser = aliased(User)
+        missed_query = (
+            db.session.query(
+                Medication.medication_id,
+                Medication.name,
+                Medication.dosage,
+                Medication.time,
+                SeniorCitizen.user_id.label("senior_id"),
+                SeniorCitizen.medications_missed,
+                User.username,
+                User.phone_number,
+                User.email,
+                CaregiverUser.phone_number.label("caregiver_phone_number"),
+                CaregiverUser.email.label("caregiver_email"),
+            )
+            .join(SeniorCitizen, SeniorCitizen.user_id == Medication.senior_id)
+            .join(User, User.user_id == SeniorCitizen.user_id)
+            .outerjoin(
+                CaregiverAssignment,
+                CaregiverAssignment.senior_id == SeniorCitizen.user_id,
+            )
+            .outerjoin(
+                CaregiverUser, CaregiverUser.user_id == CaregiverAssignment.caregiver_id
+            )
+            .filter(
+                Medication.isTaken.is_(False),
+                Medication.time <= cutoff,
+                Medication.missed_counted.is_(False),
+            )
+            .order_by(Medication.time, Medication.senior_id)
+            .limit(batch_size)
         )
 
-        for med in missed_meds:
-            senior_user = User.query.get(med.senior_id)
-            if not senior_user:
-                continue
+        increment_missed = (
+            update(SeniorCitizen.__table__)
+            .where(SeniorCitizen.__table__.c.user_id == bindparam("b_senior_id"))
+            .values(
+                medications_missed=func.coalesce(
+                    SeniorCitizen.__table__.c.medications_missed, 0
+                )
+                + bindparam("b_missed")
+            )
+        )
 
-            if senior_user.senior_citizen:
-                senior_user.senior_citizen.medications_missed = (
-                    senior_user.senior_citizen.medications_missed or 0
-                ) + 1
-                db.session.add(senior_user.senior_citizen)
-                print(
-                    f"Incremented missed counter for {senior_user.username} - medication: {med.name}"
+        total = 0
+        while True:
+            rows = missed_query.all()
+            if not rows:
+                break
+
+            # A senior has at most one caregiver, but keep the first row per
+            # dose in case the assignment table ever holds more.
+            seen = set()
+            missed = []
+            for row in rows:
+                if row.medication_id not in seen:
+                    seen.add(row.medication_id)
+                    missed.append(row)
+
+            per_senior = {}
+            messages = []
+            for row in missed:
+                per_senior[row.senior_id] = per_senior.get(row.senior_id, 0) + 1
+                missed_count = (row.medications_missed or 0) + per_senior[row.senior_id]
+                due_at = row.time.strftime("%I:%M %p")
+
+                senior_msg = (
+                    f"ALERT: You may have missed your dose of {row.dosage} of {row.name}, "
+                    f"which was due at {due_at}. Please check your schedule."
+                )
+                messages += _notifications_for(
+                    row.phone_number,
+                    row.email,
+                    "Missed Medication Alert",
+                    senior_msg,
+                    dedupe_key=f"missed-medication:{row.medication_id}:senior",
                 )
 
-                med.missed_counted = True
-                db.session.add(med)
-                print(f"Marked {med.name} as counted to prevent double-counting")
+                caregiver_msg = (
+                    f"ALERT: {row.username} may have missed their dose of "
+                    f"{row.dosage} of {row.name}, which was due at {due_at}. "
+                    f"Total medications missed: {missed_count}."
+                )
+                messages += _notifications_for(
+                    row.caregiver_phone_number,
+                    row.caregiver_email,
+                    "Missed Medication Alert",
+                    caregiver_msg,
+                    dedupe_key=f"missed-medication:{row.medication_id}:caregiver",
+                )
 
-            # --- NEW: Notify the Senior Citizen Directly ---
-            senior_msg = (
-                f"ALERT: You may have missed your dose of {med.dosage} of {med.name}, "
-                f"which was due at {med.time.strftime('%I:%M %p')}. Please check your schedule."
+            db.session.execute(
+                update(Medication)
+                .where(Medication.medication_id.in_(seen))
+                .values(missed_counted=True)
+                .execution_options(synchronize_session=False)
             )
-            if senior_user.phone_number:
-                send_sms(senior_user.phone_number, senior_msg)
-                print(f"Sent missed medication SMS to senior {senior_user.username}")
-            if senior_user.email:
-                send_email(
-                    app, senior_user.email, "Missed Medication Alert", senior_msg
-                )
-                print(f"Sent missed medication email to senior {senior_user.username}")
-
-            # --- EXISTING: Notify the Caregiver (if they exist) ---
-            assignment = CaregiverAssignment.query.filter_by(
-                senior_id=senior_user.user_id
-            ).first()
-            if assignment:
-                caregiver_user = User.query.get(assignment.caregiver_id)
-                if caregiver_user:
-                    print(
-                        f"Found caregiver '{caregiver_user.username}' for senior '{senior_user.username}'."
-                    )
-                    missed_count = (
-                        senior_user.senior_citizen.medications_missed
-                        if senior_user.senior_citizen
-                        else "N/A"
-                    )
-                    caregiver_msg = (
-                        f"ALERT: {senior_user.username} may have missed their dose of "
-                        f"{med.dosage} of {med.name}, which was due at "
-                        f"{med.time.strftime('%I:%M %p')}. "
-                        f"Total medications missed: {missed_count}."
-                    )
+            db.session.execute(
+                increment_missed,
+                [
+                    {"b_senior_id": senior_id, "b_missed": count}
+                    for senior_id, count in per_senior.items()
+                ],
+            )
+            enqueue_notifications(messages)
+            db.session.commit()
+            # The bulk UPDATEs bypass the mapper events that clear snapshots.
+            # Web processes share the clearing only through
+            # SENIOR_CONTEXT_CACHE_REDIS_URL; otherwise theirs expire by TTL.
+            for senior_id in per_senior:
+                invalidate_context(senior_id)
 
-                    if caregiver_user.phone_number:
-                        send_sms(caregiver_user.phone_number, caregiver_msg)
-                        print(
-                            f"Sent missed medication SMS to caregiver {caregiver_user.username}"
-                        )
-                    if caregiver_user.email:
-                        send_email(
-                            app,
-                            caregiver_user.email,
-                            "Missed Medication Alert",
-                            caregiver_msg,
-                        )
-                        print(
-                            f"Sent missed medication email to caregiver {caregiver_user.username}"
-                        )
+            total += len(missed)
 
-        db.session.commit()
+            if len(rows) < batch_size:
+                break
+
+        if total:
+            print(f"Marked {total} missed medication(s) and queued notifications.")
+        else:
+            print("No missed medications found.")
 
 
 @celery_app.task
@@ -389,101 +584,244 @@ def check_missed_appointments():
     """
     Checks for past appointments that were not marked as 'Completed' or 'Cancelled',
     updates the status to 'Missed', and sends a notification to the senior and caregiver.
+
+    The sweep is incremental: it only looks at appointments that became due
+    since the stored watermark (minus a small lookback for late writes), walks
+    them in bounded batches over the (status, date_time) index, and commits
+    each batch together with its outbox notifications. Appointments written
+    since the last run with a date_time already behind the watermark (a past
+    date on create, or a Missed one reset to Scheduled) are picked up by a
+    second pass over the (status, updated_at) index.
     """
     app = get_flask_app()
     with app.app_context():
+        from sqlalchemy import bindparam, func, update
+        from sqlalchemy.orm import aliased
+        from models import SeniorCitizen, SweepWatermark
+        from utils.outbox import enqueue_notifications
+        from utils.senior_context import invalidate_context
+
+        now = datetime.now(pytz.utc).replace(tzinfo=None)
+        batch_size = app.config.get("MISSED_APPOINTMENT_BATCH_SIZE", 500)
+        lookback = timedelta(
+            seconds=app.config.get("MISSED_APPOINTMENT_LOOKBACK_SECONDS", 300)
+        )
+        ist_tz = pytz.timezone("Asia/Kolkata")
 
-        now = datetime.now(pytz.utc)
-
-        missed_appointments = Appointment.query.filter(
-            Appointment.date_time <= now, Appointment.status == "Scheduled"
-        ).all()
-
-        if not missed_appointments:
-            return
-
-        print(f"Found {len(missed_appointments)} missed appointment(s). Processing...")
-
-        for appt in missed_appointments:
-            senior_user = User.query.get(appt.senior_id)
-
-            if not senior_user or not senior_user.senior_citizen:
-                continue
-
-            # Increment Counter
-            senior_user.senior_citizen.appointments_missed = (
-                senior_user.senior_citizen.appointments_missed or 0
-            ) + 1
-            appt.status = "Missed"
-            print("Successfully incremented missed counter and set status to 'Missed'.")
-
-            # 1. Notify the Senior Citizen
-            formatted_time = appt.date_time.astimezone(
-                pytz.timezone("Asia/Kolkata")
-            ).strftime("%B %d at %I:%M %p")
-            senior_msg = (
-                f"ALERT: It appears you missed your appointment for '{appt.title}' "
-                f"that was scheduled for {formatted_time}. Please reschedule if necessary."
+        state = db.session.get(SweepWatermark, "missed_appointments")
+        if state is None:
+            state = SweepWatermark(name="missed_appointments", watermark=now)
+            db.session.add(state)
+            low = None  # First run scans the whole backlog once
+        else:
+            low = state.watermark - lookback
+
+        CaregiverUser = aliased(User)
+        missed_query = (
+            db.session.query(
+                Appointment.appointment_id,
+                Appointment.title,
+                Appointment.date_time,
+                SeniorCitizen.user_id.label("senior_id"),
+                User.username,
+                User.phone_number,
+                User.email,
+                CaregiverUser.phone_number.label("caregiver_phone_number"),
+                CaregiverUser.email.label("caregiver_email"),
+            )
+            .join(SeniorCitizen, SeniorCitizen.user_id == Appointment.senior_id)
+            .join(User, User.user_id == SeniorCitizen.user_id)
+            .outerjoin(
+                CaregiverAssignment,
+                CaregiverAssignment.senior_id == SeniorCitizen.user_id,
+            )
+            .outerjoin(
+                CaregiverUser, CaregiverUser.user_id == CaregiverAssignment.caregiver_id
+            )
+            .filter(Appointment.status == "Scheduled", Appointment.date_time <= now)
+        )
+        if low is not None:
+            late_query = (
+                missed_query.filter(
+                    Appointment.updated_at > low, Appointment.date_time <= low
+                )
+                .order_by(Appointment.updated_at, Appointment.appointment_id)
+                .limit(batch_size)
             )
+            missed_query = missed_query.filter(Appointment.date_time > low)
+        missed_query = missed_query.order_by(
+            Appointment.date_time, Appointment.appointment_id
+        ).limit(batch_size)
+
+        increment_missed = (
+            update(SeniorCitizen.__table__)
+            .where(SeniorCitizen.__table__.c.user_id == bindparam("b_senior_id"))
+            .values(
+                appointments_missed=func.coalesce(
+                    SeniorCitizen.__table__.c.appointments_missed, 0
+                )
+                + bindparam("b_missed")
+            )
+        )
 
-            if senior_user.phone_number:
-                print("Senior has a phone number. Attempting to send SMS.")
-                send_sms(senior_user.phone_number, senior_msg)
-            else:
-                print("Senior does not have a phone number. Skipping SMS.")
+        def mark_missed(rows):
+            """Marks one batch Missed and queues its notifications."""
+            seen = set()
+            missed = []
+            for row in rows:
+                if row.appointment_id not in seen:
+                    seen.add(row.appointment_id)
+                    missed.append(row)
+
+            per_senior = {}
+            messages = []
+            for row in missed:
+                per_senior[row.senior_id] = per_senior.get(row.senior_id, 0) + 1
+                formatted_time = (
+                    pytz.utc.localize(row.date_time)
+                    .astimezone(ist_tz)
+                    .strftime("%B %d at %I:%M %p")
+                )
 
-            if senior_user.email:
-                print("Senior has an email. Attempting to send email.")
-                send_email(
-                    app, senior_user.email, "Missed Appointment Alert", senior_msg
+                # 1. Notify the Senior Citizen
+                senior_msg = (
+                    f"ALERT: It appears you missed your appointment for '{row.title}' "
+                    f"that was scheduled for {formatted_time}. Please reschedule if necessary."
                 )
-            else:
-                print("Senior does not have an email. Skipping email.")
-
-            # --- 2. Notify the Caregiver ---
-            assignment = CaregiverAssignment.query.filter_by(
-                senior_id=senior_user.user_id
-            ).first()
-            if assignment and (
-                caregiver_user := User.query.get(assignment.caregiver_id)
-            ):
-                print(
-                    f"Found caregiver: {caregiver_user.username}. Email: '{caregiver_user.email}', Phone: '{caregiver_user.phone_number}'"
+                messages += _notifications_for(
+                    row.phone_number,
+                    row.email,
+                    "Missed Appointment Alert",
+                    senior_msg,
+                    dedupe_key=f"missed-appointment:{row.appointment_id}:senior",
                 )
+
+                # --- 2. Notify the Caregiver ---
                 caregiver_msg = (
-                    f"ALERT: {senior_user.username}'s appointment for '{appt.title}' "
+                    f"ALERT: {row.username}'s appointment for '{row.title}' "
                     f"on {formatted_time} was missed. Please follow up with them."
                 )
+                messages += _notifications_for(
+                    row.caregiver_phone_number,
+                    row.caregiver_email,
+                    f"Missed Appointment for {row.username}",
+                    caregiver_msg,
+                    dedupe_key=f"missed-appointment:{row.appointment_id}:caregiver",
+                )
 
-                if caregiver_user.phone_number:
-                    print("Caregiver has a phone number. Attempting to send SMS.")
-                    send_sms(caregiver_user.phone_number, caregiver_msg)
-                else:
-                    print("Caregiver does not have a phone number. Skipping SMS.")
-
-                if caregiver_user.email:
-                    print("Caregiver has an email. Attempting to send email.")
-                    send_email(
-                        app,
-                        caregiver_user.email,
-                        f"Missed Appointment for {senior_user.username}",
-                        caregiver_msg,
+            if missed:
+                db.session.execute(
+                    update(Appointment)
+                    .where(
+                        Appointment.appointment_id.in_(seen),
+                        Appointment.status == "Scheduled",
                     )
-                else:
-                    print("Caregiver does not have an email. Skipping email.")
+                    .values(status="Missed")
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.execute(
+                    increment_missed,
+                    [
+                        {"b_senior_id": senior_id, "b_missed": count}
+                        for senior_id, count in per_senior.items()
+                    ],
+                )
+            enqueue_notifications(messages)
+            return missed
+
+        total = 0
+        while True:
+            rows = missed_query.all()
+            missed = mark_missed(rows)
+
+            done = len(rows) < batch_size
+            # Advance the watermark only as far as this run has processed.
+            state.watermark = now if done else missed[-1].date_time
+            db.session.commit()
+            # The bulk UPDATEs bypass the mapper events that clear snapshots.
+            # Web processes share the clearing only through
+            # SENIOR_CONTEXT_CACHE_REDIS_URL; otherwise theirs expire by TTL.
+            for senior_id in {row.senior_id for row in missed}:
+                invalidate_context(senior_id)
+
+            total += len(missed)
+
+            if done:
+                break
+
+        while low is not None:
+            rows = late_query.all()
+            missed = mark_missed(rows)
+            db.session.commit()
+            for senior_id in {row.senior_id for row in missed}:
+                invalidate_context(senior_id)
+            total += len(missed)
+            if len(rows) < batch_size:
+                break
+
+        if total:
+            print(f"Marked {total} missed appointment(s) and queued notifications.")
+
+
+def _deliver(app, message, retries, timeout, backoff=0.5):
+    """
+    Sends one alert message, retrying failed attempts. Each attempt is bounded
+    by timeout through the SMS and SMTP clients' socket timeouts, so a stalled
+    provider counts as a failed attempt. Runs on a pool thread, so it pushes
+    its own app context for Flask-Mail.
+    """
+    attempts = 0
+    with app.app_context():
+        while True:
+            attempts += 1
+            if message["channel"] == "sms":
+                ok = send_sms(message["to"], message["body"], timeout=timeout)
             else:
-                print("No assigned caregiver found for this senior.")
+                ok = send_email(
+                    app,
+                    message["to"],
+                    message["subject"],
+                    message["body"],
+                    timeout=timeout,
+                )
+            if ok or attempts > retries:
+                return {"status": "sent" if ok else "failed", "attempts": attempts}
+            time.sleep(backoff * attempts)
 
-            db.session.add(senior_user.senior_citizen)
-            db.session.add(appt)
 
-        db.session.commit()
-        print("--- Finished processing and committed to DB. ---")
+def _deliver_concurrently(app, messages):
+    """
+    Sends every message in parallel on a bounded thread pool and returns one
+    outcome per message. Messages beyond the pool size wait for a free worker
+    rather than being dropped; how long each attempt may take is bounded by
+    EMERGENCY_DELIVERY_TIMEOUT_SECONDS on the clients' sockets.
+    """
+    config = app.config
+    retries = config.get("EMERGENCY_DELIVERY_RETRIES", 2)
+    timeout = config.get("EMERGENCY_DELIVERY_TIMEOUT_SECONDS", 10)
+    workers = max(1, min(config.get("EMERGENCY_ALERT_MAX_WORKERS", 8), len(messages)))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="alert") as pool:
+        futures = [pool.submit(_deliver, app, m, retries, timeout) for m in messages]
+
+    outcomes = []
+    for message, future in zip(messages, futures):
+        outcome = {"channel": message["channel"], "to": message["to"]}
+        if future.exception() is not None:
+            outcome.update(status="failed", attempts=None)
+        else:
+            outcome.update(future.result())
+        outcomes.append(outcome)
+    return outcomes
 
 
 @celery_app.task
 # --- 1. UPDATE THE FUNCTION SIGNATURE ---
 def send_emergency_alert(senior_id, latitude=None, longitude=None):
+    """
+    Notifies the caregiver and every emergency contact concurrently and
+    returns the per-recipient delivery outcomes.
+    """
     app = get_flask_app()
     with app.app_context():
         from models import User, CaregiverAssignment
@@ -506,26 +844,60 @@ def send_emergency_alert(senior_id, latitude=None, longitude=None):
                 "Their location could not be determined. Please check on them immediately."
             )
 
+        messages = []
+
         # Notify the assigned caregiver
         assignment = CaregiverAssignment.query.filter_by(
             senior_id=senior_user.user_id
         ).first()
         if assignment and (caregiver_user := User.query.get(assignment.caregiver_id)):
             print(f"Notifying assigned caregiver: {caregiver_user.username}")
-            if caregiver_user.phone_number:
-                send_sms(caregiver_user.phone_number, alert_msg)
-            # --- FIX: Check if email exists before sending ---
-            if caregiver_user.email:
-                send_email(app, caregiver_user.email, "EMERGENCY ALERT!", alert_msg)
+            messages += _notifications_for(
+                caregiver_user.phone_number,
+                caregiver_user.email,
+                "EMERGENCY ALERT!",
+                alert_msg,
+            )
 
         # Notify all emergency contacts
         for contact in getattr(senior_user, "emergency_contacts", []):
             print(f"Notifying emergency contact: {contact.name}")
-            if contact.phone:
-                send_sms(contact.phone, alert_msg)
-            # --- FIX: Check if email exists before sending ---
-            if hasattr(contact, "email") and contact.email:
-                send_email(app, contact.email, "EMERGENCY ALERT!", alert_msg)
+            messages += _notifications_for(
+                contact.phone,
+                getattr(contact, "email", None),
+                "EMERGENCY ALERT!",
+                alert_msg,
+            )
+
+        if not messages:
+            return []
+
+        outcomes = _deliver_concurrently(app, messages)
+
+        # Deliveries that failed every attempt are handed to the outbox, which
+        # keeps retrying them with backoff instead of giving up here.
+        from utils.outbox import enqueue_notifications
+
+        alert_id = uuid.uuid4()
+        retry = []
+        for message, outcome in zip(messages, outcomes):
+            if outcome["status"] != "sent":
+                print(
+                    f"Emergency {outcome['channel']} to {outcome['to']} "
+                    f"failed for senior {senior_id}; queued for retry"
+                )
+                outcome["status"] = "queued"
+                retry.append(
+                    {
+                        **message,
+                        "dedupe_key": f"emergency:{alert_id}:{message['channel']}"
+                        f":{message['to']}",
+                    }
+                )
+        if retry:
+            enqueue_notifications(retry)
+            db.session.commit()
+        return outcomes
 
 
 @celery_app.task
@@ -559,11 +931,194 @@ def notify_caregiver_medication_taken(medication_id):
                 f"'{med.name}' ({med.dosage}) as taken at {taken_time_ist}."
             )
 
-            if caregiver.phone_number:
-                send_sms(caregiver.phone_number, msg)
-            if caregiver.email:
-                send_email(app, caregiver.email, f"Medication Taken: {med.name}", msg)
+            from utils.outbox import enqueue_notifications
 
+            enqueue_notifications(
+                _notifications_for(
+                    caregiver.phone_number,
+                    caregiver.email,
+                    f"Medication Taken: {med.name}",
+                    msg,
+                )
+            )
+            db.session.commit()
             print(
-                f"Sent 'medication taken' notification to caregiver {caregiver.username}."
+                f"Queued 'medication taken' notification to caregiver {caregiver.username}."
             )
+
+
+def _set_report_status(report, status):
+    """Commits a report's new status and pushes it to connected clients."""
+    report.status = status
+    db.session.commit()
+    # Only ids go over the broadcast; clients fetch the summary via the API.
+    socketio.emit(
+        "report_status",
+        {"report_id": report.report_id, "status": status},
+    )
+
+
+# OCR of a long scanned PDF easily exceeds the global 60s soft limit.
+@celery_app.task(soft_time_limit=600, time_limit=660)
+def extract_report_text(report_id):
+    """
+    First pipeline stage: extracts text from an uploaded report, reusing the
+    text of an identical earlier upload when there is one. Returns the report
+    id for the summarize stage, or None if extraction failed.
+    """
+    app = get_flask_app()
+    with app.app_context():
+        from models import Report
+        from utils.report_cache import cached_text, store_text
+        from utils.text_extractor import extract_text_from_file
+
+        report = db.session.get(Report, report_id)
+        if not report:
+            print(f"Report {report_id} not found for extraction.")
+            return None
+
+        extracted_text = cached_text(report.content_hash)
+        cache_hit = extracted_text is not None
+        if not cache_hit:
+            filepath = os.path.join(
+                app.config["REPORT_UPLOAD_FOLDER"], report.stored_filename
+            )
+            try:
+                extracted_text = extract_text_from_file(
+                    filepath, max_workers=app.config.get("OCR_MAX_WORKERS")
+                )
+            except SoftTimeLimitExceeded:
+                print(f"Extracting report {report_id} timed out.")
+                db.session.rollback()
+                _set_report_status(report, "failed")
+                return None
+        if not extracted_text or not extracted_text.strip():
+            _set_report_status(report, "failed")
+            return None
+
+        report.extracted_text = extracted_text
+        db.session.commit()
+        if not cache_hit:
+            store_text(report.content_hash, extracted_text)
+        return report_id
+
+
+def _stream_summary(report, flush_seconds):
+    """
+    Streams the analysis of report into report.summary, committing the
+    partial text at most every flush_seconds so GET /api/reports/<id>/stream
+    can relay it while the report is still processing.
+    """
+    from utils.ai_manager import stream_analyze_report
+
+    pieces = []
+    flushed_at = time.monotonic()
+    for piece in stream_analyze_report(report.extracted_text):
+        pieces.append(piece)
+        if time.monotonic() - flushed_at >= flush_seconds:
+            report.summary = "".join(pieces)
+            db.session.commit()
+            flushed_at = time.monotonic()
+    return "".join(pieces)
+
+
+@celery_app.task(soft_time_limit=180, time_limit=240)
+def summarize_report(report_id):
+    """
+    Second pipeline stage: summarises the extracted text, reusing the summary
+    of identical text under the current prompt version when there is one.
+    """
+    if report_id is None:
+        return None
+
+    app = get_flask_app()
+    with app.app_context():
+        from models import Report
+        from utils.report_cache import cached_summary, store_summary
+
+        report = db.session.get(Report, report_id)
+        if not report:
+            return None
+
+        summary = cached_summary(report.extracted_text)
+        cache_hit = summary is not None
+        if not cache_hit:
+            try:
+                summary = _stream_summary(
+                    report, app.config.get("REPORT_SUMMARY_FLUSH_SECONDS", 0.5)
+                )
+            except SoftTimeLimitExceeded:
+                # Leaving the report processing would keep clients polling
+                # until the stalled-report sweep gives up on it.
+                print(f"Summarizing report {report_id} timed out.")
+                db.session.rollback()
+                report.summary = None
+                _set_report_status(report, "failed")
+                return None
+            except Exception as e:
+                print(f"Summarizing report {report_id} failed: {e}")
+                db.session.rollback()
+                report.summary = None
+                _set_report_status(report, "failed")
+                return None
+
+        report.summary = summary
+        _set_report_status(report, "completed")
+        if not cache_hit:
+            store_summary(report.extracted_text, summary)
+        return report_id
+
+
+@celery_app.task
+def fail_stalled_reports():
+    """
+    Marks reports failed that are still processing long after upload, e.g.
+    because a worker was killed by a hard time limit before it could record
+    the failure itself. Returns the number of reports failed.
+    """
+    app = get_flask_app()
+    with app.app_context():
+        from models import Report
+
+        cutoff = datetime.now(pytz.utc).replace(tzinfo=None) - timedelta(
+            seconds=app.config.get("REPORT_PROCESSING_TIMEOUT_SECONDS", 3600)
+        )
+        stalled = Report.query.filter(
+            Report.status == "processing", Report.created_at < cutoff
+        ).all()
+        for report in stalled:
+            print(f"Report {report.report_id} stalled while processing.")
+            _set_report_status(report, "failed")
+        return len(stalled)
+
+
+@celery_app.task
+def index_report(report_id):
+    """
+    Final pipeline stage: builds the chunk index that report chat retrieves
+    from. Chat builds it on demand if this stage has not run yet.
+    """
+    if report_id is None:
+        return None
+
+    app = get_flask_app()
+    with app.app_context():
+        from models import Report
+        from utils.report_index import index_for_text
+
+        report = db.session.get(Report, report_id)
+        if not report or not report.extracted_text:
+            return None
+
+        index_for_text(report.extracted_text)
+        return report_id
+
+
+@celery_app.task
+def compact_chat_session(session_id):
+    """Folds a report chat session's older turns into its running summary."""
+    app = get_flask_app()
+    with app.app_context():
+        from utils.chat_sessions import compact_session
+
+        return compact_session(session_id)
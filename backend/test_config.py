@@ -14,6 +14,10 @@ class TestConfig(Config):
 
     MAIL_SUPPRESS_SEND = True
 
+    TTS_BACKEND = "stub"
+    TTS_CACHE_FOLDER = None
+    TTS_PREWARM = False
+
     # Flask-Security configuration for testing
     SECURITY_PASSWORD_SALT = "test-security-salt"
     SECURITY_REGISTERABLE = True
@@ -1,3 +1,4 @@
+import threading
 import uuid
 import pytest
 from datetime import datetime, timedelta, timezone
@@ -21,6 +22,46 @@ from models import (
 from flask_jwt_extended import create_access_token
 
 
+class FakeRedis:
+    """Just enough of a Redis client for TTLCache's shared loading."""
+
+    def __init__(self):
+        self.data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, nx=False, px=None, ex=None):
+        with self._lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value.encode() if isinstance(value, str) else value
+            return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def register_script(self, script):
+        # The only script is the lock's compare-and-delete.
+        def release(keys, args):
+            with self._lock:
+                if self.data.get(keys[0]) == args[0].encode():
+                    del self.data[keys[0]]
+                    return 1
+                return 0
+
+        return release
+
+
+@pytest.fixture
+def fake_redis(mocker):
+    """A FakeRedis that every TTLCache given a redis_url talks to."""
+    server = FakeRedis()
+    mocker.patch("utils.cache.redis.Redis.from_url", return_value=server)
+    return server
+
+
 @pytest.fixture(scope="session")
 def app():
     test_app = create_app(config_class=TestConfig)
@@ -42,13 +83,28 @@ def clean_db(app):
         db.session.rollback()  # Reset any broken session at the start
 
         # Clean the tables in correct dependency order
+        db.session.execute(db.text("DELETE FROM scheduled_reminder"))
+        db.session.execute(db.text("DELETE FROM sweep_watermark"))
+        db.session.execute(db.text("DELETE FROM notification_outbox"))
+        db.session.execute(db.text("DELETE FROM chat_turn"))
+        db.session.execute(db.text("DELETE FROM chat_session"))
+        db.session.execute(db.text("DELETE FROM report"))
+        db.session.execute(db.text("DELETE FROM extracted_text_cache"))
+        db.session.execute(db.text("DELETE FROM summary_cache"))
+        db.session.execute(db.text("DELETE FROM report_index"))
         db.session.execute(db.text("DELETE FROM medication"))
+        db.session.execute(db.text("DELETE FROM medication_schedule"))
         db.session.execute(db.text("DELETE FROM appointment"))
         db.session.execute(db.text("DELETE FROM roles_users"))
         db.session.execute(db.text("DELETE FROM user"))
         db.session.execute(db.text("DELETE FROM role"))
         db.session.commit()
 
+        for name in ("news_cache", "senior_context_cache"):
+            cache = app.extensions.get(name)
+            if cache is not None:
+                cache.clear()
+
         yield  # run the test
 
         db.session.rollback()  # Ensure cleanup after test if needed
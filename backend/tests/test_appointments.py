@@ -2,7 +2,7 @@ from datetime import datetime, timezone, timedelta
 import uuid
 import json
 from unittest.mock import patch
-from models import Appointment, User, db
+from models import Appointment, User, db, ScheduledReminder, ReferenceType
 from flask_jwt_extended import create_access_token
 
 
@@ -413,12 +413,9 @@ class TestAppointmentAPIValidation:
 class TestAppointmentReminders:
     """Test reminder scheduling and management"""
 
-    @patch("tasks.send_reminder_notification.apply_async")
-    def test_create_appointment_with_reminder(self, mock_task, client, auth_headers):
-        """Test creating appointment with reminder schedules task"""
-        mock_task.return_value.id = "task_123"
-
-        future_time = datetime.now(timezone.utc) + timedelta(days=1)
+    def test_create_appointment_with_reminder(self, client, auth_headers):
+        """Test creating appointment with reminder stores a pending reminder row"""
+        future_time = datetime.now() + timedelta(days=1)
         reminder_time = future_time - timedelta(hours=1)
 
         response = client.post(
@@ -432,88 +429,88 @@ class TestAppointmentReminders:
             headers=auth_headers,
         )
 
-        # API might not support reminder_time in request, so allow 400 or 201
-        assert response.status_code in [201, 400]
-
-        if response.status_code == 201:
-            # Verify task was scheduled
-            mock_task.assert_called_once()
-
-            # Verify task ID stored in database
-            data = response.get_json()
-            appt = Appointment.query.get(data["appointment_id"])
-            if hasattr(appt, "reminder_task_id"):
-                assert appt.reminder_task_id == "task_123"
+        assert response.status_code == 201
 
-    @patch("celery_app.celery_app.control.revoke")
-    @patch("tasks.send_reminder_notification.apply_async")
-    def test_update_appointment_reminder_cancels_old_task(
-        self, mock_task, mock_revoke, client, auth_headers, senior_user
+        # Verify the reminder was queued in the scheduler table
+        data = response.get_json()
+        reminder = ScheduledReminder.query.filter_by(
+            dedupe_key=f"appointment:{data['appointment_id']}"
+        ).first()
+        assert reminder is not None
+        assert reminder.status == "pending"
+        assert reminder.task_name == "tasks.send_reminder_notification"
+        assert reminder.task_args[0] == data["appointment_id"]
+
+    def test_update_appointment_reminder_reschedules_row(
+        self, client, auth_headers, senior_user
     ):
-        """Test updating reminder cancels old task and creates new one"""
-        mock_task.return_value.id = "new_task_456"
-
-        # Create appointment with existing reminder manually
+        """Test updating reminder moves the existing row instead of adding one"""
         appt = Appointment(
             title="Test Appointment",
             date_time=datetime.now(timezone.utc) + timedelta(days=1),
             location="Location",
             senior_id=senior_user.user_id,
+            reminder_time=datetime.now() + timedelta(hours=1),
         )
-        # Set reminder fields if they exist
-        if hasattr(appt, "reminder_time"):
-            appt.reminder_time = datetime.now(timezone.utc) + timedelta(hours=1)
-        if hasattr(appt, "reminder_task_id"):
-            appt.reminder_task_id = "old_task_123"
-
         db.session.add(appt)
         db.session.commit()
 
-        # Update with new reminder time
         new_reminder = datetime.now(timezone.utc) + timedelta(hours=2)
         response = client.put(
             f"/api/v1/appointments/{appt.appointment_id}",
             headers=auth_headers,
             json={"reminder_time": new_reminder.isoformat()},
         )
+        assert response.status_code == 200
 
-        # API might not support reminder_time updates
-        assert response.status_code in [200, 400, 404]
+        response = client.put(
+            f"/api/v1/appointments/{appt.appointment_id}",
+            headers=auth_headers,
+            json={"title": "Renamed Appointment"},
+        )
+        assert response.status_code == 200
 
-        if response.status_code == 200:
-            # Verify old task was cancelled if reminder functionality exists
-            if hasattr(appt, "reminder_task_id"):
-                mock_revoke.assert_called_once_with("old_task_123")
+        reminders = ScheduledReminder.query.filter_by(
+            dedupe_key=f"appointment:{appt.appointment_id}"
+        ).all()
+        assert len(reminders) == 1
+        assert reminders[0].due_at == new_reminder.replace(tzinfo=None)
+        assert reminders[0].task_args[1] == "Renamed Appointment"
 
-    @patch("celery_app.celery_app.control.revoke")
-    def test_delete_appointment_cancels_reminder_task(
-        self, mock_revoke, client, auth_headers, senior_user
+    def test_delete_appointment_cancels_reminder(
+        self, client, auth_headers, senior_user
     ):
-        """Test deleting appointment cancels reminder task"""
-        # Create appointment with reminder
+        """Test deleting appointment removes its reminder row"""
         appt = Appointment(
             title="To Delete",
             date_time=datetime.now(timezone.utc) + timedelta(days=1),
             location="Location",
             senior_id=senior_user.user_id,
         )
-        # Set reminder task ID if field exists
-        if hasattr(appt, "reminder_task_id"):
-            appt.reminder_task_id = "task_to_cancel"
-
         db.session.add(appt)
         db.session.commit()
+        db.session.add(
+            ScheduledReminder(
+                dedupe_key=f"appointment:{appt.appointment_id}",
+                task_name="tasks.send_reminder_notification",
+                task_args=[appt.appointment_id],
+                reference_type=ReferenceType.appointment,
+                reference_id=appt.appointment_id,
+                due_at=datetime.now() + timedelta(hours=1),
+            )
+        )
+        db.session.commit()
 
         response = client.delete(
             f"/api/v1/appointments/{appt.appointment_id}",
             headers=auth_headers,
         )
 
-        # API might return 404 if authorization fails, 200 if success
-        assert response.status_code in [200, 404]
-
-        if response.status_code == 200 and hasattr(appt, "reminder_task_id"):
-            mock_revoke.assert_called_once_with("task_to_cancel")
+        assert response.status_code == 200
+        assert (
+            ScheduledReminder.query.filter_by(reference_id=appt.appointment_id).count()
+            == 0
+        )
 
     def test_create_appointment_without_reminder(self, client, auth_headers):
         """Test creating appointment without reminder works normally"""
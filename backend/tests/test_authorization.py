@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import utils.authorization as authorization
+from models import CaregiverAssignment, db
+from utils.authorization import assigned_senior_ids, is_assigned
+
+
+class TestCaregiverAuthorization:
+
+    def test_assignment_lookups_are_cached(
+        self, client, caregiver_user, senior_user, caregiver_auth_headers, mocker
+    ):
+        load = mocker.spy(authorization, "_load_assigned_senior_ids")
+        url = f"/api/v1/medications?senior_id={senior_user.user_id}"
+
+        for _ in range(3):
+            response = client.get(url, headers=caregiver_auth_headers)
+            assert response.status_code == 200
+
+        assert load.call_count == 1
+
+    def test_new_assignment_invalidates_cached_set(
+        self, app, caregiver_user, senior_user, other_senior_user
+    ):
+        assert is_assigned(caregiver_user.user_id, senior_user.user_id)
+        assert not is_assigned(caregiver_user.user_id, other_senior_user.user_id)
+
+        db.session.add(
+            CaregiverAssignment(
+                caregiver_id=caregiver_user.user_id,
+                senior_id=other_senior_user.user_id,
+            )
+        )
+        db.session.commit()
+
+        assert is_assigned(caregiver_user.user_id, other_senior_user.user_id)
+        assert len(assigned_senior_ids(caregiver_user.user_id)) == 2
+
+    def test_unassigned_caregiver_is_forbidden(
+        self, client, caregiver_user, other_senior_user, caregiver_auth_headers
+    ):
+        response = client.get(
+            f"/api/v1/medications?senior_id={other_senior_user.user_id}",
+            headers=caregiver_auth_headers,
+        )
+        assert response.status_code == 403
+
+    def test_seniors_keep_their_assignment_order(
+        self,
+        client,
+        caregiver_user,
+        senior_user,
+        other_senior_user,
+        caregiver_auth_headers,
+    ):
+        db.session.add(
+            CaregiverAssignment(
+                caregiver_id=caregiver_user.user_id,
+                senior_id=other_senior_user.user_id,
+                created_at=datetime(2020, 1, 1),
+            )
+        )
+        db.session.commit()
+        expected = [other_senior_user.user_id, senior_user.user_id]
+
+        assert list(assigned_senior_ids(caregiver_user.user_id)) == expected
+        response = client.get(
+            "/api/v1/assignment/my-seniors", headers=caregiver_auth_headers
+        )
+        assert [senior["id"] for senior in response.get_json()] == expected
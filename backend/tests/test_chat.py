@@ -0,0 +1,303 @@
+import json
+
+import pytest
+
+from models import ChatSession, ChatTurn, Report, db
+from utils.chat_sessions import (
+    append_exchange,
+    compact_session,
+    context_turns,
+    get_or_create_session,
+)
+
+
+@pytest.fixture
+def long_report(senior_user):
+    filler = " ".join(f"word{i}" for i in range(140))
+    sections = [f"Section {n} {filler}" for n in range(40)]
+    sections[25] = f"Potassium 5.9 mmol/L elevated. {filler}"
+    report = Report(
+        senior_id=senior_user.user_id,
+        original_filename="labs.pdf",
+        stored_filename="labs.pdf",
+        extracted_text="\n\n".join(sections),
+        status="completed",
+    )
+    db.session.add(report)
+    db.session.commit()
+    return report
+
+
+class TestReportChat:
+
+    def test_only_relevant_chunks_are_sent(
+        self, app, client, auth_headers, long_report, mocker
+    ):
+        chat = mocker.patch("routes.chat.chat_with_report", return_value="Answer")
+
+        response = client.post(
+            f"/api/chat/{long_report.report_id}",
+            headers=auth_headers,
+            json={"message": "What was my potassium?"},
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()["response"] == "Answer"
+        excerpts, question, history, summary = chat.call_args.args
+        assert question == "What was my potassium?"
+        assert len(excerpts) == app.config["REPORT_CHAT_TOP_K"]
+        assert any("Potassium 5.9" in e for e in excerpts)
+        assert sum(len(e) for e in excerpts) < len(long_report.extracted_text) / 5
+        assert history == [] and summary is None
+
+    def test_missing_message_is_rejected(self, client, auth_headers, long_report):
+        response = client.post(
+            f"/api/chat/{long_report.report_id}", headers=auth_headers, json={}
+        )
+
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize("path", ["", "/stream"])
+    def test_other_users_reports_are_forbidden(
+        self, client, other_user_auth_headers, long_report, mocker, path
+    ):
+        chat = mocker.patch("routes.chat.chat_with_report", return_value="Answer")
+        stream = mocker.patch("routes.chat.stream_chat_with_report")
+
+        response = client.post(
+            f"/api/chat/{long_report.report_id}{path}",
+            headers=other_user_auth_headers,
+            json={"message": "What was my potassium?"},
+        )
+
+        assert response.status_code == 403
+        chat.assert_not_called()
+        stream.assert_not_called()
+        assert ChatSession.query.count() == 0
+
+
+class TestChatSessions:
+
+    def _ask(self, client, auth_headers, report, message, **extra):
+        return client.post(
+            f"/api/chat/{report.report_id}",
+            headers=auth_headers,
+            json={"message": message, **extra},
+        )
+
+    def test_follow_ups_continue_the_server_side_session(
+        self, client, auth_headers, long_report, mocker
+    ):
+        chat = mocker.patch(
+            "routes.chat.chat_with_report", side_effect=["5.9 mmol/L", "Yes"]
+        )
+
+        first = self._ask(client, auth_headers, long_report, "What was my potassium?")
+        session_id = first.get_json()["session_id"]
+        second = self._ask(
+            client, auth_headers, long_report, "Is that high?", session_id=session_id
+        )
+
+        assert second.get_json()["session_id"] == session_id
+        history = chat.call_args.args[2]
+        assert history == [
+            {"role": "user", "text": "What was my potassium?"},
+            {"role": "model", "text": "5.9 mmol/L"},
+        ]
+        # The previous question steers retrieval for the follow-up.
+        assert any("Potassium 5.9" in e for e in chat.call_args.args[0])
+
+        conversation = client.get(
+            f"/api/chat/{long_report.report_id}", headers=auth_headers
+        ).get_json()
+        assert conversation["session_id"] == session_id
+        assert [m["text"] for m in conversation["messages"]] == [
+            "What was my potassium?",
+            "5.9 mmol/L",
+            "Is that high?",
+            "Yes",
+        ]
+
+    def test_failed_answers_are_not_stored(
+        self, client, auth_headers, long_report, mocker
+    ):
+        mocker.patch(
+            "routes.chat.chat_with_report",
+            return_value="Error: Gemini API is not configured.",
+        )
+
+        self._ask(client, auth_headers, long_report, "Hello?")
+
+        assert ChatTurn.query.count() == 0
+
+    def test_unknown_session_id_is_rejected(
+        self, client, auth_headers, long_report, mocker
+    ):
+        mocker.patch("routes.chat.chat_with_report", return_value="Answer")
+
+        response = self._ask(
+            client, auth_headers, long_report, "Hello?", session_id="nope"
+        )
+
+        assert response.status_code == 404
+
+    def test_sessions_belong_to_the_user_who_started_them(
+        self, client, auth_headers, caregiver_auth_headers, long_report, mocker
+    ):
+        mocker.patch("routes.chat.chat_with_report", side_effect=["Mine", "Theirs"])
+
+        senior_session = self._ask(
+            client, auth_headers, long_report, "Senior question"
+        ).get_json()["session_id"]
+        # The caregiver may read the report but not continue the senior's
+        # conversation.
+        hijack = self._ask(
+            client,
+            caregiver_auth_headers,
+            long_report,
+            "Caregiver question",
+            session_id=senior_session,
+        )
+        assert hijack.status_code == 403
+
+        own = self._ask(
+            client, caregiver_auth_headers, long_report, "Caregiver question"
+        )
+        assert own.status_code == 200
+        assert own.get_json()["session_id"] != senior_session
+        senior_view = client.get(
+            f"/api/chat/{long_report.report_id}", headers=auth_headers
+        ).get_json()
+        assert [m["text"] for m in senior_view["messages"]] == [
+            "Senior question",
+            "Mine",
+        ]
+
+    def test_conversations_of_unviewable_reports_are_forbidden(
+        self, client, other_user_auth_headers, long_report
+    ):
+        response = client.get(
+            f"/api/chat/{long_report.report_id}", headers=other_user_auth_headers
+        )
+
+        assert response.status_code == 403
+
+    def test_long_sessions_queue_compaction(
+        self, app, client, auth_headers, long_report, mocker
+    ):
+        mocker.patch.dict(app.config, {"CHAT_SESSION_MAX_MESSAGES": 4})
+        mocker.patch("routes.chat.chat_with_report", return_value="Answer")
+        delay = mocker.patch("routes.chat.compact_chat_session.delay")
+
+        for n in range(3):
+            self._ask(client, auth_headers, long_report, f"Question {n}")
+
+        session = ChatSession.query.one()
+        delay.assert_called_once_with(session.session_id)
+
+
+class TestCompactSession:
+
+    def test_older_turns_are_folded_into_the_summary(
+        self, app, senior_user, long_report, mocker
+    ):
+        mocker.patch.dict(
+            app.config,
+            {"CHAT_SESSION_MAX_MESSAGES": 4, "CHAT_SESSION_RECENT_MESSAGES": 2},
+        )
+        summarize = mocker.patch(
+            "utils.chat_sessions.summarize_conversation",
+            return_value="Potassium was 5.9.",
+        )
+        session = get_or_create_session(long_report.report_id, senior_user.user_id)
+        for n in range(3):
+            append_exchange(session, f"q{n}", f"a{n}")
+        db.session.commit()
+
+        assert compact_session(session.session_id) is True
+
+        db.session.expire_all()
+        session = db.session.get(ChatSession, session.session_id)
+        assert session.summary == "Potassium was 5.9."
+        assert session.summarized_seq == 4
+        assert context_turns(session) == [
+            {"role": "user", "text": "q2"},
+            {"role": "model", "text": "a2"},
+        ]
+        previous_summary, folded = summarize.call_args.args
+        assert previous_summary is None
+        assert [t["text"] for t in folded] == ["q0", "a0", "q1", "a1"]
+
+    def test_failed_summaries_leave_the_session_unchanged(
+        self, app, senior_user, long_report, mocker
+    ):
+        mocker.patch.dict(app.config, {"CHAT_SESSION_MAX_MESSAGES": 2})
+        mocker.patch(
+            "utils.chat_sessions.summarize_conversation", return_value="Error: quota"
+        )
+        session = get_or_create_session(long_report.report_id, senior_user.user_id)
+        for n in range(2):
+            append_exchange(session, f"q{n}", f"a{n}")
+        db.session.commit()
+
+        assert compact_session(session.session_id) is False
+        assert session.summary is None
+        assert len(context_turns(session)) == 4
+
+
+def _events(response):
+    """(event, data) pairs of a text/event-stream response body."""
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields.get("event"), json.loads(fields["data"])))
+    return events
+
+
+class TestStreamingChat:
+
+    def test_answer_is_streamed_and_recorded(
+        self, client, auth_headers, long_report, mocker
+    ):
+        mocker.patch(
+            "routes.chat.stream_chat_with_report",
+            return_value=iter(["5.9 ", "mmol/L"]),
+        )
+
+        response = client.post(
+            f"/api/chat/{long_report.report_id}/stream",
+            headers=auth_headers,
+            json={"message": "What was my potassium?"},
+        )
+
+        assert response.mimetype == "text/event-stream"
+        events = _events(response)
+        session_id = events[0][1]["session_id"]
+        assert events == [
+            ("session", {"session_id": session_id}),
+            ("answer", {"delta": "5.9 "}),
+            ("answer", {"delta": "mmol/L"}),
+            ("done", {"response": "5.9 mmol/L", "session_id": session_id}),
+        ]
+        assert [t.text for t in ChatTurn.query.order_by(ChatTurn.seq)] == [
+            "What was my potassium?",
+            "5.9 mmol/L",
+        ]
+
+    def test_failed_streams_end_with_an_error_event(
+        self, client, auth_headers, long_report, mocker
+    ):
+        def failing(*args):
+            yield "5.9 "
+            raise RuntimeError("connection reset")
+
+        mocker.patch("routes.chat.stream_chat_with_report", side_effect=failing)
+
+        response = client.post(
+            f"/api/chat/{long_report.report_id}/stream",
+            headers=auth_headers,
+            json={"message": "What was my potassium?"},
+        )
+
+        assert _events(response)[-1][0] == "error"
+        assert ChatTurn.query.count() == 0
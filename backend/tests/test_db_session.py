@@ -0,0 +1,52 @@
+from sqlalchemy import text
+
+from db.db_session import create_db_engine, engine_options
+from models import db
+
+
+def _pragma(connection, name):
+    return connection.execute(text(f"PRAGMA {name}")).scalar()
+
+
+class TestEngineProfile:
+
+    def test_sqlite_connections_use_wal(self, app, tmp_path):
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}", app.config)
+
+        with engine.connect() as connection:
+            assert _pragma(connection, "journal_mode") == "wal"
+            assert _pragma(connection, "synchronous") == 1  # NORMAL
+            assert (
+                _pragma(connection, "busy_timeout")
+                == app.config["DB_SQLITE_BUSY_TIMEOUT_MS"]
+            )
+            assert _pragma(connection, "mmap_size") == app.config["DB_SQLITE_MMAP_SIZE"]
+        engine.dispose()
+
+    def test_wal_can_be_turned_off(self, app, tmp_path):
+        config = {**app.config, "DB_SQLITE_WAL": False}
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}", config)
+
+        with engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        engine.dispose()
+
+    def test_server_databases_get_a_tuned_pool(self, app):
+        options = engine_options("postgresql://db.example/app", app.config)
+
+        assert options == {
+            "pool_size": app.config["DB_POOL_SIZE"],
+            "max_overflow": app.config["DB_MAX_OVERFLOW"],
+            "pool_timeout": app.config["DB_POOL_TIMEOUT_SECONDS"],
+            "pool_recycle": app.config["DB_POOL_RECYCLE_SECONDS"],
+            "pool_pre_ping": True,
+        }
+
+    def test_app_engine_applies_the_pragmas(self, app):
+        busy_timeout = db.session.execute(text("PRAGMA busy_timeout")).scalar()
+
+        assert busy_timeout == app.config["DB_SQLITE_BUSY_TIMEOUT_MS"]
+        assert (
+            app.config["SQLALCHEMY_ENGINE_OPTIONS"]["connect_args"]["check_same_thread"]
+            is False
+        )
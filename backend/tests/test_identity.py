@@ -0,0 +1,62 @@
+import pytest
+from sqlalchemy import event
+
+from models import Role, db
+from utils.identity import resolve_user
+
+
+@pytest.fixture
+def user_selects(app):
+    """Collects SELECT statements that read the user table."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM user" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(db.engine, "before_cursor_execute", record)
+
+
+class TestIdentityResolver:
+
+    def test_authenticated_request_loads_user_once(
+        self, client, auth_headers, user_selects
+    ):
+        db.session.expire_all()
+        response = client.get("/api/v1/medications", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert len(user_selects) == 1
+
+    def test_cross_request_cache_skips_the_query(
+        self, app, client, auth_headers, user_selects, mocker
+    ):
+        mocker.patch.dict(app.config, {"IDENTITY_CACHE_TTL": 60})
+        app.extensions.pop("identity_cache", None)
+        db.session.expire_all()
+
+        client.get("/api/v1/medications", headers=auth_headers)
+        client.get("/api/v1/medications", headers=auth_headers)
+
+        assert len(user_selects) == 1
+        app.extensions.pop("identity_cache", None)
+
+    def test_role_change_invalidates_cached_user(self, app, senior_user, mocker):
+        mocker.patch.dict(app.config, {"IDENTITY_CACHE_TTL": 60})
+        app.extensions.pop("identity_cache", None)
+        with app.test_request_context():
+            resolve_user(senior_user.user_id)
+        cache = app.extensions["identity_cache"]
+        assert cache.get(senior_user.user_id) is not None
+
+        caregiver = Role.query.filter_by(name="caregiver").first() or Role(
+            name="caregiver"
+        )
+        user = db.session.merge(cache.get(senior_user.user_id))
+        user.roles.append(caregiver)
+        db.session.commit()
+
+        assert cache.get(senior_user.user_id) is None
+        app.extensions.pop("identity_cache", None)
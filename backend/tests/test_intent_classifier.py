@@ -0,0 +1,160 @@
+import pytest
+
+from utils import intent_classifier
+from utils.ai_manager import KNOWN_INTENTS
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    intent_classifier.metrics.reset()
+    yield
+    intent_classifier.metrics.reset()
+
+
+class TestRules:
+
+    @pytest.mark.parametrize(
+        "text, intent",
+        [
+            ("When is my next appointment?", "get_next_appointment"),
+            ("upcoming doctor visit", "get_next_appointment"),
+            ("What time do I take my pills?", "get_medication_schedule"),
+            ("What's my next medication?", "get_medication_schedule"),
+            ("Did he take his medicine this week?", "get_medication_history_caregiver"),
+            ("Show me dad's medication history", "get_medication_history_caregiver"),
+            ("Any pending appointments?", "get_pending_appointments_caregiver"),
+            ("appointments this month", "get_pending_appointments_caregiver"),
+            ("Who are my emergency contacts", "get_emergency_contacts"),
+            ("Read me the news", "get_news_summary"),
+            ("Are there any community events?", "get_event_details"),
+            ("How much screen time today?", "get_user_stats"),
+        ],
+    )
+    def test_common_phrasings_are_confident(self, text, intent):
+        matched, confidence = intent_classifier.classify(text)
+
+        assert matched == intent
+        assert confidence >= 0.75
+
+    def test_queries_touching_two_topics_are_not_confident(self):
+        _, confidence = intent_classifier.classify("appointments and pills")
+
+        assert confidence < 0.75
+
+    def test_unrelated_text_matches_nothing(self):
+        assert intent_classifier.classify("Tell me a joke") == (None, 0.0)
+
+    def test_rules_only_produce_known_intents(self):
+        assert {intent for intent, _, _ in intent_classifier.RULES} <= set(
+            KNOWN_INTENTS
+        )
+
+
+class TestClassifyIntent:
+
+    def test_confident_rules_skip_the_llm(self, app, mocker):
+        llm = mocker.patch("utils.intent_classifier.get_query_intent")
+
+        result = intent_classifier.classify_intent("When is my next appointment?")
+
+        assert result == {
+            "intent": "get_next_appointment",
+            "entities": {},
+            "source": "rules",
+        }
+        llm.assert_not_called()
+
+    def test_low_confidence_falls_back_to_the_llm(self, app, mocker):
+        llm = mocker.patch(
+            "utils.intent_classifier.get_query_intent",
+            return_value={"intent": "get_user_stats", "entities": {"name": "Ann"}},
+        )
+
+        result = intent_classifier.classify_intent("How is Ann doing overall?")
+
+        llm.assert_called_once_with("How is Ann doing overall?")
+        assert result["source"] == "llm"
+        assert result["entities"] == {"name": "Ann"}
+
+    def test_metrics_count_rule_hits_and_llm_fallbacks(self, app, mocker):
+        mocker.patch(
+            "utils.intent_classifier.get_query_intent",
+            return_value={"intent": "unknown", "entities": {}},
+        )
+
+        intent_classifier.classify_intent("Read me the news")
+        intent_classifier.classify_intent("Read me the headlines")
+        intent_classifier.classify_intent("Tell me a joke")
+
+        counts = intent_classifier.metrics.snapshot()
+        assert counts["rules"] == 2
+        assert counts["rules:get_news_summary"] == 2
+        assert counts["llm"] == 1
+        assert counts["llm:unknown"] == 1
+        assert counts["rule_hit_rate"] == pytest.approx(2 / 3)
+
+    def test_metrics_are_logged_periodically(self, app, mocker, monkeypatch, capsys):
+        monkeypatch.setitem(app.config, "INTENT_METRICS_LOG_EVERY", 2)
+        mocker.patch(
+            "utils.intent_classifier.get_query_intent",
+            return_value={"intent": "unknown", "entities": {}},
+        )
+
+        intent_classifier.classify_intent("Read me the news")
+        assert "Intent classification" not in capsys.readouterr().out
+
+        intent_classifier.classify_intent("Tell me a joke")
+        assert (
+            "Intent classification: 1 by rules, 1 by the LLM (50% rule hits)"
+            in capsys.readouterr().out
+        )
+
+
+class TestCaregiverChat:
+
+    def test_caregiver_query_is_answered_without_the_llm(
+        self,
+        client,
+        caregiver_auth_headers,
+        senior_user,
+        sample_emergency_contact,
+        mocker,
+    ):
+        llm = mocker.patch("utils.intent_classifier.get_query_intent")
+
+        response = client.post(
+            f"/api/caregiver-chat/{senior_user.user_id}",
+            headers=caregiver_auth_headers,
+            json={"message": "Who are her emergency contacts?"},
+        )
+
+        assert response.status_code == 200
+        assert "Sample Contact" in response.get_json()["response"]
+        llm.assert_not_called()
+
+
+class TestCompoundQuestions:
+
+    @pytest.mark.parametrize(
+        "text, parts",
+        [
+            (
+                "When is his next appointment and has he taken his pills?",
+                ["When is his next appointment", "has he taken his pills"],
+            ),
+            ("Any news? Any events?", ["Any news", "Any events"]),
+            ("pills and tablets", ["pills and tablets"]),
+        ],
+    )
+    def test_split_questions(self, text, parts):
+        assert intent_classifier.split_questions(text) == parts
+
+    def test_unrecognised_parts_are_dropped(self, app, mocker):
+        mocker.patch(
+            "utils.intent_classifier.get_query_intent",
+            return_value={"intent": "unknown", "entities": {}},
+        )
+
+        results = intent_classifier.classify_intents("Read me the news? Tell a joke")
+
+        assert [r["intent"] for r in results] == ["get_news_summary"]
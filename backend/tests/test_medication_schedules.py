@@ -0,0 +1,235 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytz
+from sqlalchemy import event
+
+import tasks
+from models import Medication, MedicationSchedule, ScheduledReminder, db
+from utils.medication_schedule import (
+    SCHEDULE_TZ,
+    create_schedule,
+    extend_schedules,
+    reminder_key,
+    stop_schedule,
+)
+
+NOW = datetime(2030, 1, 1, 6, 0)
+TWICE_DAILY_30_DAYS = "FREQ=DAILY;BYHOUR=8,20;BYMINUTE=0;BYSECOND=0;COUNT=60"
+
+
+def _doses(schedule_id):
+    return (
+        Medication.query.filter_by(schedule_id=schedule_id)
+        .order_by(Medication.time)
+        .all()
+    )
+
+
+class TestExpansion:
+
+    def test_doses_are_created_up_to_the_horizon(self, app, senior_user):
+        schedule, added = create_schedule(
+            senior_user.user_id, "Metformin", "500mg", TWICE_DAILY_30_DAYS, NOW, now=NOW
+        )
+        db.session.commit()
+
+        horizon = app.config["MEDICATION_SCHEDULE_HORIZON_DAYS"]
+        doses = _doses(schedule.schedule_id)
+        assert added == len(doses) == 2 * horizon
+        # 20:00 and 08:00 IST, stored as UTC
+        assert [dose.time for dose in doses[:3]] == [
+            datetime(2030, 1, 1, 14, 30),
+            datetime(2030, 1, 2, 2, 30),
+            datetime(2030, 1, 2, 14, 30),
+        ]
+        assert schedule.expanded_until == NOW + timedelta(days=horizon)
+
+        reminders = ScheduledReminder.query.filter(
+            ScheduledReminder.dedupe_key.in_(
+                [reminder_key(dose.medication_id) for dose in doses]
+            )
+        ).all()
+        assert len(reminders) == len(doses)
+        assert {r.due_at for r in reminders} == {dose.time for dose in doses}
+
+    def test_doses_are_written_in_one_insert(self, senior_user):
+        inserts = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("INSERT INTO medication "):
+                inserts.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            create_schedule(
+                senior_user.user_id,
+                "Metformin",
+                "500mg",
+                TWICE_DAILY_30_DAYS,
+                NOW,
+                now=NOW,
+            )
+            db.session.commit()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+
+        assert len(inserts) == 1
+
+    def test_horizon_rolls_forward_until_the_rule_ends(self, senior_user):
+        schedule, _ = create_schedule(
+            senior_user.user_id, "Metformin", "500mg", TWICE_DAILY_30_DAYS, NOW, now=NOW
+        )
+        db.session.commit()
+
+        extend_schedules(now=NOW + timedelta(days=10))
+        assert len(_doses(schedule.schedule_id)) == 48
+        assert schedule.active is True
+
+        extend_schedules(now=NOW + timedelta(days=20))
+        assert len(_doses(schedule.schedule_id)) == 60
+        assert schedule.active is False
+        assert extend_schedules(now=NOW + timedelta(days=40)) == 0
+
+    def test_past_occurrences_are_skipped(self, senior_user):
+        schedule, _ = create_schedule(
+            senior_user.user_id,
+            "Metformin",
+            "500mg",
+            TWICE_DAILY_30_DAYS,
+            NOW - timedelta(days=5),
+            now=NOW,
+        )
+
+        assert _doses(schedule.schedule_id)[0].time == datetime(2030, 1, 1, 14, 30)
+
+    def test_rule_hours_are_local_time(self, senior_user):
+        schedule, _ = create_schedule(
+            senior_user.user_id,
+            "Metformin",
+            "500mg",
+            "FREQ=DAILY;BYHOUR=8;BYMINUTE=0;BYSECOND=0;COUNT=2",
+            NOW,
+            now=NOW,
+        )
+
+        local = [
+            pytz.utc.localize(dose.time).astimezone(SCHEDULE_TZ)
+            for dose in _doses(schedule.schedule_id)
+        ]
+        assert [(t.day, t.hour, t.minute) for t in local] == [(2, 8, 0), (3, 8, 0)]
+
+    def test_expansion_is_capped(self, app, senior_user):
+        app.config["MEDICATION_SCHEDULE_MAX_DOSES"] = 5
+        try:
+            schedule, added = create_schedule(
+                senior_user.user_id, "Vitamin D", "1 tab", "FREQ=HOURLY", NOW, now=NOW
+            )
+            assert added == 5
+            assert schedule.expanded_until == NOW + timedelta(hours=5)
+
+            extend_schedules(now=NOW)
+        finally:
+            app.config["MEDICATION_SCHEDULE_MAX_DOSES"] = 500
+
+        times = [dose.time for dose in _doses(schedule.schedule_id)]
+        assert times == [NOW + timedelta(hours=hour) for hour in range(10)]
+
+    @pytest.mark.parametrize(
+        "rule",
+        ["FREQ=SOMETIMES", "", "DTSTART:20300101T000000\nRRULE:FREQ=DAILY"],
+    )
+    def test_invalid_rules_are_rejected(self, senior_user, rule):
+        with pytest.raises(ValueError):
+            create_schedule(senior_user.user_id, "Metformin", "500mg", rule, NOW)
+
+    def test_stop_removes_upcoming_doses(self, senior_user):
+        schedule, _ = create_schedule(
+            senior_user.user_id, "Metformin", "500mg", TWICE_DAILY_30_DAYS, NOW, now=NOW
+        )
+        db.session.commit()
+        taken = _doses(schedule.schedule_id)[-1]
+        taken.isTaken = True
+        db.session.commit()
+
+        removed = stop_schedule(schedule, now=NOW + timedelta(days=1))
+        db.session.commit()
+
+        # Two doses were in the past and one was already taken
+        assert removed == 28 - 3
+        assert len(_doses(schedule.schedule_id)) == 3
+        assert ScheduledReminder.query.count() == 3
+        assert extend_schedules(now=NOW + timedelta(days=20)) == 0
+
+
+class TestMedicationSchedulesAPI:
+
+    def _post(self, client, headers, **overrides):
+        payload = {
+            "name": "Metformin",
+            "dosage": "500mg",
+            "rrule": "RRULE:FREQ=DAILY;BYHOUR=9;BYMINUTE=0;COUNT=3",
+            "start": (datetime.now() + timedelta(days=1)).isoformat(),
+            **overrides,
+        }
+        return client.post(
+            "/api/v1/medications/schedules", json=payload, headers=headers
+        )
+
+    def test_create_list_and_stop(self, client, auth_headers, senior_user):
+        response = self._post(client, auth_headers)
+
+        assert response.status_code == 201
+        body = response.get_json()
+        assert body["doses_created"] == 3
+        medications = client.get("/api/v1/medications", headers=auth_headers)
+        assert len(medications.get_json()) == 3
+
+        schedules = client.get("/api/v1/medications/schedules", headers=auth_headers)
+        assert [s["schedule_id"] for s in schedules.get_json()] == [body["schedule_id"]]
+
+        response = client.delete(
+            f"/api/v1/medications/schedules/{body['schedule_id']}",
+            headers=auth_headers,
+        )
+        assert response.status_code == 200
+        assert response.get_json()["doses_removed"] == 3
+        assert Medication.query.count() == 0
+
+    def test_invalid_rule_is_a_bad_request(self, client, auth_headers, senior_user):
+        response = self._post(client, auth_headers, rrule="FREQ=SOMETIMES")
+
+        assert response.status_code == 400
+        assert MedicationSchedule.query.count() == 0
+
+    def test_deleting_a_schedule_keeps_its_doses(self):
+        # SQLite is not run with foreign keys enforced, so check the DDL.
+        (key,) = Medication.__table__.c.schedule_id.foreign_keys
+
+        assert key.ondelete == "SET NULL"
+
+    def test_unknown_schedule_is_not_found(self, client, auth_headers, senior_user):
+        response = client.delete(
+            "/api/v1/medications/schedules/00000000-0000-0000-0000-000000000000",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == 404
+
+
+class TestExtendMedicationSchedulesTask:
+
+    def test_task_extends_active_schedules(self, app, mocker, senior_user):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        start = datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+        schedule, _ = create_schedule(
+            senior_user.user_id, "Metformin", "500mg", "FREQ=DAILY", start, now=start
+        )
+        schedule.expanded_until = start
+        Medication.query.delete()
+        db.session.commit()
+
+        tasks.extend_medication_schedules()
+
+        horizon = app.config["MEDICATION_SCHEDULE_HORIZON_DAYS"]
+        assert len(_doses(schedule.schedule_id)) in (horizon, horizon + 1)
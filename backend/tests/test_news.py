@@ -1,5 +1,13 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
 from flask_smorest import abort
 
+from utils.cache import TTLCache
+
 
 class TestDatabaseConfiguration:
 
@@ -85,3 +93,110 @@ class TestNewsAPI:
         assert response.status_code == 502
         data = response.get_json()
         assert data.get("message") == "Failed to fetch news from NewsAPI."
+
+
+class TestNewsCache:
+
+    def _fake_headlines(self, params, timeout=5):
+        return {"status": "ok", "totalResults": 0, "articles": []}
+
+    def test_repeated_queries_hit_newsapi_once(self, app, client, auth_headers, mocker):
+        mocker.patch.dict(app.config, {"NEWSAPI_KEY": "test-key"})
+        fetch = mocker.patch(
+            "routes.news.fetch_top_headlines", side_effect=self._fake_headlines
+        )
+
+        for url in ("/api/v1/news/?q=Diabetes", "/api/v1/news/?q=%20diabetes%20"):
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+
+        assert fetch.call_count == 1
+
+    def test_upstream_errors_are_not_cached(self, app, client, auth_headers, mocker):
+        mocker.patch.dict(app.config, {"NEWSAPI_KEY": "test-key"})
+        mocker.patch(
+            "routes.news.fetch_top_headlines",
+            side_effect=[requests.ConnectionError("down"), self._fake_headlines({})],
+        )
+
+        assert client.get("/api/v1/news/", headers=auth_headers).status_code == 502
+        assert client.get("/api/v1/news/", headers=auth_headers).status_code == 200
+
+    def test_concurrent_misses_are_coalesced(self):
+        cache = TTLCache(ttl=60)
+        release = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "headlines"
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [
+                pool.submit(cache.get_or_load, "general", loader) for _ in range(5)
+            ]
+            time.sleep(0.1)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert results == ["headlines"] * 5
+        assert len(calls) == 1
+
+    def test_stale_entry_is_served_while_refreshing(self, mocker):
+        cache = TTLCache(ttl=1, stale_ttl=60)
+        cache.set("general", "old")
+        mocker.patch("utils.cache.time.time", return_value=time.time() + 5)
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return "new"
+
+        assert cache.get_or_load("general", loader) == "old"
+        assert refreshed.wait(timeout=5)
+
+
+class TestSharedCacheLoading:
+
+    @pytest.fixture
+    def server(self, fake_redis):
+        return fake_redis
+
+    def test_waiters_use_the_lock_holders_result(self, server):
+        holder = TTLCache(ttl=60, redis_url="redis://shared")
+        waiter = TTLCache(ttl=60, redis_url="redis://shared")
+        server.set("cache:general:lock", "holder-token")
+        loader = []
+
+        def finish_elsewhere():
+            time.sleep(0.1)
+            holder.set("general", "headlines")
+            server.delete("cache:general:lock")
+
+        threading.Thread(target=finish_elsewhere).start()
+
+        assert waiter.get_or_load("general", lambda: loader.append(1)) == "headlines"
+        assert loader == []
+
+    def test_value_stored_before_the_lock_is_acquired_is_reused(self, server, mocker):
+        cache = TTLCache(ttl=60, redis_url="redis://shared")
+        # Another process stores the value between our miss and our lock.
+        mocker.patch.object(
+            cache, "_read", side_effect=[None, ("headlines", time.time())]
+        )
+        loader = mocker.Mock(return_value="fresh")
+
+        assert cache.get_or_load("general", loader) == "headlines"
+        loader.assert_not_called()
+
+    def test_lock_taken_over_meanwhile_is_not_released(self, server):
+        cache = TTLCache(ttl=60, redis_url="redis://shared")
+
+        def slow_loader():
+            # Our lock expired and another process acquired it.
+            server.data["cache:general:lock"] = b"other-token"
+            return "headlines"
+
+        assert cache.get_or_load("general", slow_loader) == "headlines"
+        assert server.get("cache:general:lock") == b"other-token"
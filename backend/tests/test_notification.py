@@ -0,0 +1,91 @@
+import smtplib
+
+import utils.notification as notification
+from extensions import mail
+
+
+class TestSendMany:
+
+    def _messages(self):
+        return [
+            {"channel": "email", "to": "a@example.com", "subject": "Hi", "body": "1"},
+            {"channel": "sms", "to": "+15550001", "subject": "Hi", "body": "2"},
+            {"channel": "email", "to": "b@example.com", "subject": "Hi", "body": "3"},
+        ]
+
+    def test_emails_share_one_smtp_session(self, app, mocker):
+        mocker.patch.dict(app.config, {"MAIL_DEFAULT_SENDER": "care@example.com"})
+        connect = mocker.spy(notification, "_connect")
+        mocker.patch("utils.notification.send_sms", return_value=True)
+
+        with mail.record_messages() as outbox:
+            results = notification.send_many(app, self._messages())
+
+        assert results == [True, True, True]
+        assert connect.call_count == 1
+        assert [m.recipients for m in outbox] == [["a@example.com"], ["b@example.com"]]
+
+    def test_reconnects_once_when_server_drops(self, app, mocker):
+        mocker.patch.dict(app.config, {"MAIL_DEFAULT_SENDER": "care@example.com"})
+        mocker.patch("utils.notification.send_sms", return_value=True)
+        sent = []
+
+        class FlakyConnection:
+            drops = 1
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def send(self, msg):
+                if FlakyConnection.drops:
+                    FlakyConnection.drops -= 1
+                    raise smtplib.SMTPServerDisconnected("gone")
+                sent.append(msg.recipients[0])
+
+        connect = mocker.patch.object(
+            notification, "_connect", return_value=FlakyConnection()
+        )
+
+        results = notification.send_many(app, self._messages())
+
+        assert results == [True, True, True]
+        assert connect.call_count == 2
+        assert sent == ["a@example.com", "b@example.com"]
+
+    def test_smtp_socket_has_a_timeout(self, app, mocker):
+        mocker.patch.dict(app.config, {"MAIL_DEFAULT_SENDER": "care@example.com"})
+        mocker.patch.object(app.extensions["mail"], "suppress", False)
+        smtp = mocker.patch("utils.notification.smtplib.SMTP")
+
+        with app.app_context():
+            assert notification.send_email(app, "a@example.com", "Hi", "1", timeout=3)
+
+        assert smtp.call_args.kwargs["timeout"] == 3
+
+    def test_twilio_requests_have_a_timeout(self, mocker, monkeypatch):
+        monkeypatch.setenv("TWILIO_ACCOUNT_SID", "AC123")
+        monkeypatch.setenv("TWILIO_AUTH_TOKEN", "token")
+        monkeypatch.setenv("TWILIO_PHONE_NUMBER", "+15550000")
+        monkeypatch.setattr(notification, "_twilio_client", None)
+        mocker.patch("utils.notification.Client")
+        http_client = mocker.patch("utils.notification.TwilioHttpClient")
+
+        notification.send_sms("+15550001", "one", timeout=4)
+
+        assert http_client.call_args.kwargs["timeout"] == 4
+
+    def test_twilio_client_is_reused(self, mocker, monkeypatch):
+        monkeypatch.setenv("TWILIO_ACCOUNT_SID", "AC123")
+        monkeypatch.setenv("TWILIO_AUTH_TOKEN", "token")
+        monkeypatch.setenv("TWILIO_PHONE_NUMBER", "+15550000")
+        monkeypatch.setattr(notification, "_twilio_client", None)
+        client_cls = mocker.patch("utils.notification.Client")
+
+        assert notification.send_sms("+15550001", "one") is True
+        assert notification.send_sms("+15550002", "two") is True
+
+        assert client_cls.call_count == 1
+        assert client_cls.return_value.messages.create.call_count == 2
@@ -0,0 +1,177 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+import tasks
+from models import NotificationOutbox, db
+from utils import outbox
+from utils.outbox import (
+    claim_batch,
+    drain_outbox,
+    enqueue_notifications,
+    prune_outbox,
+)
+
+
+def _message(to, channel="sms", key=None):
+    message = {"channel": channel, "to": to, "subject": "Hi", "body": f"to {to}"}
+    if key:
+        message["dedupe_key"] = key
+    return message
+
+
+class TestNotificationOutbox:
+
+    def test_enqueue_skips_duplicate_keys(self, app):
+        assert enqueue_notifications([_message("+1", key="dose:1:sms")]) == 1
+        db.session.commit()
+
+        assert (
+            enqueue_notifications(
+                [_message("+1", key="dose:1:sms"), _message("+2", key="dose:2:sms")]
+            )
+            == 1
+        )
+        db.session.commit()
+        assert NotificationOutbox.query.count() == 2
+
+    @pytest.mark.parametrize("on_conflict", [True, False])
+    def test_duplicates_do_not_undo_the_callers_changes(
+        self, app, monkeypatch, on_conflict
+    ):
+        if not on_conflict:
+            monkeypatch.delitem(outbox._CONFLICT_INSERTS, "sqlite")
+        # A concurrent producer committed the same key first.
+        enqueue_notifications([_message("+1", key="dose:1:sms")])
+        db.session.commit()
+
+        enqueue_notifications([_message("a@example.com", "email", key="audit")])
+        added = enqueue_notifications(
+            [_message("+1", key="dose:1:sms"), _message("+2", key="dose:2:sms")]
+        )
+        db.session.commit()
+
+        assert added == 1
+        assert sorted(r.dedupe_key for r in NotificationOutbox.query) == [
+            "audit",
+            "dose:1:sms",
+            "dose:2:sms",
+        ]
+
+    def test_prune_deletes_only_old_finished_rows(self, app):
+        now = datetime.now()
+        old = now - timedelta(days=app.config["OUTBOX_RETENTION_DAYS"] + 1)
+        for key, status, sent_at, next_attempt_at in [
+            ("old-sent", "sent", old, old),
+            ("old-failed", "failed", None, old),
+            ("recent-sent", "sent", now, old),
+            ("old-pending", "pending", None, old),
+        ]:
+            enqueue_notifications([_message("+1", key=key)])
+            db.session.execute(
+                update(NotificationOutbox)
+                .where(NotificationOutbox.dedupe_key == key)
+                .values(status=status, sent_at=sent_at, next_attempt_at=next_attempt_at)
+            )
+        db.session.commit()
+
+        assert prune_outbox(now=now, batch_size=1) == 2
+        assert sorted(r.dedupe_key for r in NotificationOutbox.query) == [
+            "old-pending",
+            "recent-sent",
+        ]
+
+    def test_rows_are_claimed_once_per_channel(self, app):
+        enqueue_notifications([_message("+1"), _message("a@example.com", "email")])
+        db.session.commit()
+
+        claimed = claim_batch("sms")
+        assert [r.recipient for r in claimed] == ["+1"]
+        assert claim_batch("sms") == []
+        assert [r.recipient for r in claim_batch("email")] == ["a@example.com"]
+
+    def test_drain_marks_sent_and_backs_off_failures(self, app):
+        enqueue_notifications([_message("+1"), _message("+2")])
+        db.session.commit()
+
+        sent = drain_outbox("sms", lambda messages: [m["to"] == "+1" for m in messages])
+
+        assert sent == 1
+        ok = NotificationOutbox.query.filter_by(recipient="+1").one()
+        retry = NotificationOutbox.query.filter_by(recipient="+2").one()
+        assert ok.status == "sent" and ok.sent_at is not None
+        assert retry.status == "pending" and retry.attempts == 1
+        assert retry.next_attempt_at > datetime.utcnow()
+
+    def test_gives_up_after_max_attempts(self, app, mocker):
+        mocker.patch.dict(app.config, {"OUTBOX_MAX_ATTEMPTS": 2})
+        enqueue_notifications([_message("+1")])
+        db.session.commit()
+
+        later = datetime.utcnow()
+        for _ in range(2):
+            drain_outbox("sms", lambda messages: [False] * len(messages), now=later)
+            later += timedelta(hours=1)
+
+        row = NotificationOutbox.query.one()
+        assert row.status == "failed"
+        assert row.attempts == 2
+
+    def test_rows_taken_over_meanwhile_are_left_alone(self, app):
+        enqueue_notifications([_message("+1")])
+        db.session.commit()
+
+        def send_while_claim_times_out(messages):
+            # The claim went stale and another dispatcher took the row over.
+            db.session.execute(
+                update(NotificationOutbox).values(claim_token="another-dispatcher")
+            )
+            db.session.commit()
+            return [False] * len(messages)
+
+        drain_outbox("sms", send_while_claim_times_out)
+
+        row = NotificationOutbox.query.one()
+        assert row.status == "claimed"
+        assert row.claim_token == "another-dispatcher"
+
+    def test_sends_are_paced_in_chunks_of_the_rate(self, app, mocker):
+        mocker.patch.dict(app.config, {"OUTBOX_RATE_LIMITS": {"sms": 2}})
+        sleep = mocker.patch("utils.outbox.time.sleep")
+        enqueue_notifications([_message(f"+{n}") for n in range(5)])
+        db.session.commit()
+        chunks = []
+
+        def send_batch(messages):
+            chunks.append(len(messages))
+            return [True] * len(messages)
+
+        assert drain_outbox("sms", send_batch) == 5
+        assert chunks == [2, 2, 1]
+        # The clock is not advanced, so each later chunk waits for its slot.
+        assert [round(c.args[0]) for c in sleep.call_args_list] == [1, 2]
+
+    def test_dispatch_task_sends_over_send_many(self, app, mocker):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        send_many = mocker.patch(
+            "tasks.send_many", side_effect=lambda app, ms: [True] * len(ms)
+        )
+        enqueue_notifications([_message("a@example.com", "email") for _ in range(3)])
+        db.session.commit()
+
+        assert tasks.dispatch_outbox("email") == 3
+        assert send_many.call_count == 1
+        assert NotificationOutbox.query.filter_by(status="sent").count() == 3
+
+    def test_appointment_reminders_are_queued_once(self, app, mocker, senior_user):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        mocker.patch("tasks.socketio.emit")
+        args = ("a-1", "Check-up", "Clinic", "2030-01-01T09:00:00", senior_user.email)
+
+        tasks.send_reminder_notification(*args)
+        queued = NotificationOutbox.query.count()
+        tasks.send_reminder_notification(*args)
+
+        assert queued > 0
+        assert NotificationOutbox.query.count() == queued
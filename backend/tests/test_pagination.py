@@ -0,0 +1,171 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import Event, Medication, db
+from utils.pagination import NEXT_CURSOR_HEADER
+
+
+def _add_medications(senior_id, count, start=None):
+    start = start or datetime(2025, 1, 1, 8, 0)
+    for index in range(count):
+        db.session.add(
+            Medication(
+                name=f"Medication {index}",
+                dosage="10mg",
+                # Pairs share a time, so the id has to break ties.
+                time=start + timedelta(hours=index // 2),
+                isTaken=False,
+                senior_id=senior_id,
+            )
+        )
+    db.session.commit()
+
+
+def _all_pages(client, path, headers, **params):
+    items, pages = [], 0
+    while True:
+        response = client.get(path, headers=headers, query_string=params)
+        assert response.status_code == 200
+        items.extend(response.get_json())
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if not cursor:
+            return items, pages
+        params["cursor"] = cursor
+
+
+class TestKeysetPages:
+
+    def test_pages_cover_every_row_once_in_order(
+        self, client, auth_headers, senior_user
+    ):
+        _add_medications(senior_user.user_id, 7)
+
+        items, pages = _all_pages(client, "/api/v1/medications", auth_headers, limit=3)
+
+        assert pages == 3
+        assert len({item["medication_id"] for item in items}) == 7
+        keys = [(item["time"], item["medication_id"]) for item in items]
+        assert keys == sorted(keys)
+
+    def test_last_page_has_no_cursor(self, client, auth_headers, sample_medication):
+        response = client.get("/api/v1/medications?limit=1", headers=auth_headers)
+
+        assert len(response.get_json()) == 1
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+    def test_limit_is_capped(self, app, client, auth_headers, senior_user):
+        _add_medications(senior_user.user_id, 4)
+        app.config["PAGINATION_MAX_LIMIT"] = 2
+        try:
+            response = client.get("/api/v1/medications?limit=50", headers=auth_headers)
+        finally:
+            app.config["PAGINATION_MAX_LIMIT"] = 500
+
+        assert len(response.get_json()) == 2
+        assert NEXT_CURSOR_HEADER in response.headers
+
+    def test_unpaginated_requests_get_every_row(
+        self, app, client, auth_headers, senior_user, monkeypatch
+    ):
+        _add_medications(senior_user.user_id, 5)
+        monkeypatch.setitem(app.config, "PAGINATION_DEFAULT_LIMIT", 2)
+
+        response = client.get("/api/v1/medications", headers=auth_headers)
+
+        assert len(response.get_json()) == 5
+        assert NEXT_CURSOR_HEADER not in response.headers
+
+    def test_cursor_without_limit_uses_the_default_page_size(
+        self, app, client, auth_headers, senior_user, monkeypatch
+    ):
+        _add_medications(senior_user.user_id, 5)
+        monkeypatch.setitem(app.config, "PAGINATION_DEFAULT_LIMIT", 2)
+        first = client.get("/api/v1/medications?limit=1", headers=auth_headers)
+
+        response = client.get(
+            "/api/v1/medications",
+            headers=auth_headers,
+            query_string={"cursor": first.headers[NEXT_CURSOR_HEADER]},
+        )
+
+        assert len(response.get_json()) == 2
+        assert NEXT_CURSOR_HEADER in response.headers
+
+    def test_events_page_by_date(self, client, auth_headers, provider_user):
+        start = datetime(2025, 8, 1, 14, 0, tzinfo=timezone.utc)
+        for day in (3, 1, 2):
+            db.session.add(
+                Event(
+                    name=f"Day {day}",
+                    date_time=start + timedelta(days=day),
+                    location="Hall",
+                    service_provider_id=provider_user.user_id,
+                )
+            )
+        db.session.commit()
+
+        items, _ = _all_pages(client, "/api/v1/events", auth_headers, limit=2)
+
+        # Events are not cleaned between tests, so only check our own.
+        assert len({item["event_id"] for item in items}) == len(items)
+        assert [item["name"] for item in items if item["name"].startswith("Day ")] == [
+            "Day 1",
+            "Day 2",
+            "Day 3",
+        ]
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", "bm90LWpzb24", "WzFd"])
+    def test_invalid_cursor(self, client, auth_headers, senior_user, cursor):
+        response = client.get(
+            "/api/v1/medications", headers=auth_headers, query_string={"cursor": cursor}
+        )
+
+        assert response.status_code == 400
+
+
+class TestFieldsAndUpdatedSince:
+
+    def test_fields_selects_attributes(self, client, auth_headers, sample_medication):
+        response = client.get(
+            "/api/v1/medications?fields=name,time", headers=auth_headers
+        )
+
+        assert response.status_code == 200
+        assert set(response.get_json()[0]) == {"name", "time"}
+
+    def test_unknown_field_is_rejected(self, client, auth_headers, sample_medication):
+        response = client.get(
+            "/api/v1/medications?fields=name,password", headers=auth_headers
+        )
+
+        assert response.status_code == 400
+        assert "password" in response.get_json()["message"]
+
+    def test_updated_since_returns_changed_rows(
+        self, client, auth_headers, senior_user
+    ):
+        _add_medications(senior_user.user_id, 2)
+        old, changed = Medication.query.order_by(Medication.medication_id).all()
+        old.updated_at = datetime(2025, 1, 1)
+        changed.updated_at = datetime(2025, 6, 1)
+        db.session.commit()
+
+        response = client.get(
+            "/api/v1/medications",
+            headers=auth_headers,
+            query_string={"updated_since": "2025-03-01T00:00:00Z"},
+        )
+
+        assert [item["medication_id"] for item in response.get_json()] == [
+            changed.medication_id
+        ]
+
+    def test_updates_bump_updated_at(self, client, auth_headers, sample_medication):
+        before = sample_medication.updated_at
+
+        sample_medication.dosage = "20mg"
+        db.session.commit()
+
+        assert sample_medication.updated_at > before
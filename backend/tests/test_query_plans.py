@@ -0,0 +1,112 @@
+import re
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+import tasks
+from models import EmergencyContact, db
+from utils.action_resolver import resolve_actions
+
+# Tables that grow with the number of users and must never be read in full.
+HOT_TABLES = {
+    "medication",
+    "appointment",
+    "emergency_contact",
+    "caregiver_assignment",
+    "event",
+    "alert",
+    "report",
+}
+
+# Any SCAN of a table, whether of the table itself or of one of its indexes
+# (partial ones included), reads it from one end; only a SEARCH seeks.
+_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+@contextmanager
+def query_plans():
+    """Collects the SQLite query plan of every SELECT run inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    plans = []
+    try:
+        yield plans
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    connection = db.session.connection()
+    for statement, parameters in statements:
+        rows = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ).fetchall()
+        plans.append((statement, [row[-1] for row in rows]))
+
+
+def full_scans(plans):
+    """
+    (table, statement) for every hot table a plan walks instead of seeking
+    into with SEARCH ... USING INDEX.
+    """
+    scans = []
+    for statement, steps in plans:
+        for step in steps:
+            match = _SCAN.match(step)
+            if match and match.group(1) in HOT_TABLES:
+                scans.append((match.group(1), statement))
+    return scans
+
+
+class TestHotQueryPlans:
+
+    @pytest.fixture(autouse=True)
+    def _patch_tasks(self, app, mocker):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        mocker.patch("tasks.socketio.emit")
+
+    def test_missed_medication_sweep(self, caregiver_user, sample_medication):
+        with query_plans() as plans:
+            tasks.check_missed_medications()
+
+        assert plans
+        assert full_scans(plans) == []
+
+    def test_missed_appointment_sweep(self, caregiver_user, sample_appointment):
+        with query_plans() as plans:
+            tasks.check_missed_appointments()
+            # The second run is incremental and also checks late writes
+            tasks.check_missed_appointments()
+
+        assert plans
+        assert full_scans(plans) == []
+
+    def test_senior_context_and_event_lookups(self, senior_user):
+        senior_id = senior_user.user_id
+
+        with query_plans() as plans:
+            resolve_actions(["get_next_appointment", "get_event_details"], senior_id)
+
+        assert len(plans) == 7
+        assert full_scans(plans) == []
+
+    def test_per_senior_lists(self, client, auth_headers, senior_user):
+        with query_plans() as plans:
+            for path in (
+                "/api/v1/medications",
+                "/api/v1/appointments",
+                "/api/v1/emergency-contacts",
+            ):
+                assert client.get(path, headers=auth_headers).status_code == 200
+
+        assert full_scans(plans) == []
+
+    def test_unindexed_lookups_are_reported(self, app):
+        with query_plans() as plans:
+            EmergencyContact.query.filter_by(phone="+15550100").all()
+
+        assert [table for table, _ in full_scans(plans)] == ["emergency_contact"]
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+from models import ScheduledReminder, db
+from utils.reminder_scheduler import (
+    cancel_reminder,
+    claim_due_reminders,
+    dispatch_reminders,
+    prune_dispatched_reminders,
+    schedule_reminder,
+)
+
+
+def _schedule(key, due_at):
+    schedule_reminder(key, "tasks.send_medication_reminder", [key], due_at)
+    db.session.commit()
+
+
+class TestReminderScheduler:
+
+    def test_reschedule_updates_existing_row(self, app):
+        now = datetime.now()
+        _schedule("medication:1", now + timedelta(hours=1))
+        _schedule("medication:1", now + timedelta(hours=2))
+
+        reminders = ScheduledReminder.query.filter_by(dedupe_key="medication:1").all()
+        assert len(reminders) == 1
+        assert reminders[0].due_at == now + timedelta(hours=2)
+
+    def test_claims_only_due_rows_once(self, app):
+        now = datetime.now()
+        _schedule("medication:due", now - timedelta(minutes=1))
+        _schedule("medication:future", now + timedelta(hours=1))
+
+        claimed = claim_due_reminders(now=now)
+        assert [r.dedupe_key for r in claimed] == ["medication:due"]
+        assert claim_due_reminders(now=now) == []
+
+    def test_dispatch_marks_rows_and_calls_send(self, app):
+        now = datetime.now()
+        for i in range(5):
+            _schedule(f"medication:{i}", now - timedelta(minutes=i))
+
+        sent = []
+        count = dispatch_reminders(
+            lambda name, args: sent.append((name, args)), now=now, batch_size=2
+        )
+
+        assert count == 5
+        assert len(sent) == 5
+        assert ScheduledReminder.query.filter_by(status="dispatched").count() == 5
+
+    def test_failed_send_is_reclaimed_after_timeout(self, app):
+        now = datetime.now()
+        _schedule("medication:flaky", now - timedelta(minutes=1))
+
+        def failing_send(name, args):
+            raise RuntimeError("broker down")
+
+        assert dispatch_reminders(failing_send, now=now) == 0
+        assert claim_due_reminders(now=now) == []
+
+        later = now + timedelta(seconds=app.config["REMINDER_CLAIM_TIMEOUT_SECONDS"])
+        reclaimed = claim_due_reminders(now=later)
+        assert [r.dedupe_key for r in reclaimed] == ["medication:flaky"]
+        assert reclaimed[0].attempts == 2
+
+    def test_cancel_removes_row(self, app):
+        _schedule("medication:cancel", datetime.now() + timedelta(hours=1))
+        assert cancel_reminder("medication:cancel") is True
+        db.session.commit()
+        assert ScheduledReminder.query.count() == 0
+
+    def test_prune_deletes_only_old_dispatched_rows(self, app):
+        now = datetime.now()
+        retention = timedelta(days=app.config["REMINDER_RETENTION_DAYS"])
+        for i in range(3):
+            _schedule(f"medication:old:{i}", now - retention - timedelta(hours=i + 1))
+        _schedule("medication:recent", now - timedelta(hours=1))
+        dispatch_reminders(lambda name, args: None, now=now)
+        _schedule("medication:pending", now - retention - timedelta(days=1))
+
+        assert prune_dispatched_reminders(now=now, batch_size=2) == 3
+        assert sorted(r.dedupe_key for r in ScheduledReminder.query) == [
+            "medication:pending",
+            "medication:recent",
+        ]
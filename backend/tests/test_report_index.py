@@ -0,0 +1,87 @@
+import tasks
+from models import Report, ReportIndex, db
+from utils import report_index
+from utils.report_cache import sha256_text
+
+
+def _report(sections):
+    filler = " ".join(f"word{i}" for i in range(140))
+    return "\n\n".join(f"{section} {filler}" for section in sections)
+
+
+class TestChunking:
+
+    def test_chunks_overlap_and_cover_the_text(self):
+        text = " ".join(str(i) for i in range(400))
+
+        chunks = report_index.chunk_text(text, chunk_words=150, overlap_words=30)
+
+        assert len(chunks) == 4
+        assert chunks[0].split()[-30:] == chunks[1].split()[:30]
+        assert chunks[-1].split()[-1] == "399"
+
+    def test_empty_text_has_no_chunks(self):
+        assert report_index.chunk_text("   ") == []
+
+
+class TestSearch:
+
+    def test_returns_the_most_relevant_chunks_in_document_order(self):
+        text = _report(
+            [
+                "Haemoglobin 13.5 g/dL normal.",
+                "Cholesterol total 240 mg/dL high, LDL cholesterol 160 mg/dL.",
+                "Thyroid TSH 2.1 normal.",
+                "Vitamin D 18 ng/mL low.",
+                "Cholesterol advice: reduce saturated fat.",
+            ]
+        )
+        index = report_index.build_index(text, chunk_words=150, overlap_words=0)
+
+        hits = report_index.search(index, "Is my cholesterol high?", k=2)
+
+        assert len(hits) == 2
+        assert hits[0].startswith("Cholesterol total")
+        assert hits[1].startswith("Cholesterol advice")
+
+    def test_unmatched_question_falls_back_to_the_opening_chunks(self):
+        index = report_index.build_index(
+            _report(["First.", "Second.", "Third."]), overlap_words=0
+        )
+
+        hits = report_index.search(index, "zzz", k=2)
+
+        assert [h.split()[0] for h in hits] == ["First.", "Second."]
+
+
+class TestIndexForText:
+
+    def test_index_is_built_once_and_persisted(self, app, mocker):
+        text = _report(["Glucose 110 mg/dL."])
+        build = mocker.spy(report_index, "build_index")
+
+        first = report_index.index_for_text(text)
+        second = report_index.index_for_text(text)
+
+        assert first == second
+        assert build.call_count == 1
+        assert db.session.get(ReportIndex, sha256_text(text)) is not None
+
+    def test_index_report_task_indexes_completed_reports(
+        self, app, senior_user, mocker
+    ):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        text = _report(["Sodium 140 mmol/L."])
+        report = Report(
+            senior_id=senior_user.user_id,
+            original_filename="labs.pdf",
+            stored_filename="labs.pdf",
+            extracted_text=text,
+            status="completed",
+        )
+        db.session.add(report)
+        db.session.commit()
+
+        assert tasks.index_report(report.report_id) == report.report_id
+        db.session.expire_all()
+        assert db.session.get(ReportIndex, sha256_text(text)) is not None
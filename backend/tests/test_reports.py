@@ -0,0 +1,354 @@
+import hashlib
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+from sqlalchemy import select, update
+
+import tasks
+from models import ExtractedTextCache, Report, SummaryCache, db
+from utils.ai_manager import PROMPT_VERSION
+from utils.report_cache import sha256_text
+
+
+@pytest.fixture
+def report_folder(app, tmp_path, mocker):
+    mocker.patch.dict(app.config, {"REPORT_UPLOAD_FOLDER": str(tmp_path)})
+    return tmp_path
+
+
+@pytest.fixture
+def processing_report(senior_user, report_folder):
+    (report_folder / "abc_report.pdf").write_bytes(b"%PDF-1.4")
+    report = Report(
+        senior_id=senior_user.user_id,
+        original_filename="report.pdf",
+        stored_filename="abc_report.pdf",
+        status="processing",
+    )
+    db.session.add(report)
+    db.session.commit()
+    return report
+
+
+class TestReportUpload:
+
+    def test_upload_returns_202_and_queues_pipeline(
+        self, client, auth_headers, report_folder, mocker
+    ):
+        chain = mocker.patch("routes.reports.chain")
+
+        response = client.post(
+            "/api/reports/summarize",
+            headers=auth_headers,
+            data={"file": (io.BytesIO(b"%PDF-1.4"), "blood test.pdf")},
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 202
+        report = response.get_json()["report"]
+        assert report["status"] == "processing"
+        assert response.headers["Location"].endswith(
+            f"/api/reports/{report['report_id']}"
+        )
+        chain.return_value.apply_async.assert_called_once()
+        assert len(list(report_folder.iterdir())) == 1
+
+    def test_rejects_disallowed_file_type(self, client, auth_headers, report_folder):
+        response = client.post(
+            "/api/reports/summarize",
+            headers=auth_headers,
+            data={"file": (io.BytesIO(b"x"), "notes.exe")},
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 400
+
+
+class TestReportPipeline:
+
+    def test_stages_complete_report_and_notify(self, app, processing_report, mocker):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        mocker.patch(
+            "utils.text_extractor.extract_text_from_file", return_value="HbA1c 6.1%"
+        )
+        mocker.patch(
+            "utils.ai_manager.stream_analyze_report",
+            return_value=iter(["### Sum", "mary"]),
+        )
+        emit = mocker.patch("tasks.socketio.emit")
+
+        report_id = tasks.summarize_report(
+            tasks.extract_report_text(processing_report.report_id)
+        )
+
+        db.session.expire_all()
+        report = db.session.get(Report, report_id)
+        assert report.status == "completed"
+        assert report.extracted_text == "HbA1c 6.1%"
+        assert report.summary == "### Summary"
+        emit.assert_called_once_with(
+            "report_status", {"report_id": report_id, "status": "completed"}
+        )
+
+    def test_empty_extraction_fails_report(self, app, processing_report, mocker):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        mocker.patch("utils.text_extractor.extract_text_from_file", return_value="")
+        mocker.patch("tasks.socketio.emit")
+        analyze = mocker.patch("utils.ai_manager.stream_analyze_report")
+
+        assert (
+            tasks.summarize_report(
+                tasks.extract_report_text(processing_report.report_id)
+            )
+            is None
+        )
+        db.session.expire_all()
+        assert db.session.get(Report, processing_report.report_id).status == "failed"
+        analyze.assert_not_called()
+
+    def test_extraction_timeout_fails_report(self, app, processing_report, mocker):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        mocker.patch(
+            "utils.text_extractor.extract_text_from_file",
+            side_effect=SoftTimeLimitExceeded(),
+        )
+        emit = mocker.patch("tasks.socketio.emit")
+
+        assert tasks.extract_report_text(processing_report.report_id) is None
+
+        db.session.expire_all()
+        assert db.session.get(Report, processing_report.report_id).status == "failed"
+        emit.assert_called_once_with(
+            "report_status",
+            {"report_id": processing_report.report_id, "status": "failed"},
+        )
+
+    def test_stalled_reports_are_failed(self, app, processing_report, mocker):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        mocker.patch("tasks.socketio.emit")
+        fresh = Report(
+            senior_id=processing_report.senior_id,
+            original_filename="fresh.pdf",
+            stored_filename="fresh_report.pdf",
+            status="processing",
+        )
+        db.session.add(fresh)
+        processing_report.created_at = datetime.utcnow() - timedelta(hours=2)
+        db.session.commit()
+
+        assert tasks.fail_stalled_reports() == 1
+
+        db.session.expire_all()
+        assert db.session.get(Report, processing_report.report_id).status == "failed"
+        assert db.session.get(Report, fresh.report_id).status == "processing"
+
+
+class TestReportStatus:
+
+    def test_owner_can_poll_status(self, client, auth_headers, processing_report):
+        response = client.get(
+            f"/api/reports/{processing_report.report_id}", headers=auth_headers
+        )
+        assert response.status_code == 200
+        assert response.get_json()["status"] == "processing"
+
+    def test_other_senior_is_forbidden(
+        self, client, other_user_auth_headers, processing_report
+    ):
+        response = client.get(
+            f"/api/reports/{processing_report.report_id}",
+            headers=other_user_auth_headers,
+        )
+        assert response.status_code == 403
+
+
+class TestReportContentCache:
+
+    def _seed(self, data, text="HbA1c 6.1%", summary="### Summary"):
+        db.session.add(
+            ExtractedTextCache(
+                content_hash=hashlib.sha256(data).hexdigest(), extracted_text=text
+            )
+        )
+        db.session.add(
+            SummaryCache(
+                text_hash=sha256_text(text),
+                prompt_version=PROMPT_VERSION,
+                summary=summary,
+            )
+        )
+        db.session.commit()
+
+    def test_duplicate_upload_resolves_without_pipeline(
+        self, client, auth_headers, report_folder, mocker
+    ):
+        data = b"%PDF-1.4 lab results"
+        self._seed(data)
+        chain = mocker.patch("routes.reports.chain")
+
+        response = client.post(
+            "/api/reports/summarize",
+            headers=auth_headers,
+            data={"file": (io.BytesIO(data), "labs.pdf")},
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 200
+        report = response.get_json()["report"]
+        assert report["status"] == "completed"
+        assert report["summary"] == "### Summary"
+        chain.assert_not_called()
+
+    def test_pipeline_reuses_and_fills_caches(self, app, processing_report, mocker):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        mocker.patch("tasks.socketio.emit")
+        processing_report.content_hash = "a" * 64
+        db.session.commit()
+        db.session.add(
+            ExtractedTextCache(content_hash="a" * 64, extracted_text="LDL 100")
+        )
+        db.session.commit()
+        extract = mocker.patch("utils.text_extractor.extract_text_from_file")
+        analyze = mocker.patch(
+            "utils.ai_manager.stream_analyze_report", return_value=iter(["### LDL"])
+        )
+
+        tasks.summarize_report(tasks.extract_report_text(processing_report.report_id))
+
+        extract.assert_not_called()
+        analyze.assert_called_once_with("LDL 100")
+        cached = db.session.get(SummaryCache, (sha256_text("LDL 100"), PROMPT_VERSION))
+        assert cached.summary == "### LDL"
+
+    def test_error_summaries_are_not_cached(self, app, processing_report, mocker):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        mocker.patch("tasks.socketio.emit")
+        mocker.patch(
+            "utils.text_extractor.extract_text_from_file", return_value="LDL 100"
+        )
+        mocker.patch(
+            "utils.ai_manager.stream_analyze_report",
+            side_effect=RuntimeError("Gemini API is not configured."),
+        )
+
+        tasks.summarize_report(tasks.extract_report_text(processing_report.report_id))
+
+        assert SummaryCache.query.count() == 0
+        db.session.expire_all()
+        assert processing_report.status == "failed"
+        assert processing_report.summary is None
+
+    def test_summary_timeout_fails_report(self, app, processing_report, mocker):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        emit = mocker.patch("tasks.socketio.emit")
+        mocker.patch.dict(app.config, {"REPORT_SUMMARY_FLUSH_SECONDS": 0})
+        processing_report.extracted_text = "LDL 100"
+        db.session.commit()
+
+        def stream(text):
+            yield "### Partial"
+            raise SoftTimeLimitExceeded()
+
+        mocker.patch("utils.ai_manager.stream_analyze_report", side_effect=stream)
+
+        assert tasks.summarize_report(processing_report.report_id) is None
+
+        assert SummaryCache.query.count() == 0
+        db.session.expire_all()
+        assert processing_report.status == "failed"
+        assert processing_report.summary is None
+        emit.assert_called_once_with(
+            "report_status",
+            {"report_id": processing_report.report_id, "status": "failed"},
+        )
+
+
+def _events(response):
+    """(event, data) pairs of a text/event-stream response body."""
+    events = []
+    for block in response.get_data(as_text=True).strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields.get("event"), json.loads(fields["data"])))
+    return events
+
+
+class TestReportStreaming:
+
+    def test_partial_summary_is_saved_while_streaming(
+        self, app, processing_report, mocker
+    ):
+        mocker.patch("tasks.get_flask_app", return_value=app)
+        mocker.patch("tasks.socketio.emit")
+        mocker.patch.dict(app.config, {"REPORT_SUMMARY_FLUSH_SECONDS": 0})
+        processing_report.extracted_text = "HbA1c 6.1%"
+        db.session.commit()
+        report_id = processing_report.report_id
+        seen = []
+
+        def stream(text):
+            yield "### Sum"
+            seen.append(
+                tuple(
+                    db.session.execute(
+                        select(Report.summary, Report.status).where(
+                            Report.report_id == report_id
+                        )
+                    ).one()
+                )
+            )
+            yield "mary"
+
+        mocker.patch("utils.ai_manager.stream_analyze_report", side_effect=stream)
+
+        tasks.summarize_report(report_id)
+
+        assert seen == [("### Sum", "processing")]
+        db.session.expire_all()
+        assert processing_report.summary == "### Summary"
+        assert processing_report.status == "completed"
+
+    def test_stream_relays_new_summary_text_until_finished(
+        self, client, auth_headers, processing_report, mocker
+    ):
+        processing_report.summary = "### Sum"
+        db.session.commit()
+        report_id = processing_report.report_id
+
+        def worker_finishes(seconds):
+            db.session.execute(
+                update(Report.__table__)
+                .where(Report.__table__.c.report_id == report_id)
+                .values(summary="### Summary", status="completed")
+            )
+            db.session.commit()
+
+        mocker.patch("routes.reports.time.sleep", side_effect=worker_finishes)
+
+        response = client.get(
+            f"/api/reports/{processing_report.report_id}/stream", headers=auth_headers
+        )
+
+        assert response.mimetype == "text/event-stream"
+        assert _events(response) == [
+            ("summary", {"delta": "### Sum"}),
+            ("summary", {"delta": "mary"}),
+            (
+                "status",
+                {"report_id": processing_report.report_id, "status": "completed"},
+            ),
+        ]
+
+    def test_finished_reports_stream_at_once(
+        self, client, auth_headers, processing_report
+    ):
+        processing_report.summary = "### Summary"
+        processing_report.status = "completed"
+        db.session.commit()
+
+        response = client.get(
+            f"/api/reports/{processing_report.report_id}/stream", headers=auth_headers
+        )
+
+        assert [event for event, _ in _events(response)] == ["summary", "status"]
@@ -0,0 +1,71 @@
+from sqlalchemy import inspect
+
+from models import db
+from utils.schema_sync import (
+    add_missing_columns,
+    create_missing_indexes,
+    drop_retired_indexes,
+)
+
+
+class TestAddMissingColumns:
+
+    def test_adds_nullable_column_and_its_index(self, app):
+        db.session.execute(db.text("DROP INDEX ix_report_content_hash"))
+        db.session.execute(db.text("ALTER TABLE report DROP COLUMN content_hash"))
+        db.session.commit()
+
+        assert add_missing_columns() == ["report.content_hash"]
+
+        inspector = inspect(db.engine)
+        assert "content_hash" in {c["name"] for c in inspector.get_columns("report")}
+        assert "ix_report_content_hash" in {
+            i["name"] for i in inspector.get_indexes("report")
+        }
+        assert add_missing_columns() == []
+
+
+class TestCreateMissingIndexes:
+
+    def test_builds_dropped_indexes(self, app):
+        db.session.execute(db.text("DROP INDEX ix_medication_pending_time_senior_id"))
+        db.session.execute(db.text("DROP INDEX ix_emergency_contact_senior_id"))
+        db.session.commit()
+
+        assert set(create_missing_indexes()) == {
+            "ix_medication_pending_time_senior_id",
+            "ix_emergency_contact_senior_id",
+        }
+
+        inspector = inspect(db.engine)
+        assert "ix_medication_pending_time_senior_id" in {
+            i["name"] for i in inspector.get_indexes("medication")
+        }
+        assert create_missing_indexes() == []
+
+    def test_drops_retired_indexes(self, app):
+        db.session.execute(
+            db.text(
+                "CREATE INDEX ix_medication_pending_senior_id_time "
+                "ON medication (senior_id, time)"
+            )
+        )
+        db.session.commit()
+
+        assert drop_retired_indexes() == ["ix_medication_pending_senior_id_time"]
+        assert "ix_medication_pending_senior_id_time" not in {
+            i["name"] for i in inspect(db.engine).get_indexes("medication")
+        }
+        assert drop_retired_indexes() == []
+
+    def test_cli_command(self, app):
+        db.session.execute(db.text("DROP INDEX ix_report_senior_id"))
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=["create-indexes"])
+
+        assert result.exit_code == 0
+        assert "Created index ix_report_senior_id" in result.output
+        assert app.test_cli_runner().invoke(args=["create-indexes"]).output == (
+            "All indexes are present.\n"
+        )
@@ -0,0 +1,211 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from models import Appointment, Medication, db
+from utils.action_resolver import resolve_actions
+from utils.senior_context import get_context, invalidate_context, load_context
+
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+
+class TestSeniorContext:
+
+    def test_snapshot_is_loaded_in_six_queries(
+        self,
+        senior_user,
+        sample_appointment,
+        sample_medication,
+        sample_emergency_contact,
+    ):
+        senior_id = senior_user.user_id
+        db.session.expire_all()
+
+        with count_queries() as statements:
+            context = load_context(senior_id)
+
+        assert len(statements) == 6
+        assert context["senior"]["username"] == "test_senior"
+        assert context["next_appointment"]["title"] == "Sample Appointment"
+        assert [c["name"] for c in context["emergency_contacts"]] == ["Sample Contact"]
+
+    def test_unknown_senior_has_no_context(self, app):
+        assert load_context("no-such-senior") is None
+
+    def test_cached_snapshot_skips_the_database(self, senior_user):
+        senior_id = senior_user.user_id
+        get_context(senior_id)
+
+        with count_queries() as statements:
+            get_context(senior_id)
+
+        assert statements == []
+
+    def test_changes_clear_the_cached_snapshot(self, senior_user):
+        assert get_context(senior_user.user_id)["next_medication"] is None
+
+        db.session.add(
+            Medication(
+                name="Metformin",
+                dosage="500mg",
+                time=datetime.now(timezone.utc) + timedelta(hours=2),
+                senior_id=senior_user.user_id,
+            )
+        )
+        db.session.commit()
+
+        assert get_context(senior_user.user_id)["next_medication"]["name"] == (
+            "Metformin"
+        )
+
+    def test_snapshot_is_shared_through_redis(
+        self, app, monkeypatch, fake_redis, senior_user, sample_appointment
+    ):
+        monkeypatch.setitem(
+            app.config, "SENIOR_CONTEXT_CACHE_REDIS_URL", "redis://shared"
+        )
+        monkeypatch.setitem(app.extensions, "senior_context_cache", None)
+        key = f"senior-context:{senior_user.user_id}"
+
+        context = get_context(senior_user.user_id)
+
+        assert key in fake_redis.data
+        assert isinstance(context["next_appointment"]["date_time"], datetime)
+        with count_queries() as statements:
+            assert get_context(senior_user.user_id) == context
+        assert statements == []
+
+        # Another process, such as a Celery sweep, clears it for everyone.
+        monkeypatch.setitem(app.extensions, "senior_context_cache", None)
+        invalidate_context(senior_user.user_id)
+
+        assert key not in fake_redis.data
+
+    def test_rows_beyond_the_horizon_are_not_listed(self, app, senior_user):
+        now = datetime.now(timezone.utc)
+        horizon = timedelta(days=app.config["SENIOR_CONTEXT_HORIZON_DAYS"])
+        db.session.add(
+            Medication(
+                name="Next year",
+                dosage="1 tab",
+                time=now + horizon + timedelta(days=1),
+                senior_id=senior_user.user_id,
+            )
+        )
+        db.session.add(
+            Appointment(
+                title="Annual check-up",
+                date_time=now + horizon + timedelta(days=2),
+                senior_id=senior_user.user_id,
+            )
+        )
+        db.session.commit()
+
+        context = load_context(senior_user.user_id)
+
+        assert context["pending_appointments"] == []
+        # The next ones are still found, however far ahead they are.
+        assert context["next_medication"]["name"] == "Next year"
+        assert context["next_appointment"]["title"] == "Annual check-up"
+
+
+class TestResolveActions:
+
+    def test_several_intents_share_one_snapshot(
+        self, senior_user, sample_appointment, sample_emergency_contact
+    ):
+        senior_id = senior_user.user_id
+
+        with count_queries() as statements:
+            answers = resolve_actions(
+                ["get_next_appointment", "get_emergency_contacts", "get_user_stats"],
+                senior_id,
+            )
+
+        assert len(statements) == 6
+        assert "Sample Appointment" in answers["get_next_appointment"]
+        assert "Sample Contact" in answers["get_emergency_contacts"]
+        assert "test_senior's stats" in answers["get_user_stats"]
+
+    def test_unknown_senior(self, app):
+        assert resolve_actions(["get_user_stats"], "no-such-senior") == {
+            "get_user_stats": "I cannot find information for that senior."
+        }
+
+
+class TestCaregiverChatSummary:
+
+    def test_answers_requested_intents(
+        self, client, caregiver_auth_headers, senior_user, sample_emergency_contact
+    ):
+        response = client.post(
+            f"/api/caregiver-chat/{senior_user.user_id}/summary",
+            headers=caregiver_auth_headers,
+            json={"intents": ["get_emergency_contacts", "get_next_appointment"]},
+        )
+
+        assert response.status_code == 200
+        answers = response.get_json()["answers"]
+        assert "Sample Contact" in answers["get_emergency_contacts"]
+        assert answers["get_next_appointment"] == "You have no upcoming appointments."
+
+    @pytest.mark.parametrize("intents", [[], "get_user_stats", ["drop_tables"]])
+    def test_rejects_invalid_intents(
+        self, client, caregiver_auth_headers, senior_user, intents
+    ):
+        response = client.post(
+            f"/api/caregiver-chat/{senior_user.user_id}/summary",
+            headers=caregiver_auth_headers,
+            json={"intents": intents},
+        )
+
+        assert response.status_code == 400
+
+    def test_unassigned_caregiver_is_forbidden(
+        self, client, caregiver_auth_headers, other_senior_user
+    ):
+        response = client.post(
+            f"/api/caregiver-chat/{other_senior_user.user_id}/summary",
+            headers=caregiver_auth_headers,
+            json={"intents": ["get_user_stats"]},
+        )
+
+        assert response.status_code == 403
+
+    def test_compound_question_is_answered_in_parts(
+        self,
+        client,
+        caregiver_auth_headers,
+        senior_user,
+        sample_appointment,
+        sample_emergency_contact,
+        mocker,
+    ):
+        llm = mocker.patch("utils.intent_classifier.get_query_intent")
+
+        response = client.post(
+            f"/api/caregiver-chat/{senior_user.user_id}",
+            headers=caregiver_auth_headers,
+            json={
+                "message": "When is her next appointment and who are her emergency contacts?"
+            },
+        )
+
+        text = response.get_json()["response"]
+        assert "Sample Appointment" in text
+        assert "Sample Contact" in text
+        llm.assert_not_called()
@@ -0,0 +1,324 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import tasks
+from models import (
+    Appointment,
+    EmergencyContact,
+    Medication,
+    NotificationOutbox,
+    SeniorCitizen,
+    SweepWatermark,
+    db,
+)
+from utils.senior_context import get_context
+
+
+@pytest.fixture
+def task_app(app, mocker):
+    """Runs Celery task bodies against the test app instead of a fresh one."""
+    mocker.patch("tasks.get_flask_app", return_value=app)
+    return app
+
+
+class TestCheckMissedMedications:
+
+    def test_marks_missed_and_fans_out_notifications(
+        self, task_app, mocker, senior_user, caregiver_user
+    ):
+        overdue = datetime.now() - timedelta(hours=1)
+        for name in ("Aspirin", "Metformin"):
+            db.session.add(
+                Medication(
+                    name=name,
+                    dosage="10mg",
+                    time=overdue,
+                    senior_id=senior_user.user_id,
+                )
+            )
+        db.session.add(
+            Medication(
+                name="Later",
+                dosage="5mg",
+                time=datetime.now() + timedelta(hours=1),
+                senior_id=senior_user.user_id,
+            )
+        )
+        db.session.commit()
+
+        tasks.check_missed_medications()
+
+        db.session.expire_all()
+        senior = db.session.get(SeniorCitizen, senior_user.user_id)
+        assert senior.medications_missed == 2
+        assert Medication.query.filter_by(missed_counted=True).count() == 2
+
+        caregiver_sms = NotificationOutbox.query.filter_by(
+            channel="sms", recipient=caregiver_user.phone_number
+        ).all()
+        assert len(caregiver_sms) == 2
+        assert any("Total medications missed: 2." in m.body for m in caregiver_sms)
+        queued = NotificationOutbox.query.count()
+
+        # A second sweep finds nothing new to count or queue
+        tasks.check_missed_medications()
+        db.session.expire_all()
+        assert (
+            db.session.get(SeniorCitizen, senior_user.user_id).medications_missed == 2
+        )
+        assert NotificationOutbox.query.count() == queued
+
+    def test_clears_the_cached_senior_context(self, task_app, mocker, senior_user):
+        db.session.add(
+            Medication(
+                name="Aspirin",
+                dosage="10mg",
+                time=datetime.now() - timedelta(hours=1),
+                senior_id=senior_user.user_id,
+            )
+        )
+        db.session.commit()
+        assert get_context(senior_user.user_id)["senior"]["medications_missed"] == 0
+
+        tasks.check_missed_medications()
+
+        assert get_context(senior_user.user_id)["senior"]["medications_missed"] == 1
+
+
+class TestCheckMissedAppointments:
+
+    def _appointment(self, senior_user, when, title="Checkup"):
+        appt = Appointment(
+            title=title,
+            date_time=when,
+            location="Clinic",
+            senior_id=senior_user.user_id,
+        )
+        db.session.add(appt)
+        db.session.commit()
+        return appt
+
+    def test_marks_missed_and_advances_watermark(
+        self, task_app, mocker, senior_user, caregiver_user
+    ):
+        now = datetime.now(timezone.utc)
+        past = self._appointment(senior_user, now - timedelta(hours=1))
+        future = self._appointment(senior_user, now + timedelta(hours=1))
+
+        tasks.check_missed_appointments()
+
+        db.session.expire_all()
+        assert db.session.get(Appointment, past.appointment_id).status == "Missed"
+        assert db.session.get(Appointment, future.appointment_id).status == "Scheduled"
+        assert (
+            db.session.get(SeniorCitizen, senior_user.user_id).appointments_missed == 1
+        )
+        assert db.session.get(SweepWatermark, "missed_appointments") is not None
+
+        assert {m.recipient for m in NotificationOutbox.query.all()} == {
+            senior_user.email,
+            caregiver_user.email,
+            caregiver_user.phone_number,
+        }
+
+    def test_clears_the_cached_senior_context(self, task_app, mocker, senior_user):
+        self._appointment(senior_user, datetime.now(timezone.utc) - timedelta(hours=1))
+        assert get_context(senior_user.user_id)["senior"]["appointments_missed"] == 0
+
+        tasks.check_missed_appointments()
+
+        assert get_context(senior_user.user_id)["senior"]["appointments_missed"] == 1
+
+    def test_skips_appointments_behind_the_watermark(
+        self, task_app, mocker, senior_user
+    ):
+        now = datetime.now(timezone.utc)
+        db.session.add(
+            SweepWatermark(
+                name="missed_appointments", watermark=now.replace(tzinfo=None)
+            )
+        )
+        db.session.commit()
+        old = self._appointment(senior_user, now - timedelta(days=2))
+        # Last written before the previous sweep, so that sweep owned it
+        old.updated_at = now - timedelta(days=1)
+        db.session.commit()
+        recent = self._appointment(senior_user, now - timedelta(minutes=1))
+
+        tasks.check_missed_appointments()
+
+        db.session.expire_all()
+        assert db.session.get(Appointment, old.appointment_id).status == "Scheduled"
+        assert db.session.get(Appointment, recent.appointment_id).status == "Missed"
+
+    def test_past_dated_appointment_written_after_a_sweep(
+        self, task_app, mocker, senior_user
+    ):
+        tasks.check_missed_appointments()
+        late = self._appointment(
+            senior_user, datetime.now(timezone.utc) - timedelta(days=3)
+        )
+
+        tasks.check_missed_appointments()
+
+        db.session.expire_all()
+        assert db.session.get(Appointment, late.appointment_id).status == "Missed"
+        assert (
+            db.session.get(SeniorCitizen, senior_user.user_id).appointments_missed == 1
+        )
+
+    def test_missed_appointment_reset_to_scheduled(self, task_app, mocker, senior_user):
+        appointment = self._appointment(
+            senior_user, datetime.now(timezone.utc) - timedelta(days=3)
+        )
+        tasks.check_missed_appointments()
+        db.session.expire_all()
+        appointment = db.session.get(Appointment, appointment.appointment_id)
+        assert appointment.status == "Missed"
+
+        appointment.status = "Scheduled"
+        db.session.commit()
+        tasks.check_missed_appointments()
+
+        db.session.expire_all()
+        assert (
+            db.session.get(Appointment, appointment.appointment_id).status == "Missed"
+        )
+
+
+class TestSendDailyNewsUpdate:
+
+    def test_fetches_each_category_once(
+        self, task_app, mocker, senior_user, caregiver_user, other_senior_user
+    ):
+        mocker.patch.dict(task_app.config, {"NEWSAPI_KEY": "test-key"})
+        senior_user.senior_citizen.news_categories = "health,general"
+        db.session.commit()
+
+        def fake_fetch(params, timeout=5):
+            category = params["category"]
+            return {
+                "articles": [
+                    {
+                        "title": f"{category} headline",
+                        "source": {"name": "Wire"},
+                        "url": f"https://example.com/{category}",
+                    }
+                ]
+            }
+
+        fetch = mocker.patch(
+            "utils.news_client.fetch_top_headlines", side_effect=fake_fetch
+        )
+
+        tasks.send_daily_news_update()
+
+        fetched = sorted(call.args[0]["category"] for call in fetch.call_args_list)
+        assert fetched == ["general", "health"]
+
+        digests = {
+            m.recipient: m.body
+            for m in NotificationOutbox.query.filter_by(channel="email")
+        }
+        assert len(digests) == 3
+        assert "health headline" in digests[senior_user.email]
+        assert "health headline" not in digests[caregiver_user.email]
+
+
+class TestSendEmergencyAlert:
+
+    def _add_contact(self, senior_user, name, phone, email):
+        db.session.add(
+            EmergencyContact(
+                name=name,
+                relation="Family",
+                phone=phone,
+                email=email,
+                senior_id=senior_user.user_id,
+            )
+        )
+        db.session.commit()
+
+    def test_deliveries_run_concurrently(
+        self, task_app, mocker, senior_user, caregiver_user
+    ):
+        self._add_contact(senior_user, "Ann", "+15550001", "ann@example.com")
+        self._add_contact(senior_user, "Bob", "+15550002", "bob@example.com")
+
+        def slow_send(*args, **kwargs):
+            time.sleep(0.3)
+            return True
+
+        mocker.patch("tasks.send_sms", side_effect=slow_send)
+        mocker.patch("tasks.send_email", side_effect=slow_send)
+
+        started = time.monotonic()
+        outcomes = tasks.send_emergency_alert(senior_user.user_id, 12.9, 77.6)
+        elapsed = time.monotonic() - started
+
+        assert len(outcomes) == 6
+        assert all(o["status"] == "sent" for o in outcomes)
+        assert elapsed < 1.2  # six sequential sends would take 1.8s
+
+    def test_retries_and_records_outcomes(self, task_app, mocker, senior_user):
+        mocker.patch.dict(task_app.config, {"EMERGENCY_DELIVERY_RETRIES": 1})
+        self._add_contact(senior_user, "Ann", "+15550001", "ann@example.com")
+        mocker.patch("tasks.send_sms", side_effect=[False, True])
+        mocker.patch("tasks.send_email", return_value=False)
+
+        outcomes = tasks.send_emergency_alert(senior_user.user_id)
+
+        by_channel = {o["channel"]: o for o in outcomes}
+        assert by_channel["sms"] == {
+            "channel": "sms",
+            "to": "+15550001",
+            "status": "sent",
+            "attempts": 2,
+        }
+        assert by_channel["email"]["status"] == "queued"
+        assert by_channel["email"]["attempts"] == 2
+        # The failed email is left to the outbox to keep retrying
+        retry = NotificationOutbox.query.one()
+        assert (retry.channel, retry.recipient) == ("email", "ann@example.com")
+
+    def test_each_attempt_is_bounded_by_the_socket_timeout(
+        self, task_app, mocker, senior_user
+    ):
+        mocker.patch.dict(
+            task_app.config,
+            {
+                "EMERGENCY_DELIVERY_TIMEOUT_SECONDS": 0.1,
+                "EMERGENCY_DELIVERY_RETRIES": 0,
+            },
+        )
+        self._add_contact(senior_user, "Ann", "+15550001", None)
+        # A send that hits its socket timeout reports failure
+        send_sms = mocker.patch("tasks.send_sms", return_value=False)
+
+        outcomes = tasks.send_emergency_alert(senior_user.user_id)
+
+        assert send_sms.call_args.kwargs["timeout"] == 0.1
+        assert outcomes == [
+            {"channel": "sms", "to": "+15550001", "status": "queued", "attempts": 1}
+        ]
+        assert NotificationOutbox.query.one().recipient == "+15550001"
+
+    def test_sends_beyond_the_pool_size_are_not_dropped(
+        self, task_app, mocker, senior_user
+    ):
+        mocker.patch.dict(task_app.config, {"EMERGENCY_ALERT_MAX_WORKERS": 1})
+        for index in range(4):
+            self._add_contact(senior_user, f"Contact {index}", f"+1555000{index}", None)
+
+        def slow_send(*args, **kwargs):
+            time.sleep(0.1)
+            return True
+
+        mocker.patch("tasks.send_sms", side_effect=slow_send)
+
+        outcomes = tasks.send_emergency_alert(senior_user.user_id)
+
+        assert [o["status"] for o in outcomes] == ["sent"] * 4
+        assert NotificationOutbox.query.count() == 0
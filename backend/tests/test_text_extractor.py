@@ -0,0 +1,124 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from celery.exceptions import SoftTimeLimitExceeded
+
+from utils import text_extractor
+
+
+def _reader_with(page_texts):
+    reader = MagicMock()
+    reader.pages = [
+        MagicMock(extract_text=MagicMock(return_value=t)) for t in page_texts
+    ]
+    return reader
+
+
+class TestExtractTextFromPdf:
+
+    def test_only_scanned_pages_are_ocrd(self, tmp_path, mocker):
+        pdf = tmp_path / "mixed.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        native = "Haemoglobin 13.5 g/dL, within the normal range."
+        mocker.patch.object(
+            text_extractor.PyPDF2,
+            "PdfReader",
+            return_value=_reader_with([native, "", native, "  "]),
+        )
+        convert = mocker.patch.object(
+            text_extractor,
+            "convert_from_path",
+            side_effect=lambda *a, **kw: [MagicMock()],
+        )
+        mocker.patch.object(
+            text_extractor.pytesseract, "image_to_string", return_value="scanned"
+        )
+
+        text = text_extractor.extract_text_from_file(str(pdf), max_workers=2)
+
+        assert text.splitlines() == [native, "scanned", native, "scanned"]
+        rasterised = sorted(
+            call.kwargs["first_page"] for call in convert.call_args_list
+        )
+        assert rasterised == [2, 4]
+        assert all(
+            call.kwargs["first_page"] == call.kwargs["last_page"]
+            for call in convert.call_args_list
+        )
+
+    def test_native_pdf_skips_ocr(self, tmp_path, mocker):
+        pdf = tmp_path / "native.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        mocker.patch.object(
+            text_extractor.PyPDF2,
+            "PdfReader",
+            return_value=_reader_with(["Cholesterol 180 mg/dL, LDL 100 mg/dL."]),
+        )
+        convert = mocker.patch.object(text_extractor, "convert_from_path")
+
+        text = text_extractor.extract_text_from_file(str(pdf))
+
+        assert "Cholesterol" in text
+        convert.assert_not_called()
+
+    def test_unparseable_pdf_falls_back_to_ocr_of_every_page(self, tmp_path, mocker):
+        pdf = tmp_path / "broken.pdf"
+        pdf.write_bytes(b"not really a pdf")
+        mocker.patch.object(
+            text_extractor.PyPDF2, "PdfReader", side_effect=ValueError("bad xref")
+        )
+        mocker.patch.object(
+            text_extractor, "pdfinfo_from_path", return_value={"Pages": 3}
+        )
+        mocker.patch.object(
+            text_extractor,
+            "convert_from_path",
+            side_effect=lambda *a, **kw: [MagicMock()],
+        )
+        ocr = mocker.patch.object(
+            text_extractor.pytesseract, "image_to_string", return_value="page"
+        )
+
+        text = text_extractor.extract_text_from_file(str(pdf))
+
+        assert text.splitlines() == ["page", "page", "page"]
+        assert ocr.call_count == 3
+
+    def test_time_limit_does_not_wait_for_running_pages(self, tmp_path, mocker):
+        pdf = tmp_path / "scanned.pdf"
+        pdf.write_bytes(b"%PDF-1.4")
+        mocker.patch.object(
+            text_extractor.PyPDF2, "PdfReader", return_value=_reader_with([""] * 3)
+        )
+        release = threading.Event()
+
+        def convert(*args, first_page, **kwargs):
+            if first_page == 1:
+                raise SoftTimeLimitExceeded()
+            release.wait(5)
+            return [MagicMock()]
+
+        mocker.patch.object(text_extractor, "convert_from_path", side_effect=convert)
+        mocker.patch.object(
+            text_extractor.pytesseract, "image_to_string", return_value="page"
+        )
+
+        started = time.monotonic()
+        try:
+            with pytest.raises(SoftTimeLimitExceeded):
+                text_extractor.extract_text_from_file(str(pdf), max_workers=2)
+            assert time.monotonic() - started < 2
+        finally:
+            release.set()
+
+    def test_native_text_is_read_from_a_memory_map(self, tmp_path):
+        pdf = tmp_path / "blank.pdf"
+        writer = text_extractor.PyPDF2.PdfWriter()
+        writer.add_blank_page(width=72, height=72)
+        writer.add_blank_page(width=72, height=72)
+        with open(pdf, "wb") as f:
+            writer.write(f)
+
+        assert text_extractor._native_page_texts(str(pdf)) == ["", ""]
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from utils import voice_assistant_manager
+from utils.tts_cache import (
+    StubTTSBackend,
+    TTSCache,
+    get_tts_cache,
+    prewarm_tts_cache,
+)
+
+
+@pytest.fixture
+def backend():
+    return StubTTSBackend()
+
+
+class TestTTSCache:
+
+    def test_repeated_text_is_synthesized_once(self, backend):
+        cache = TTSCache(backend)
+
+        first = cache.synthesize("You have no upcoming appointments.")
+        second = cache.synthesize("You have no upcoming appointments.")
+
+        assert first == second
+        assert first.startswith(b"stub-tts:")
+        assert backend.calls == 1
+
+    def test_key_covers_voice_and_encoding(self, backend):
+        mp3 = TTSCache(backend, encoding="MP3")
+        ogg = TTSCache(backend, encoding="OGG_OPUS")
+        other_voice = TTSCache(backend, voice_name="en-US-Wavenet-F")
+
+        assert len({c.key("Hello") for c in (mp3, ogg, other_voice)}) == 3
+
+    def test_disk_tier_survives_a_new_process(self, backend, tmp_path):
+        TTSCache(backend, folder=str(tmp_path)).synthesize("Hello")
+
+        restarted = StubTTSBackend()
+        audio = TTSCache(restarted, folder=str(tmp_path)).synthesize("Hello")
+
+        assert audio == b"stub-tts:en-US-Wavenet-D:en-US:MP3:Hello"
+        assert restarted.calls == 0
+        assert [p.suffix for p in tmp_path.rglob("*") if p.is_file()] == [".mp3"]
+
+    def test_least_recently_used_audio_is_evicted(self, backend):
+        cache = TTSCache(backend, maxsize=2)
+
+        for text in ("a", "b", "a", "c", "a", "b"):
+            cache.synthesize(text)
+
+        # "b" was evicted by "c"; "a" stayed in use.
+        assert backend.calls == 4
+
+    def test_failed_synthesis_is_not_cached(self, backend, mocker):
+        cache = TTSCache(backend)
+        mocker.patch.object(backend, "synthesize", side_effect=[b"", b"audio"])
+
+        assert cache.synthesize("Hello") == b""
+        assert cache.synthesize("Hello") == b"audio"
+
+    def test_prewarm_serves_phrases_without_synthesis(self, backend):
+        cache = TTSCache(backend)
+        cache.prewarm(voice_assistant_manager.FALLBACK_PHRASES)
+        calls = backend.calls
+
+        cache.synthesize(voice_assistant_manager.UNKNOWN_INTENT_MESSAGE)
+
+        assert calls == len(voice_assistant_manager.FALLBACK_PHRASES)
+        assert backend.calls == calls
+
+
+class TestTTSSetup:
+
+    @pytest.fixture
+    def tts_app(self):
+        app = Flask(__name__)
+        app.config.update(TTS_BACKEND="stub", TTS_CACHE_FOLDER=None)
+        return app
+
+    def test_cache_is_created_on_first_use(self, tts_app):
+        assert "tts_cache" not in tts_app.extensions
+
+        cache = get_tts_cache(tts_app)
+
+        assert isinstance(cache.backend, StubTTSBackend)
+        assert get_tts_cache(tts_app) is cache
+
+    def test_prewarm_only_when_enabled(self, tts_app, mocker):
+        prewarm = mocker.patch.object(TTSCache, "prewarm_in_background")
+
+        prewarm_tts_cache(tts_app, ["Hello"])
+        assert "tts_cache" not in tts_app.extensions
+
+        tts_app.config["TTS_PREWARM"] = True
+        prewarm_tts_cache(tts_app, ["Hello"])
+        prewarm.assert_called_once_with(["Hello"])
+
+
+class TestVoiceAssistant:
+
+    def test_repeated_answers_reuse_cached_audio(self, app, senior_user, mocker):
+        senior_id = senior_user.user_id
+        stt = mocker.patch.object(voice_assistant_manager, "stt_client")
+        mocker.patch.object(voice_assistant_manager, "speech", create=True)
+        stt.recognize.return_value = SimpleNamespace(
+            results=[
+                SimpleNamespace(
+                    alternatives=[
+                        SimpleNamespace(transcript="When is my next appointment?")
+                    ]
+                )
+            ]
+        )
+        backend = get_tts_cache(app).backend
+        calls = backend.calls
+
+        first = voice_assistant_manager.process_voice_query(b"audio", senior_id)
+        second = voice_assistant_manager.process_voice_query(b"audio", senior_id)
+
+        assert first == second
+        assert b"You have no upcoming appointments." in first
+        assert backend.calls <= calls + 1
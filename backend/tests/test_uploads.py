@@ -0,0 +1,119 @@
+import hashlib
+import io
+
+import pytest
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from models import Report
+from utils.uploads import save_upload
+
+
+@pytest.fixture
+def upload_dirs(app, tmp_path, mocker):
+    incoming = tmp_path / "incoming"
+    reports = tmp_path / "reports"
+    mocker.patch.dict(
+        app.config,
+        {"UPLOAD_TMP_FOLDER": str(incoming), "REPORT_UPLOAD_FOLDER": str(reports)},
+    )
+    return incoming, reports
+
+
+class TestStreamedUploads:
+
+    def test_report_is_hashed_while_streamed_and_moved_into_place(
+        self, client, auth_headers, upload_dirs, mocker
+    ):
+        incoming, reports = upload_dirs
+        mocker.patch("routes.reports.chain")
+        data = b"%PDF-1.4 " + b"x" * 200_000
+
+        response = client.post(
+            "/api/reports/summarize",
+            headers=auth_headers,
+            data={"file": (io.BytesIO(data), "scan.pdf")},
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 202
+        report = Report.query.one()
+        assert report.content_hash == hashlib.sha256(data).hexdigest()
+        assert (reports / report.stored_filename).read_bytes() == data
+        assert list(incoming.iterdir()) == []
+
+    def test_oversized_upload_is_rejected_while_reading(
+        self, app, client, auth_headers, upload_dirs, mocker
+    ):
+        incoming, reports = upload_dirs
+        mocker.patch.dict(app.config, {"UPLOAD_MAX_BYTES": 1024})
+        chain = mocker.patch("routes.reports.chain")
+
+        response = client.post(
+            "/api/reports/summarize",
+            headers=auth_headers,
+            data={"file": (io.BytesIO(b"x" * 4096), "scan.pdf")},
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 413
+        assert Report.query.count() == 0
+        assert not reports.exists() or list(reports.iterdir()) == []
+        assert list(incoming.iterdir()) == []
+        chain.assert_not_called()
+
+    def test_earlier_parts_are_removed_when_a_later_one_is_too_large(
+        self, app, client, auth_headers, upload_dirs, mocker
+    ):
+        incoming, _ = upload_dirs
+        mocker.patch.dict(app.config, {"UPLOAD_MAX_BYTES": 1024})
+
+        response = client.post(
+            "/api/reports/summarize",
+            headers=auth_headers,
+            data={
+                "notes": (io.BytesIO(b"small"), "notes.pdf"),
+                "file": (io.BytesIO(b"x" * 4096), "scan.pdf"),
+            },
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 413
+        assert list(incoming.iterdir()) == []
+
+    def test_unsaved_uploads_are_removed_when_the_request_ends(
+        self, client, auth_headers, upload_dirs
+    ):
+        incoming, _ = upload_dirs
+
+        response = client.post(
+            "/api/reports/summarize",
+            headers=auth_headers,
+            data={"file": (io.BytesIO(b"plain text"), "notes.txt")},
+            content_type="multipart/form-data",
+        )
+
+        assert response.status_code == 400
+        assert list(incoming.iterdir()) == []
+
+
+class TestSaveUpload:
+
+    def test_plain_streams_are_copied_in_chunks_and_hashed(self, app, tmp_path):
+        data = b"y" * 100_000
+        target = tmp_path / "avatar.png"
+
+        digest = save_upload(
+            FileStorage(io.BytesIO(data), "avatar.png"), str(target), chunk_size=4096
+        )
+
+        assert digest == hashlib.sha256(data).hexdigest()
+        assert target.read_bytes() == data
+
+    def test_plain_streams_respect_the_size_limit(self, app, tmp_path, mocker):
+        mocker.patch.dict(app.config, {"UPLOAD_MAX_BYTES": 10})
+        target = tmp_path / "avatar.png"
+
+        with pytest.raises(RequestEntityTooLarge):
+            save_upload(FileStorage(io.BytesIO(b"z" * 100), "avatar.png"), str(target))
+        assert not target.exists()
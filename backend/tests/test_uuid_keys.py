@@ -0,0 +1,90 @@
+import uuid
+
+from db.types import new_id, uuid7
+from models import Medication, User, db
+from utils.schema_sync import convert_text_uuids
+
+
+def _stored(table, column, key_column, key):
+    """(typeof, length) of a column as SQLite stores it."""
+    return db.session.execute(
+        db.text(
+            f'SELECT typeof("{column}"), length("{column}") FROM "{table}" '
+            f'WHERE "{key_column}" = :key'
+        ),
+        {"key": key},
+    ).one()
+
+
+class TestUUID7:
+
+    def test_version_and_variant(self):
+        value = uuid7()
+
+        assert value.version == 7
+        assert value.variant == uuid.RFC_4122
+
+    def test_ids_sort_by_creation_time(self, mocker):
+        clock = mocker.patch("db.types.time.time_ns")
+        ids = []
+        for milliseconds in (1_700_000_000_000, 1_700_000_000_001, 1_700_000_001_000):
+            clock.return_value = milliseconds * 1_000_000
+            ids.append(new_id())
+
+        assert ids == sorted(ids)
+
+
+class TestBinaryUUID:
+
+    def test_keys_are_stored_as_16_bytes(self, senior_user, sample_medication):
+        key = uuid.UUID(sample_medication.medication_id).bytes
+
+        assert _stored("medication", "medication_id", "medication_id", key) == (
+            "blob",
+            16,
+        )
+        assert _stored("medication", "senior_id", "medication_id", key) == ("blob", 16)
+
+    def test_keys_read_back_as_canonical_strings(self, senior_user):
+        user_id = senior_user.user_id
+        db.session.expire_all()
+
+        user = db.session.get(User, uuid.UUID(user_id))
+
+        assert user.user_id == user_id
+        assert isinstance(user.user_id, str)
+
+    def test_malformed_ids_find_nothing(self, senior_user):
+        assert db.session.get(User, "not-a-uuid") is None
+        assert User.query.filter_by(user_id="not-a-uuid").first() is None
+
+
+class TestConvertTextUUIDs:
+
+    def test_text_keys_are_converted_in_place(self, app, senior_user):
+        medication_id = str(uuid.uuid4())
+        db.session.execute(
+            db.text(
+                "INSERT INTO medication (medication_id, name, senior_id) "
+                "VALUES (:id, 'Aspirin', :senior_id)"
+            ),
+            {"id": medication_id, "senior_id": senior_user.user_id},
+        )
+        db.session.commit()
+        assert db.session.get(Medication, medication_id) is None
+
+        assert convert_text_uuids() == {
+            "medication.medication_id": 1,
+            "medication.senior_id": 1,
+        }
+
+        medication = db.session.get(Medication, medication_id)
+        assert medication.name == "Aspirin"
+        assert medication.senior_id == senior_user.user_id
+        assert convert_text_uuids() == {}
+
+    def test_cli_command(self, app):
+        result = app.test_cli_runner().invoke(args=["convert-uuids"])
+
+        assert result.exit_code == 0
+        assert result.output == "No text UUIDs left.\n"
@@ -1,3 +1,4 @@
+import json
 import os
 import google.generativeai as genai
 
@@ -12,13 +13,13 @@ except Exception as e:
     print(f"Error configuring Gemini API: {e}")
     model = None
 
+# Bump whenever the analyze_report prompt or model changes, so summaries
+# cached under the previous version are regenerated.
+PROMPT_VERSION = "1"
 
-def analyze_report(text: str) -> str:
-    """Analyzes a report using the Gemini API to provide a summary and suggestions."""
-    if not model:
-        return "Error: Gemini API is not configured."
 
-    prompt = f"""
+def _analysis_prompt(text: str) -> str:
+    return f"""
     You are an expert medical report analyst. Your task is to analyze the following report and provide a clear, readable summary and helpful, non-prescriptive suggestions for a senior citizen. Use simple, everyday language suitable for someone without a medical background. Avoid jargon and keep sentences short.
 
     **Report Text:**
@@ -50,40 +51,172 @@ def analyze_report(text: str) -> str:
     [Your disclaimer here]
     """
 
+
+def analyze_report(text: str) -> str:
+    """Analyzes a report using the Gemini API to provide a summary and suggestions."""
+    if not model:
+        return "Error: Gemini API is not configured."
+
     try:
-        response = model.generate_content(prompt)
+        response = model.generate_content(_analysis_prompt(text))
         return response.text
     except Exception as e:
         print(f"Error calling Gemini API: {e}")
         return f"Error analyzing report: {e}"
 
 
-def chat_with_report(report_text: str, user_question: str) -> str:
-    """Answers a user's question based on the text of a report."""
+def _start_report_chat(report_excerpts, history=None, conversation_summary=None):
+    excerpts = "\n\n---\n\n".join(report_excerpts)
+    if conversation_summary:
+        excerpts += (
+            f"\n\n**Summary of Our Earlier Conversation:**\n{conversation_summary}"
+        )
+    # Start a chat session with the relevant report excerpts as context
+    return model.start_chat(
+        history=[
+            {
+                "role": "user",
+                "parts": [
+                    f"You are a helpful chat assistant. Your task is to answer my questions based *only* on the content of the provided excerpts of my medical report. Do not, under any circumstances, provide information, opinions, or medical advice that is not explicitly stated in them. If the excerpts do not contain the answer, say so.\n\n**Relevant Report Excerpts:**\n{excerpts}"
+                ],
+            },
+            {
+                "role": "model",
+                "parts": [
+                    "Okay, I understand. I will only use the provided report excerpts to answer your questions."
+                ],
+            },
+            *(
+                {"role": turn["role"], "parts": [turn["text"]]}
+                for turn in history or []
+            ),
+        ]
+    )
+
+
+def chat_with_report(
+    report_excerpts, user_question: str, history=None, conversation_summary=None
+) -> str:
+    """
+    Answers a user's question from the excerpts of a report most relevant to
+    it. history is the recent conversation as [{"role": "user"|"model",
+    "text": ...}], oldest first; conversation_summary condenses anything
+    earlier.
+    """
     if not model:
         return "Error: Gemini API is not configured."
 
     try:
-        # Start a chat session with the report text as context
-        chat = model.start_chat(
-            history=[
-                {
-                    "role": "user",
-                    "parts": [
-                        f"You are a helpful chat assistant. Your task is to answer my questions based *only* on the content of the provided medical report. Do not, under any circumstances, provide information, opinions, or medical advice that is not explicitly stated in the report.\n\n**Full Report Text:**\n{report_text}"
-                    ],
-                },
-                {
-                    "role": "model",
-                    "parts": [
-                        "Okay, I understand. I will only use the provided report to answer your questions."
-                    ],
-                },
-            ]
-        )
-
+        chat = _start_report_chat(report_excerpts, history, conversation_summary)
         response = chat.send_message(user_question)
         return response.text
     except Exception as e:
         print(f"Error calling Gemini API for chat: {e}")
         return f"Error: {e}"
+
+
+def _stream_text(response):
+    for chunk in response:
+        if chunk.text:
+            yield chunk.text
+
+
+def stream_chat_with_report(
+    report_excerpts, user_question: str, history=None, conversation_summary=None
+):
+    """
+    Like chat_with_report, but yields the answer in pieces as Gemini
+    generates it. Raises instead of returning an error string, since part
+    of the answer may already have been sent.
+    """
+    if not model:
+        raise RuntimeError("Gemini API is not configured.")
+
+    chat = _start_report_chat(report_excerpts, history, conversation_summary)
+    yield from _stream_text(chat.send_message(user_question, stream=True))
+
+
+def stream_analyze_report(text: str):
+    """Like analyze_report, but yields the analysis in pieces as it is generated."""
+    if not model:
+        raise RuntimeError("Gemini API is not configured.")
+
+    yield from _stream_text(model.generate_content(_analysis_prompt(text), stream=True))
+
+
+def summarize_conversation(previous_summary, turns) -> str:
+    """
+    Condenses chat turns ([{"role", "text"}]) and the summary of anything
+    before them into one short summary for later questions.
+    """
+    if not model:
+        return "Error: Gemini API is not configured."
+
+    transcript = "\n".join(
+        f"{'User' if t['role'] == 'user' else 'Assistant'}: {t['text']}" for t in turns
+    )
+    prompt = f"""
+    Summarize the following conversation between a user and an assistant about the user's medical report in at most 120 words. Keep every value, finding, and question that a follow-up question might refer to. Write plain text with no headings.
+
+    **Summary of Earlier Conversation:**
+    {previous_summary or "None"}
+
+    **Conversation:**
+    {transcript}
+    """
+    try:
+        response = model.generate_content(prompt)
+        return response.text
+    except Exception as e:
+        print(f"Error calling Gemini API for conversation summary: {e}")
+        return f"Error: {e}"
+
+
+# Intents that utils.action_resolver.resolve_action can answer.
+KNOWN_INTENTS = (
+    "get_next_appointment",
+    "get_medication_schedule",
+    "get_emergency_contacts",
+    "get_medication_history_caregiver",
+    "get_pending_appointments_caregiver",
+    "get_news_summary",
+    "get_event_details",
+    "get_user_stats",
+)
+
+
+def get_query_intent(query_text: str) -> dict:
+    """
+    Classifies a caregiver or voice query into one of KNOWN_INTENTS.
+    Returns {"intent": ..., "entities": {...}}; the intent is "unknown" if the
+    query matches none of them or the API call fails.
+    """
+    unknown = {"intent": "unknown", "entities": {}}
+    if not model:
+        return unknown
+
+    prompt = f"""
+    Classify the following request from a senior citizen or their caregiver into exactly one of these intents: {", ".join(KNOWN_INTENTS)}. Use "unknown" if none of them fits.
+
+    **Request:**
+    {query_text}
+
+    **Output Format:**
+    Reply with only a JSON object of the form {{"intent": "<intent>", "entities": {{}}}}, where entities holds any names, dates, or medications mentioned in the request.
+    """
+    try:
+        response = model.generate_content(
+            prompt, generation_config={"response_mime_type": "application/json"}
+        )
+        data = json.loads(response.text)
+    except Exception as e:
+        print(f"Error calling Gemini API for intent: {e}")
+        return unknown
+
+    if not isinstance(data, dict) or data.get("intent") not in KNOWN_INTENTS:
+        return unknown
+    entities = data.get("entities")
+    return {
+        "intent": data["intent"],
+        "entities": entities if isinstance(entities, dict) else {},
+    }
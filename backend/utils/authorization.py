@@ -0,0 +1,74 @@
+from flask import current_app, g, has_app_context
+from sqlalchemy import event, select
+
+from models import CaregiverAssignment, db
+from utils.cache import TTLCache
+
+
+def _assignment_cache():
+    cache = current_app.extensions.get("assignment_cache")
+    if cache is None:
+        config = current_app.config
+        cache = TTLCache(
+            ttl=config.get("ASSIGNMENT_CACHE_TTL_SECONDS", 300),
+            maxsize=10_000,
+            redis_url=config.get("ASSIGNMENT_CACHE_REDIS_URL"),
+            namespace="caregiver-seniors",
+        )
+        current_app.extensions["assignment_cache"] = cache
+    return cache
+
+
+def _load_assigned_senior_ids(caregiver_id):
+    return list(
+        db.session.execute(
+            select(CaregiverAssignment.senior_id)
+            .where(CaregiverAssignment.caregiver_id == caregiver_id)
+            .order_by(
+                CaregiverAssignment.created_at.asc().nulls_first(),
+                CaregiverAssignment.senior_id,
+            )
+        ).scalars()
+    )
+
+
+def assigned_senior_ids(caregiver_id):
+    """
+    The ids of the seniors assigned to caregiver_id, in the order they were
+    assigned, so the first is the caregiver's original senior.
+
+    Backed by a shared cache (in-process, or Redis with
+    ASSIGNMENT_CACHE_REDIS_URL) and memoised on ``g`` for the request.
+    """
+    caregiver_id = str(caregiver_id)
+    memo = g.setdefault("assigned_seniors", {})
+    if caregiver_id not in memo:
+        memo[caregiver_id] = tuple(
+            _assignment_cache().get_or_load(
+                caregiver_id, lambda: _load_assigned_senior_ids(caregiver_id)
+            )
+        )
+    return memo[caregiver_id]
+
+
+def is_assigned(caregiver_id, senior_id):
+    """True if the caregiver is assigned to the senior."""
+    return str(senior_id) in assigned_senior_ids(caregiver_id)
+
+
+def invalidate_assignments(caregiver_id):
+    """Forgets the cached senior set of a caregiver after its assignments change."""
+    if not has_app_context():
+        return
+    caregiver_id = str(caregiver_id)
+    g.get("assigned_seniors", {}).pop(caregiver_id, None)
+    cache = current_app.extensions.get("assignment_cache")
+    if cache is not None:
+        cache.delete(caregiver_id)
+
+
+@event.listens_for(CaregiverAssignment, "after_insert")
+@event.listens_for(CaregiverAssignment, "after_update")
+@event.listens_for(CaregiverAssignment, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    invalidate_assignments(target.caregiver_id)
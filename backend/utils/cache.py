@@ -0,0 +1,208 @@
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import redis
+
+# How long a process may hold the Redis load lock of a key before others
+# assume it died and take over.
+LOCK_TIMEOUT_MS = 10_000
+
+# Deletes the lock only if it still holds our token, so a holder whose lock
+# expired cannot release the one another process acquired since.
+_RELEASE_LOCK = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class _Call:
+    """An in-flight loader call that concurrent callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Small TTL cache backed by process memory or, when redis_url is set, Redis.
+
+    get_or_load() coalesces concurrent misses for a key onto a single loader
+    call. With stale_ttl > 0, an expired entry is still served for up to
+    stale_ttl seconds while one background thread refreshes it
+    (stale-while-revalidate). The Redis backend stores JSON, so values must be
+    JSON-serialisable there; the memory backend stores objects as-is.
+    """
+
+    def __init__(
+        self, ttl, stale_ttl=0, maxsize=1024, redis_url=None, namespace="cache"
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self.namespace = namespace
+        self._redis = redis.Redis.from_url(redis_url) if redis_url else None
+        self._release_lock = (
+            self._redis.register_script(_RELEASE_LOCK) if self._redis else None
+        )
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    # --- storage ---
+
+    def _redis_key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _read(self, key):
+        """Returns (value, stored_at) or None."""
+        if self._redis is not None:
+            raw = self._redis.get(self._redis_key(key))
+            if raw is None:
+                return None
+            payload = json.loads(raw)
+            return payload["value"], payload["stored_at"]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _write(self, key, value):
+        stored_at = time.time()
+        if self._redis is not None:
+            self._redis.set(
+                self._redis_key(key),
+                json.dumps({"value": value, "stored_at": stored_at}),
+                ex=max(1, int(self.ttl + self.stale_ttl)),
+            )
+            return
+
+        with self._lock:
+            self._entries[key] = (value, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    # --- public API ---
+
+    def get(self, key):
+        """Returns the fresh value for key, or None."""
+        entry = self._fresh(key)
+        return None if entry is None else entry[0]
+
+    def set(self, key, value):
+        self._write(key, value)
+
+    def delete(self, key):
+        if self._redis is not None:
+            self._redis.delete(self._redis_key(key))
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        if self._redis is not None:
+            for redis_key in self._redis.scan_iter(f"{self.namespace}:*"):
+                self._redis.delete(redis_key)
+            return
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_load(self, key, loader):
+        """Returns the cached value for key, calling loader() at most once on a miss."""
+        if self.ttl <= 0:
+            return loader()
+
+        entry = self._read(key)
+        if entry is not None:
+            value, stored_at = entry
+            age = time.time() - stored_at
+            if age < self.ttl:
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self._refresh_in_background(key, loader)
+                return value
+
+        return self._load(key, loader)
+
+    # --- loading ---
+
+    def _load(self, key, loader):
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = self._load_shared(key, loader)
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.event.set()
+
+    def _fresh(self, key):
+        """The (value, stored_at) entry for key if it has not expired, else None."""
+        entry = self._read(key)
+        if entry is None or time.time() - entry[1] >= self.ttl:
+            return None
+        return entry
+
+    def _load_shared(self, key, loader):
+        """With Redis, lets only one process call the loader for a key at a time."""
+        if self._redis is None:
+            value = loader()
+            self._write(key, value)
+            return value
+
+        lock_key = self._redis_key(f"{key}:lock")
+        token = uuid.uuid4().hex
+        while not self._redis.set(lock_key, token, nx=True, px=LOCK_TIMEOUT_MS):
+            # Another process is loading; use its result once it is stored.
+            # The lock expires, so a holder that died only delays us.
+            time.sleep(0.05)
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry[0]
+        try:
+            # The previous holder may have stored the value just before
+            # releasing the lock we then acquired.
+            entry = self._fresh(key)
+            if entry is not None:
+                return entry[0]
+            value = loader()
+            self._write(key, value)
+            return value
+        finally:
+            self._release_lock(keys=[lock_key], args=[token])
+
+    def _refresh_in_background(self, key, loader):
+        with self._lock:
+            if key in self._inflight:
+                return
+
+        def refresh():
+            try:
+                self._load(key, loader)
+            except Exception as e:
+                print(f"Background refresh of {self.namespace}:{key} failed: {e}")
+
+        threading.Thread(target=refresh, daemon=True).start()
@@ -1,14 +1,21 @@
-from utils.ai_manager import get_query_intent
-from utils.action_resolver import resolve_action
+from utils.intent_classifier import classify_intents
+from utils.action_resolver import resolve_actions
 
 
 def process_caregiver_query(query_text: str, senior_id: str) -> str:
     """Processes a caregiver's text query and returns a text response."""
 
-    intent_data = get_query_intent(query_text)
-    intent = intent_data.get("intent", "unknown")
-    entities = intent_data.get("entities", {})
+    # Common phrasings are classified locally; only the rest reach the LLM.
+    # A compound question is answered part by part from one data snapshot.
+    intents = classify_intents(query_text)
+    entities = {}
+    for intent_data in intents:
+        entities.update(intent_data.get("entities", {}))
 
-    response_text = resolve_action(intent, senior_id, entities)
+    answers = resolve_actions(
+        [intent_data.get("intent", "unknown") for intent_data in intents],
+        senior_id,
+        entities,
+    )
 
-    return response_text
+    return "\n\n".join(answers.values())
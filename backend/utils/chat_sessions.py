@@ -0,0 +1,102 @@
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from models import ChatSession, ChatTurn, db
+from utils.ai_manager import summarize_conversation
+
+
+def get_or_create_session(report_id, user_id):
+    """The user's chat session about a report, created on first use."""
+    session = ChatSession.query.filter_by(report_id=report_id, user_id=user_id).first()
+    if session is not None:
+        return session
+    try:
+        session = ChatSession(report_id=report_id, user_id=user_id)
+        db.session.add(session)
+        db.session.commit()
+        return session
+    except IntegrityError:
+        # Created by a concurrent request for the same report and user.
+        db.session.rollback()
+        return ChatSession.query.filter_by(report_id=report_id, user_id=user_id).one()
+
+
+def _turns_after(session_id, seq):
+    return (
+        db.session.execute(
+            select(ChatTurn)
+            .where(ChatTurn.session_id == session_id, ChatTurn.seq > seq)
+            .order_by(ChatTurn.seq)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def all_turns(session):
+    return _turns_after(session.session_id, 0)
+
+
+def context_turns(session):
+    """The session's unsummarised turns as [{"role", "text"}], oldest first."""
+    return [
+        {"role": turn.role, "text": turn.text}
+        for turn in _turns_after(session.session_id, session.summarized_seq)
+    ]
+
+
+def append_exchange(session, question, answer):
+    """
+    Adds a question and its answer to the session; the caller commits. Two
+    requests racing on one session collide on (session_id, seq) and the
+    later commit fails with IntegrityError.
+    """
+    seq = session.last_seq
+    db.session.add(
+        ChatTurn(session_id=session.session_id, seq=seq + 1, role="user", text=question)
+    )
+    db.session.add(
+        ChatTurn(session_id=session.session_id, seq=seq + 2, role="model", text=answer)
+    )
+    session.last_seq = seq + 2
+
+
+def needs_compaction(session):
+    max_messages = current_app.config.get("CHAT_SESSION_MAX_MESSAGES", 12)
+    return session.last_seq - session.summarized_seq > max_messages
+
+
+def compact_session(session_id):
+    """
+    Folds all but the CHAT_SESSION_RECENT_MESSAGES newest unsummarised turns
+    into the session's running summary. Returns True if the summary changed.
+    """
+    session = db.session.get(ChatSession, session_id)
+    if session is None or not needs_compaction(session):
+        return False
+
+    keep = current_app.config.get("CHAT_SESSION_RECENT_MESSAGES", 6)
+    turns = _turns_after(session_id, session.summarized_seq)
+    folded = turns[: len(turns) - keep] if keep > 0 else turns
+    if not folded:
+        return False
+
+    summary = summarize_conversation(
+        session.summary, [{"role": t.role, "text": t.text} for t in folded]
+    )
+    if not summary or summary.startswith("Error"):
+        return False
+
+    # Only apply if no other compaction moved the watermark meanwhile.
+    result = db.session.execute(
+        update(ChatSession)
+        .where(
+            ChatSession.session_id == session_id,
+            ChatSession.summarized_seq == session.summarized_seq,
+        )
+        .values(summary=summary, summarized_seq=folded[-1].seq)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount == 1
@@ -0,0 +1,114 @@
+from flask import current_app, g, has_app_context
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload
+
+from models import Caregiver, SeniorCitizen, ServiceProvider, User, db
+from utils.cache import TTLCache
+
+_PROFILE_RELATIONSHIPS = ("senior_citizen", "caregiver", "service_provider")
+
+
+def _identity_cache():
+    """Cross-request cache of detached users, or None when IDENTITY_CACHE_TTL is 0."""
+    ttl = current_app.config.get("IDENTITY_CACHE_TTL", 0)
+    if not ttl:
+        return None
+    cache = current_app.extensions.get("identity_cache")
+    if cache is None:
+        cache = TTLCache(ttl=ttl, maxsize=10_000, namespace="identity")
+        current_app.extensions["identity_cache"] = cache
+    return cache
+
+
+def _load_user(user_id):
+    return (
+        db.session.query(User)
+        .options(
+            joinedload(User.roles),
+            *(joinedload(getattr(User, name)) for name in _PROFILE_RELATIONSHIPS),
+        )
+        .filter_by(user_id=user_id)
+        .first()
+    )
+
+
+def _detach_for_cache(user):
+    """
+    Expunges the user, its roles and profile rows from the request session so
+    the cached graph is never expired or mutated by that session.
+    """
+    related = list(user.roles)
+    related += [getattr(user, name) for name in _PROFILE_RELATIONSHIPS]
+    for obj in [user, *related]:
+        if obj is not None and obj in db.session:
+            db.session.expunge(obj)
+
+
+def resolve_user(user_id=None):
+    """
+    Returns the request's User with roles and role-profile rows loaded,
+    querying the database at most once per request.
+
+    user_id defaults to the JWT identity. The result is kept on ``g``; with
+    IDENTITY_CACHE_TTL > 0 it is also cached across requests and merged into
+    the request session without a query.
+    """
+    if user_id is None:
+        user_id = get_jwt_identity()
+    if not user_id:
+        return None
+    user_id = str(user_id)
+
+    cached = g.get("identity_user")
+    if cached is not None and cached.user_id == user_id:
+        return cached
+
+    user = None
+    cache = _identity_cache()
+    if cache is not None:
+        detached = cache.get(user_id)
+        if detached is not None:
+            try:
+                user = db.session.merge(detached, load=False)
+            except Exception:
+                cache.delete(user_id)
+
+    if user is None:
+        user = _load_user(user_id)
+        if user is not None and cache is not None:
+            _detach_for_cache(user)
+            cache.set(user_id, user)
+            user = db.session.merge(user, load=False)
+
+    g.identity_user = user
+    return user
+
+
+def invalidate_user(user_id):
+    """
+    Drops a user from the cross-request cache. The request's own instance on
+    ``g`` lives in the session that made the change, so it is already current.
+    """
+    if not has_app_context():
+        return
+    cache = current_app.extensions.get("identity_cache")
+    if cache is not None:
+        cache.delete(str(user_id))
+
+
+# Role changes flush the User row (the roles collection is dirty); profile
+# rows are keyed by the owning user's id.
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+@event.listens_for(SeniorCitizen, "after_insert")
+@event.listens_for(SeniorCitizen, "after_update")
+@event.listens_for(SeniorCitizen, "after_delete")
+@event.listens_for(Caregiver, "after_insert")
+@event.listens_for(Caregiver, "after_update")
+@event.listens_for(Caregiver, "after_delete")
+@event.listens_for(ServiceProvider, "after_insert")
+@event.listens_for(ServiceProvider, "after_update")
+@event.listens_for(ServiceProvider, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    invalidate_user(target.user_id)
@@ -0,0 +1,186 @@
+import re
+import threading
+from collections import Counter
+
+from flask import current_app, has_app_context
+
+from utils.ai_manager import get_query_intent
+
+_MEDICINE = r"(medicines?|medications?|meds|pills?|tablets?|doses?)"
+
+# (intent, pattern, confidence). Specific phrasings score high; bare topic
+# keywords score low so that a query touching two topics is left to the LLM.
+RULES = [
+    (
+        "get_next_appointment",
+        r"\b(next|upcoming|when is (my|his|her)|when's (my|his|her))\b.*\b(appointment|appt|check ?-?up|doctor)",
+        0.95,
+    ),
+    ("get_next_appointment", r"\bappointments?\b", 0.6),
+    (
+        "get_pending_appointments_caregiver",
+        r"\b(pending|outstanding|remaining|incomplete|not (yet )?completed)\b.*\bappointments?\b",
+        0.95,
+    ),
+    ("get_pending_appointments_caregiver", r"\bappointments?\b.*\bthis month\b", 0.9),
+    ("get_medication_schedule", rf"\b(next|upcoming)\b.*\b{_MEDICINE}\b", 0.95),
+    ("get_medication_schedule", rf"\b{_MEDICINE} (schedule|times?)\b", 0.95),
+    ("get_medication_schedule", rf"\b(when|what time)\b.*\b(take|{_MEDICINE})\b", 0.9),
+    ("get_medication_schedule", rf"\b{_MEDICINE}\b", 0.6),
+    (
+        "get_medication_history_caregiver",
+        rf"\b(has|have|did)\b.*\b(taken|take|took)\b.*\b{_MEDICINE}\b",
+        0.9,
+    ),
+    ("get_medication_history_caregiver", rf"\b{_MEDICINE} history\b", 0.95),
+    (
+        "get_medication_history_caregiver",
+        r"\b(took|taken)\b.*\b(this|last|past) week\b",
+        0.9,
+    ),
+    ("get_emergency_contacts", r"\bemergency contacts?\b", 0.95),
+    ("get_emergency_contacts", r"\bwho (should|do|can) (i|we) call\b", 0.85),
+    ("get_news_summary", r"\b(news|headlines?)\b", 0.9),
+    (
+        "get_event_details",
+        r"\b(upcoming|nearby|local|community) (events?|activities)\b",
+        0.95,
+    ),
+    ("get_event_details", r"\b(events?|activities|what's happening)\b", 0.8),
+    ("get_user_stats", r"\b(stats|statistics|screen ?time|how active)\b", 0.9),
+]
+
+_COMPILED = [(intent, re.compile(pattern), score) for intent, pattern, score in RULES]
+
+# Runner-up scores this close to the best make the match ambiguous.
+AMBIGUITY_MARGIN = 0.1
+
+
+# Where a compound question splits into separate questions: after "?" or
+# ";", or at "and"/"also" directly followed by a new question.
+_QUESTION_BREAK = re.compile(
+    r"[?;]+|\s*,?\s+\b(?:and|also)\s+(?=(?:what|when|who|which|how|has|have|did|does|do|is|are|any)\b)",
+    re.IGNORECASE,
+)
+
+
+def split_questions(text):
+    """Splits a compound question into its non-empty parts."""
+    return [part.strip() for part in _QUESTION_BREAK.split(text) if part.strip()]
+
+
+def _normalize(text):
+    return " ".join(re.sub(r"[^\w\s'?-]", " ", text.lower()).split())
+
+
+def classify(text):
+    """
+    Matches text against RULES. Returns (intent, confidence), with intent
+    None when no rule matches. A runner-up intent scoring within
+    AMBIGUITY_MARGIN of the best halves its weight off the confidence.
+    """
+    text = _normalize(text)
+    scores = {}
+    for intent, pattern, score in _COMPILED:
+        if score > scores.get(intent, 0) and pattern.search(text):
+            scores[intent] = score
+    if not scores:
+        return None, 0.0
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    intent, best = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    if runner_up >= best - AMBIGUITY_MARGIN:
+        return intent, best - runner_up / 2
+    return intent, best
+
+
+class IntentMetrics:
+    """Thread-safe counts of how queries were classified, by source and intent."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+
+    def record(self, source, intent):
+        """Counts one classification; returns the total classified so far."""
+        with self._lock:
+            self._counts[source] += 1
+            self._counts[f"{source}:{intent}"] += 1
+            return self._counts["rules"] + self._counts["llm"]
+
+    def snapshot(self):
+        """Counts plus rule_hit_rate, the share of queries answered by rules."""
+        with self._lock:
+            counts = dict(self._counts)
+        total = counts.get("rules", 0) + counts.get("llm", 0)
+        counts["rule_hit_rate"] = counts.get("rules", 0) / total if total else 0.0
+        return counts
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+
+
+metrics = IntentMetrics()
+
+
+def _record(source, intent):
+    """
+    Counts a classification and, every INTENT_METRICS_LOG_EVERY of them,
+    logs how many the rules answered without the LLM.
+    """
+    total = metrics.record(source, intent)
+    every = 500
+    if has_app_context():
+        every = current_app.config.get("INTENT_METRICS_LOG_EVERY", every)
+    if every and total % every == 0:
+        counts = metrics.snapshot()
+        print(
+            f"Intent classification: {counts.get('rules', 0)} by rules, "
+            f"{counts.get('llm', 0)} by the LLM "
+            f"({counts['rule_hit_rate']:.0%} rule hits)"
+        )
+
+
+def classify_intent(text):
+    """
+    Classifies a caregiver or voice query, answering from the local rules
+    when their confidence reaches INTENT_RULE_MIN_CONFIDENCE and asking the
+    LLM (get_query_intent) otherwise. Returns {"intent", "entities",
+    "source"}, where source is "rules" or "llm".
+    """
+    threshold = 0.75
+    if has_app_context():
+        threshold = current_app.config.get("INTENT_RULE_MIN_CONFIDENCE", threshold)
+
+    intent, confidence = classify(text)
+    if intent is not None and confidence >= threshold:
+        _record("rules", intent)
+        return {"intent": intent, "entities": {}, "source": "rules"}
+
+    result = get_query_intent(text)
+    _record("llm", result.get("intent", "unknown"))
+    return {
+        "intent": result.get("intent", "unknown"),
+        "entities": result.get("entities", {}),
+        "source": "llm",
+    }
+
+
+def classify_intents(text):
+    """
+    Classifies each question of a possibly compound query with
+    classify_intent. Returns the distinct results in the order asked; a
+    single question yields one result. Parts that are not understood are
+    dropped unless nothing else was.
+    """
+    results = []
+    seen = set()
+    for question in split_questions(text) or [text]:
+        result = classify_intent(question)
+        if result["intent"] not in seen:
+            seen.add(result["intent"])
+            results.append(result)
+    known = [r for r in results if r["intent"] != "unknown"]
+    return known or results[:1]
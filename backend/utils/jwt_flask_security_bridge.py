@@ -1,22 +1,16 @@
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask import g
 from flask_login import login_user
-from models import db, User
-from sqlalchemy.orm import joinedload
+from utils.identity import resolve_user
 
 
 def load_user_from_jwt():
+    # The app context (and g) can outlive a request, e.g. under the test client.
+    g.pop("identity_user", None)
     try:
         if verify_jwt_in_request(optional=True):
-            user_id = get_jwt_identity()
-            if user_id:
-                user = (
-                    db.session.query(User)
-                    .options(joinedload(User.roles))
-                    .filter_by(user_id=user_id)
-                    .first()
-                )
-                if user:
-                    _ = user.roles
-                    login_user(user, remember=False, fresh=False)
+            user = resolve_user(get_jwt_identity())
+            if user:
+                login_user(user, remember=False, fresh=False)
     except Exception as e:
         print(f"[load_user_from_jwt] Exception: {e!r}")
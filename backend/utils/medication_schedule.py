@@ -0,0 +1,212 @@
+from datetime import datetime, timedelta, timezone
+
+import pytz
+from dateutil.rrule import rrule, rrulestr
+from flask import current_app
+from sqlalchemy import insert, select
+
+from db.types import new_id
+from models import Medication, MedicationSchedule, ReferenceType, ScheduledReminder, db
+from tasks import send_medication_reminder
+from utils.reminder_scheduler import schedule_reminders
+from utils.senior_context import invalidate_context
+
+# Rules are written in the seniors' wall-clock time, like every other time
+# the app shows them: BYHOUR=8 means 08:00 in Asia/Kolkata.
+SCHEDULE_TZ = pytz.timezone("Asia/Kolkata")
+
+
+def reminder_key(medication_id):
+    return f"medication:{medication_id}"
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _to_utc_naive(dt):
+    """Naive UTC for dt; naive values are taken to be UTC already."""
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _utc_to_local(dt):
+    """Naive UTC to naive SCHEDULE_TZ wall-clock time."""
+    return pytz.utc.localize(dt).astimezone(SCHEDULE_TZ).replace(tzinfo=None)
+
+
+def _local_to_utc(dt):
+    """Naive SCHEDULE_TZ wall-clock time to naive UTC."""
+    return SCHEDULE_TZ.localize(dt).astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def parse_rule(rule, dtstart):
+    """
+    The dateutil rrule for an RRULE body such as "FREQ=DAILY;BYHOUR=8,20"
+    (an "RRULE:" prefix is accepted), starting at dtstart (naive UTC).
+
+    The rule is expanded in SCHEDULE_TZ wall-clock time, so its occurrences
+    are naive local datetimes and an UNTIL is local time without a "Z".
+    Raises ValueError for anything but a single valid rule.
+    """
+    text = rule.strip()
+    if text.upper().startswith("RRULE:"):
+        text = text[len("RRULE:") :]
+    if not text or ":" in text or "\n" in text:
+        raise ValueError("Expected a single RRULE, e.g. 'FREQ=DAILY;BYHOUR=8,20'.")
+
+    parsed = rrulestr(text, dtstart=_utc_to_local(dtstart))
+    if not isinstance(parsed, rrule):
+        raise ValueError("Expected a single RRULE, e.g. 'FREQ=DAILY;BYHOUR=8,20'.")
+    return parsed
+
+
+def horizon_end(now=None):
+    """How far ahead doses are materialised, as naive UTC."""
+    days = current_app.config.get("MEDICATION_SCHEDULE_HORIZON_DAYS", 14)
+    return (now or _utcnow()) + timedelta(days=days)
+
+
+def expand_schedule(schedule, until):
+    """
+    Creates the doses of schedule that fall in [expanded_until, until) and
+    their reminders, then moves expanded_until forward.
+
+    The doses go in with one multi-row INSERT and the reminders with one
+    batch write, however many there are. At most MEDICATION_SCHEDULE_MAX_DOSES
+    are added per call; the rest follow on the next expansion. A schedule
+    whose rule has no occurrences left is deactivated. The caller commits.
+    Returns the number of doses added.
+    """
+    rule = parse_rule(schedule.rrule, schedule.dtstart)
+    max_doses = current_app.config.get("MEDICATION_SCHEDULE_MAX_DOSES", 500)
+    start = _utc_to_local(schedule.expanded_until)
+    end = _utc_to_local(until)
+
+    times = []
+    for occurrence in rule.xafter(start, count=max_doses + 1, inc=True):
+        if occurrence >= end or len(times) == max_doses:
+            end = min(end, occurrence)
+            break
+        times.append(_local_to_utc(occurrence))
+
+    if times:
+        doses = [
+            {
+                "medication_id": new_id(),
+                "name": schedule.name,
+                "dosage": schedule.dosage,
+                "time": time,
+                "isTaken": False,
+                "missed_counted": False,
+                "senior_id": schedule.senior_id,
+                "schedule_id": schedule.schedule_id,
+            }
+            for time in times
+        ]
+        db.session.execute(insert(Medication), doses)
+        schedule_reminders(
+            [
+                {
+                    "dedupe_key": reminder_key(dose["medication_id"]),
+                    "task_name": send_medication_reminder.name,
+                    "task_args": [dose["medication_id"]],
+                    "due_at": dose["time"],
+                    "reference_type": ReferenceType.medication,
+                    "reference_id": dose["medication_id"],
+                }
+                for dose in doses
+            ]
+        )
+        # Bulk inserts bypass the mapper events that normally do this.
+        invalidate_context(schedule.senior_id)
+
+    schedule.expanded_until = _local_to_utc(end)
+    if rule.after(end, inc=True) is None:
+        schedule.active = False
+    return len(times)
+
+
+def create_schedule(senior_id, name, dosage, rule, start, now=None):
+    """
+    Adds a recurring schedule and its doses up to the rolling horizon.
+    Occurrences before now are skipped. Raises ValueError for an invalid
+    rule. The caller commits. Returns (schedule, doses added).
+    """
+    now = now or _utcnow()
+    dtstart = _to_utc_naive(start)
+    parse_rule(rule, dtstart)
+
+    schedule = MedicationSchedule(
+        schedule_id=new_id(),
+        name=name,
+        dosage=dosage,
+        rrule=rule.strip(),
+        dtstart=dtstart,
+        expanded_until=max(dtstart, now),
+        senior_id=senior_id,
+    )
+    db.session.add(schedule)
+    db.session.flush()
+    return schedule, expand_schedule(schedule, horizon_end(now))
+
+
+def stop_schedule(schedule, now=None):
+    """
+    Deactivates schedule and removes its untaken doses from now on, together
+    with their reminders. Past doses stay as history. The caller commits.
+    Returns the number of doses removed.
+    """
+    now = now or _utcnow()
+    schedule.active = False
+
+    upcoming = (
+        db.session.execute(
+            select(Medication.medication_id).where(
+                Medication.schedule_id == schedule.schedule_id,
+                Medication.isTaken.is_(False),
+                Medication.time >= now,
+            )
+        )
+        .scalars()
+        .all()
+    )
+    if not upcoming:
+        return 0
+
+    ScheduledReminder.query.filter(
+        ScheduledReminder.dedupe_key.in_(
+            [reminder_key(dose_id) for dose_id in upcoming]
+        )
+    ).delete(synchronize_session=False)
+    Medication.query.filter(Medication.medication_id.in_(upcoming)).delete(
+        synchronize_session=False
+    )
+    invalidate_context(schedule.senior_id)
+    return len(upcoming)
+
+
+def extend_schedules(now=None):
+    """
+    Expands every active schedule up to the rolling horizon, committing
+    after each one. Returns the number of doses added.
+    """
+    until = horizon_end(now)
+    schedule_ids = (
+        db.session.execute(
+            select(MedicationSchedule.schedule_id).where(
+                MedicationSchedule.active.is_(True),
+                MedicationSchedule.expanded_until < until,
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    added = 0
+    for schedule_id in schedule_ids:
+        schedule = db.session.get(MedicationSchedule, schedule_id)
+        added += expand_schedule(schedule, until)
+        db.session.commit()
+    return added
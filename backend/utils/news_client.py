@@ -0,0 +1,53 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+NEWSAPI_TOP_HEADLINES_URL = "https://newsapi.org/v2/top-headlines"
+
+NEWSAPI_CATEGORIES = [
+    "business",
+    "entertainment",
+    "general",
+    "health",
+    "science",
+    "sports",
+    "technology",
+]
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Process-wide requests session, so NewsAPI calls reuse pooled connections."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                session.mount(
+                    "https://",
+                    HTTPAdapter(pool_connections=2, pool_maxsize=10, max_retries=1),
+                )
+                _session = session
+    return _session
+
+
+def fetch_top_headlines(params, timeout=5):
+    """GETs /v2/top-headlines and returns the decoded JSON body."""
+    response = get_session().get(
+        NEWSAPI_TOP_HEADLINES_URL, params=params, timeout=timeout
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+def parse_categories(news_categories):
+    """Splits a comma-separated preference string into known NewsAPI categories."""
+    categories = []
+    for category in (news_categories or "").split(","):
+        category = category.strip().lower()
+        if category in NEWSAPI_CATEGORIES and category not in categories:
+            categories.append(category)
+    return categories or ["general"]
@@ -1,42 +1,165 @@
 import os
+import smtplib
+import threading
 from twilio.rest import Client
-from flask_mail import Message
-from extensions import mail
+from twilio.http.http_client import TwilioHttpClient
+from flask_mail import Connection, Message
 
+_twilio_client = None
+_twilio_credentials = None
+_twilio_lock = threading.Lock()
 
-def send_sms(to_number, body):
+# Socket timeout (seconds) for one SMS or SMTP call when the caller gives none.
+DEFAULT_SEND_TIMEOUT = 10
+
+
+def _twilio_settings():
+    return (
+        os.environ.get("TWILIO_ACCOUNT_SID"),
+        os.environ.get("TWILIO_AUTH_TOKEN"),
+        os.environ.get("TWILIO_PHONE_NUMBER"),
+    )
+
+
+def get_twilio_client(account_sid, auth_token, timeout=DEFAULT_SEND_TIMEOUT):
+    """
+    Process-wide Twilio client. Its HTTP client keeps a pooled session, so
+    consecutive SMS reuse the same TLS connection instead of reconnecting.
+    timeout bounds each HTTP request; a client is kept per timeout.
+    """
+    global _twilio_client, _twilio_credentials
+    with _twilio_lock:
+        settings = (account_sid, auth_token, timeout)
+        if _twilio_client is None or _twilio_credentials != settings:
+            _twilio_client = Client(
+                account_sid,
+                auth_token,
+                http_client=TwilioHttpClient(pool_connections=True, timeout=timeout),
+            )
+            _twilio_credentials = settings
+        return _twilio_client
+
+
+def send_sms(to_number, body, timeout=None):
     # Generate your twilio free trial credentials and put here to test
 
-    twilio_account_sid = os.environ.get("TWILIO_ACCOUNT_SID")
-    twilio_auth_token = os.environ.get("TWILIO_AUTH_TOKEN")
-    twilio_phone_number = os.environ.get("TWILIO_PHONE_NUMBER")
+    twilio_account_sid, twilio_auth_token, twilio_phone_number = _twilio_settings()
 
     if not all([twilio_account_sid, twilio_auth_token, twilio_phone_number]):
         print("Twilio credentials not fully set up. Skipping SMS.")
-        return
+        return False
 
-    client = Client(twilio_account_sid, twilio_auth_token)
+    client = get_twilio_client(
+        twilio_account_sid, twilio_auth_token, timeout or DEFAULT_SEND_TIMEOUT
+    )
     try:
         message = client.messages.create(
             to=to_number, from_=twilio_phone_number, body=body
         )
         print(f"SMS sent: {message.sid}")
+        return True
     except Exception as e:
         print(f"Error sending SMS: {e}")
+        return False
+
+
+class _TimeoutConnection(Connection):
+    """A Flask-Mail connection whose SMTP socket times out instead of hanging."""
+
+    def __init__(self, state, timeout):
+        super().__init__(state)
+        self.timeout = timeout
+
+    def configure_host(self):
+        smtp = smtplib.SMTP_SSL if self.mail.use_ssl else smtplib.SMTP
+        host = smtp(self.mail.server, self.mail.port, timeout=self.timeout)
+        host.set_debuglevel(int(self.mail.debug))
+        if self.mail.use_tls:
+            host.starttls()
+        if self.mail.username and self.mail.password:
+            host.login(self.mail.username, self.mail.password)
+        return host
+
 
+def _connect(app, timeout=None):
+    """An SMTP connection for app whose calls time out after timeout seconds."""
+    timeout = timeout or app.config.get("MAIL_TIMEOUT_SECONDS", DEFAULT_SEND_TIMEOUT)
+    return _TimeoutConnection(app.extensions["mail"], timeout)
 
-def send_email(app, recipient, subject, body):
+
+def _build_email(app, recipient, subject, body):
+    msg = Message(
+        subject,
+        sender=app.config.get("MAIL_DEFAULT_SENDER"),
+        recipients=[recipient],
+    )
+    msg.body = body
+    return msg
+
+
+def send_email(app, recipient, subject, body, timeout=None):
 
     try:
-        msg = Message(
-            subject,
-            sender=app.config.get("MAIL_DEFAULT_SENDER"),
-            recipients=[recipient],
-        )
-        msg.body = body
-        mail.send(msg)
+        with _connect(app, timeout) as conn:
+            conn.send(_build_email(app, recipient, subject, body))
         print(f"Successfully sent email to {recipient}")
         return True
     except Exception as e:
         print(f"Error sending email to {recipient}: {e}")
         return False
+
+
+def _send_emails(app, messages):
+    """
+    Sends every email message over one SMTP session, reconnecting once if the
+    server drops the connection mid-batch. Returns one bool per message.
+    """
+    results = []
+    pending = list(messages)
+    reconnected = False
+
+    while pending:
+        try:
+            with _connect(app) as conn:
+                while pending:
+                    message = pending[0]
+                    try:
+                        conn.send(
+                            _build_email(
+                                app, message["to"], message["subject"], message["body"]
+                            )
+                        )
+                        results.append(True)
+                    except smtplib.SMTPServerDisconnected:
+                        raise
+                    except Exception as e:
+                        print(f"Error sending email to {message['to']}: {e}")
+                        results.append(False)
+                    pending.pop(0)
+        except Exception as e:
+            if reconnected or not pending:
+                print(f"Error sending email batch: {e}")
+                results.extend(False for _ in pending)
+                break
+            reconnected = True
+
+    return results
+
+
+def send_many(app, messages):
+    """
+    Delivers pre-rendered messages ({"channel", "to", "subject", "body"}) with
+    one SMTP session for all emails and the pooled Twilio client for all SMS.
+    Returns one bool per message, in input order.
+    """
+    results = [False] * len(messages)
+
+    emails = [(i, m) for i, m in enumerate(messages) if m["channel"] == "email"]
+    for (i, _), ok in zip(emails, _send_emails(app, [m for _, m in emails])):
+        results[i] = ok
+
+    for i, message in enumerate(messages):
+        if message["channel"] == "sms":
+            results[i] = send_sms(message["to"], message["body"])
+
+    return results
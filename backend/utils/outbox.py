@@ -0,0 +1,303 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import and_, delete, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from models import NotificationOutbox, db
+
+# Dialects whose INSERT supports ON CONFLICT DO NOTHING.
+_CONFLICT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _claimable(channel, now, stale_before):
+    """Rows of channel that are due, or whose dispatcher died mid-batch."""
+    return and_(
+        NotificationOutbox.channel == channel,
+        or_(
+            and_(
+                NotificationOutbox.status == "pending",
+                NotificationOutbox.next_attempt_at <= now,
+            ),
+            and_(
+                NotificationOutbox.status == "claimed",
+                NotificationOutbox.claimed_at <= stale_before,
+            ),
+        ),
+    )
+
+
+def _insert_new(rows):
+    """
+    Inserts the rows whose dedupe_key is not taken yet and returns how many
+    were inserted. A concurrent producer's row with the same key is skipped
+    by the database instead of failing the caller's transaction.
+    """
+    dialect_insert = _CONFLICT_INSERTS.get(db.session.get_bind().dialect.name)
+    if dialect_insert is not None:
+        stmt = (
+            dialect_insert(NotificationOutbox)
+            .on_conflict_do_nothing(index_elements=["dedupe_key"])
+            .returning(NotificationOutbox.outbox_id)
+        )
+        return len(db.session.execute(stmt, rows).all())
+
+    # Elsewhere each row gets a savepoint, so a duplicate only undoes itself.
+    added = 0
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(NotificationOutbox), [row])
+            added += 1
+        except IntegrityError:
+            pass
+    return added
+
+
+def enqueue_notifications(messages):
+    """
+    Adds rendered messages ({"channel", "to", "subject", "body", "dedupe_key"})
+    to the outbox. Messages whose dedupe_key is already queued, including by
+    a concurrent producer, are skipped.
+
+    Rows are inserted in the caller's transaction, which commits them
+    together with the state change that produced them. Returns the number of
+    rows added.
+    """
+    if not messages:
+        return 0
+
+    now = _utcnow()
+    rows = {}
+    for message in messages:
+        key = message.get("dedupe_key") or str(uuid.uuid4())
+        rows.setdefault(
+            key,
+            {
+                "dedupe_key": key,
+                "channel": message["channel"],
+                "recipient": message["to"],
+                "subject": message.get("subject"),
+                "body": message["body"],
+                "next_attempt_at": now,
+            },
+        )
+    return _insert_new(list(rows.values()))
+
+
+def claim_batch(channel, now=None, batch_size=None):
+    """
+    Atomically marks up to batch_size deliverable rows of channel as claimed
+    and returns them, oldest first.
+    """
+    config = current_app.config
+    now = now or _utcnow()
+    batch_size = batch_size or config.get("OUTBOX_BATCH_SIZE", 100)
+    stale_before = now - timedelta(
+        seconds=config.get("OUTBOX_CLAIM_TIMEOUT_SECONDS", 300)
+    )
+    token = str(uuid.uuid4())
+
+    ids = (
+        db.session.execute(
+            select(NotificationOutbox.outbox_id)
+            .where(_claimable(channel, now, stale_before))
+            .order_by(NotificationOutbox.next_attempt_at)
+            .limit(batch_size)
+        )
+        .scalars()
+        .all()
+    )
+    if not ids:
+        return []
+
+    db.session.execute(
+        update(NotificationOutbox)
+        .where(
+            NotificationOutbox.outbox_id.in_(ids),
+            _claimable(channel, now, stale_before),
+        )
+        .values(
+            status="claimed",
+            claim_token=token,
+            claimed_at=now,
+            attempts=NotificationOutbox.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return (
+        NotificationOutbox.query.filter_by(claim_token=token)
+        .order_by(NotificationOutbox.next_attempt_at)
+        .all()
+    )
+
+
+def _record_results(rows, results, token, now):
+    """
+    Stores the outcome of a delivered batch. Each UPDATE is conditional on
+    the claim token, so a row whose claim timed out and was taken over by
+    another dispatcher meanwhile is left to that dispatcher.
+    """
+    config = current_app.config
+    max_attempts = config.get("OUTBOX_MAX_ATTEMPTS", 5)
+    backoff = config.get("OUTBOX_RETRY_BACKOFF_SECONDS", 30)
+
+    sent, failed, retry = [], [], {}
+    for row, ok in zip(rows, results):
+        if ok:
+            sent.append(row.outbox_id)
+        elif row.attempts >= max_attempts:
+            failed.append(row.outbox_id)
+        else:
+            retry.setdefault(row.attempts, []).append(row.outbox_id)
+
+    updates = [
+        (sent, {"status": "sent", "sent_at": now, "last_error": None}),
+        (failed, {"status": "failed", "last_error": "Delivery failed"}),
+    ]
+    for attempts, ids in retry.items():
+        updates.append(
+            (
+                ids,
+                {
+                    "status": "pending",
+                    "next_attempt_at": now
+                    + timedelta(seconds=backoff * 2 ** (attempts - 1)),
+                    "last_error": "Delivery failed",
+                },
+            )
+        )
+
+    for ids, values in updates:
+        if ids:
+            db.session.execute(
+                update(NotificationOutbox)
+                .where(
+                    NotificationOutbox.outbox_id.in_(ids),
+                    NotificationOutbox.claim_token == token,
+                )
+                .values(claim_token=None, **values)
+                .execution_options(synchronize_session=False)
+            )
+    db.session.commit()
+
+
+def _send(channel, send_batch, rows):
+    messages = [
+        {
+            "channel": row.channel,
+            "to": row.recipient,
+            "subject": row.subject,
+            "body": row.body,
+        }
+        for row in rows
+    ]
+    try:
+        return send_batch(messages)
+    except Exception as e:
+        print(f"Outbox {channel} batch failed: {e}")
+        return [False] * len(rows)
+
+
+def drain_outbox(channel, send_batch, now=None, batch_size=None, max_seconds=None):
+    """
+    Claims and delivers the channel's due rows in batches until the outbox is
+    empty or max_seconds have passed.
+
+    send_batch(messages) receives rendered message dicts and returns one bool
+    per message. Failed rows are retried with exponential backoff until
+    OUTBOX_MAX_ATTEMPTS, then marked failed.
+
+    Sending is paced to the channel's OUTBOX_RATE_LIMITS entry (messages per
+    second): each claimed batch is handed to send_batch in chunks of at most
+    `rate` messages, one chunk per second-long slot. Within a chunk the
+    messages go out as fast as send_batch sends them, so the long-run rate
+    is the limit but a provider measuring over a sliding second can see up
+    to twice `rate` where two chunks meet. Returns the number sent.
+    """
+    config = current_app.config
+    batch_size = batch_size or config.get("OUTBOX_BATCH_SIZE", 100)
+    max_seconds = max_seconds or config.get("OUTBOX_DRAIN_MAX_SECONDS", 50)
+    rate = config.get("OUTBOX_RATE_LIMITS", {}).get(channel)
+
+    started = time.monotonic()
+    handed_off = 0
+    sent = 0
+
+    while time.monotonic() - started < max_seconds:
+        rows = claim_batch(channel, now=now, batch_size=batch_size)
+        if not rows:
+            break
+        token = rows[0].claim_token
+
+        chunk_size = max(1, int(rate)) if rate else len(rows)
+        results = []
+        for start in range(0, len(rows), chunk_size):
+            if rate:
+                ahead = handed_off / rate - (time.monotonic() - started)
+                if ahead > 0:
+                    time.sleep(ahead)
+            chunk = rows[start : start + chunk_size]
+            results += _send(channel, send_batch, chunk)
+            handed_off += len(chunk)
+
+        _record_results(rows, results, token, now or _utcnow())
+        sent += sum(1 for ok in results if ok)
+
+        if len(rows) < batch_size:
+            break
+
+    return sent
+
+
+def prune_outbox(now=None, batch_size=None):
+    """
+    Deletes delivered rows sent more than OUTBOX_RETENTION_DAYS ago, and
+    failed rows whose last attempt is that old, in batches. Returns the
+    number of rows deleted.
+
+    A pruned row's dedupe_key no longer blocks a duplicate, so the retention
+    should outlast any producer that might re-run for the same event.
+    """
+    config = current_app.config
+    now = now or _utcnow()
+    batch_size = batch_size or config.get("OUTBOX_BATCH_SIZE", 100)
+    cutoff = now - timedelta(days=config.get("OUTBOX_RETENTION_DAYS", 30))
+    finished = or_(
+        and_(NotificationOutbox.status == "sent", NotificationOutbox.sent_at < cutoff),
+        and_(
+            NotificationOutbox.status == "failed",
+            NotificationOutbox.next_attempt_at < cutoff,
+        ),
+    )
+
+    deleted = 0
+    while True:
+        ids = (
+            db.session.execute(
+                select(NotificationOutbox.outbox_id).where(finished).limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            break
+        db.session.execute(
+            delete(NotificationOutbox)
+            .where(NotificationOutbox.outbox_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return deleted
@@ -0,0 +1,139 @@
+import base64
+import json
+from datetime import datetime, timezone
+
+from flask import current_app, jsonify
+from flask_smorest import abort
+from marshmallow import EXCLUDE, Schema, fields, validate
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageArgsSchema(Schema):
+    """Query arguments shared by the paginated list endpoints."""
+
+    limit = fields.Int(
+        validate=validate.Range(min=1),
+        metadata={"description": "Maximum number of items in the page."},
+    )
+    cursor = fields.Str(
+        metadata={
+            "description": f"Opaque cursor from the {NEXT_CURSOR_HEADER} header of the previous page."
+        }
+    )
+    updated_since = fields.AwareDateTime(
+        default_timezone=timezone.utc,
+        metadata={"description": "Only return items changed at or after this time."},
+    )
+    field_names = fields.Str(
+        data_key="fields",
+        metadata={
+            "description": "Comma-separated names of the fields to return, e.g. 'name,time'."
+        },
+    )
+
+    class Meta:
+        # Endpoints read their own arguments (e.g. senior_id) from the query.
+        unknown = EXCLUDE
+
+
+def _encode_cursor(sort_value, key_value):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, key_value]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def _decode_cursor(cursor, has_sort_column):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, key_value = json.loads(base64.urlsafe_b64decode(padded))
+        if has_sort_column and sort_value is not None:
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, str(key_value)
+    except (ValueError, TypeError):
+        abort(400, message="Invalid cursor.")
+
+
+def _after(sort_column, key_column, sort_value, key_value):
+    """Rows after (sort_value, key_value) in (sort_column NULLS FIRST, key) order."""
+    if sort_column is None:
+        return key_column > key_value
+    if sort_value is None:
+        return or_(
+            sort_column.isnot(None),
+            and_(sort_column.is_(None), key_column > key_value),
+        )
+    # The leading >= lets the database seek into a (…, sort_column) index.
+    return and_(
+        sort_column >= sort_value,
+        or_(sort_column > sort_value, key_column > key_value),
+    )
+
+
+def _selected_fields(schema_class, field_names):
+    if not field_names:
+        return None
+    selected = {name.strip() for name in field_names.split(",") if name.strip()}
+    unknown = selected - set(schema_class().dump_fields)
+    if unknown:
+        abort(400, message=f"Unknown fields: {', '.join(sorted(unknown))}.")
+    return selected
+
+
+def paginated_response(
+    query,
+    page_args,
+    schema_class,
+    key_column,
+    sort_column=None,
+    updated_column=None,
+):
+    """
+    Returns one page of query as a JSON list, ordered by (sort_column, key_column)
+    and dumped with schema_class (restricted to ?fields= when given).
+
+    Pages are keyset-based: when more rows follow, the X-Next-Cursor header
+    carries a cursor for the last row, so each page is an index seek no
+    matter how deep. ?limit= is capped at PAGINATION_MAX_LIMIT; a ?cursor=
+    without it pages by PAGINATION_DEFAULT_LIMIT. A request with neither
+    gets every row, as these endpoints returned before they were paginated.
+    ?updated_since= keeps rows whose updated_column is at or after the
+    given time.
+    """
+    config = current_app.config
+    limit = page_args.get("limit")
+    if limit is None and page_args.get("cursor"):
+        limit = config.get("PAGINATION_DEFAULT_LIMIT", 100)
+    if limit is not None:
+        limit = min(limit, config.get("PAGINATION_MAX_LIMIT", 500))
+    only = _selected_fields(schema_class, page_args.get("field_names"))
+
+    updated_since = page_args.get("updated_since")
+    if updated_since is not None and updated_column is not None:
+        # Timestamps are stored as naive UTC.
+        updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+        query = query.filter(updated_column >= updated_since)
+
+    cursor = page_args.get("cursor")
+    if cursor:
+        sort_value, key_value = _decode_cursor(cursor, sort_column is not None)
+        query = query.filter(_after(sort_column, key_column, sort_value, key_value))
+
+    order = [key_column.asc()]
+    if sort_column is not None:
+        order.insert(0, sort_column.asc().nulls_first())
+    query = query.order_by(*order)
+    if limit is None:
+        return jsonify(schema_class(many=True, only=only).dump(query.all()))
+    rows = query.limit(limit + 1).all()
+
+    response = jsonify(schema_class(many=True, only=only).dump(rows[:limit]))
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        response.headers[NEXT_CURSOR_HEADER] = _encode_cursor(
+            getattr(last, sort_column.key) if sort_column is not None else None,
+            getattr(last, key_column.key),
+        )
+    return response
@@ -0,0 +1,258 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytz
+from flask import current_app
+from sqlalchemy import and_, delete, insert, or_, select, update
+
+from models import ScheduledReminder, db
+
+
+def _to_utc_naive(dt, assume_tz=pytz.utc):
+    """Normalise a datetime to naive UTC, localising naive values to assume_tz."""
+    if dt.tzinfo is None:
+        dt = assume_tz.localize(dt)
+    return dt.astimezone(pytz.utc).replace(tzinfo=None)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _claimable(now, stale_before):
+    """Rows that are due, or were claimed by a dispatcher that never finished."""
+    return or_(
+        and_(
+            ScheduledReminder.status == "pending",
+            ScheduledReminder.due_at <= now,
+        ),
+        and_(
+            ScheduledReminder.status == "claimed",
+            ScheduledReminder.claimed_at <= stale_before,
+        ),
+    )
+
+
+def schedule_reminder(
+    dedupe_key,
+    task_name,
+    task_args,
+    due_at,
+    reference_type=None,
+    reference_id=None,
+    assume_tz=pytz.utc,
+):
+    """
+    Creates or reschedules the reminder identified by dedupe_key.
+
+    The row is added to the current session; the caller commits it together
+    with the state change that caused it.
+    """
+    reminder = ScheduledReminder.query.filter_by(dedupe_key=dedupe_key).first()
+    if reminder is None:
+        reminder = ScheduledReminder(dedupe_key=dedupe_key)
+        db.session.add(reminder)
+
+    reminder.task_name = task_name
+    reminder.task_args = list(task_args)
+    reminder.reference_type = reference_type
+    reminder.reference_id = reference_id
+    reminder.due_at = _to_utc_naive(due_at, assume_tz)
+    reminder.status = "pending"
+    reminder.claim_token = None
+    reminder.claimed_at = None
+    return reminder
+
+
+def schedule_reminders(reminders, assume_tz=pytz.utc):
+    """
+    Batch form of schedule_reminder for many reminders at once, e.g. every
+    dose of a recurring schedule. Each item is a dict of schedule_reminder's
+    arguments (dedupe_key, task_name, task_args, due_at and optionally
+    reference_type / reference_id).
+
+    Existing rows with the same keys are replaced, so this is one DELETE and
+    one multi-row INSERT however many reminders there are. Like
+    schedule_reminder, the caller commits. Returns the number of rows written.
+    """
+    if not reminders:
+        return 0
+
+    keys = [reminder["dedupe_key"] for reminder in reminders]
+    ScheduledReminder.query.filter(ScheduledReminder.dedupe_key.in_(keys)).delete(
+        synchronize_session=False
+    )
+    db.session.execute(
+        insert(ScheduledReminder),
+        [
+            {
+                "dedupe_key": reminder["dedupe_key"],
+                "task_name": reminder["task_name"],
+                "task_args": list(reminder["task_args"]),
+                "reference_type": reminder.get("reference_type"),
+                "reference_id": reminder.get("reference_id"),
+                "due_at": _to_utc_naive(reminder["due_at"], assume_tz),
+                "status": "pending",
+            }
+            for reminder in reminders
+        ],
+    )
+    return len(reminders)
+
+
+def has_pending_reminder(dedupe_key):
+    """True if the reminder exists and has not been dispatched yet."""
+    return (
+        ScheduledReminder.query.filter(
+            ScheduledReminder.dedupe_key == dedupe_key,
+            ScheduledReminder.status.in_(["pending", "claimed"]),
+        ).first()
+        is not None
+    )
+
+
+def cancel_reminder(dedupe_key):
+    """Removes a pending reminder. Returns True if one existed."""
+    deleted = ScheduledReminder.query.filter_by(dedupe_key=dedupe_key).delete(
+        synchronize_session=False
+    )
+    return deleted > 0
+
+
+def cancel_reminders_for(reference_type, reference_id):
+    """Removes every reminder attached to the given domain object."""
+    return ScheduledReminder.query.filter_by(
+        reference_type=reference_type, reference_id=str(reference_id)
+    ).delete(synchronize_session=False)
+
+
+def claim_due_reminders(now=None, batch_size=None):
+    """
+    Atomically marks up to batch_size due reminders as claimed and returns them.
+
+    The conditional UPDATE re-checks the claimable predicate, so two
+    dispatchers racing on the same rows cannot both claim them.
+    """
+    config = current_app.config
+    now = now or _utcnow()
+    batch_size = batch_size or config.get("REMINDER_DISPATCH_BATCH_SIZE", 500)
+    stale_before = now - timedelta(
+        seconds=config.get("REMINDER_CLAIM_TIMEOUT_SECONDS", 300)
+    )
+    token = str(uuid.uuid4())
+
+    due_ids = (
+        db.session.execute(
+            select(ScheduledReminder.reminder_id)
+            .where(_claimable(now, stale_before))
+            .order_by(ScheduledReminder.due_at)
+            .limit(batch_size)
+        )
+        .scalars()
+        .all()
+    )
+    if not due_ids:
+        return []
+
+    db.session.execute(
+        update(ScheduledReminder)
+        .where(
+            ScheduledReminder.reminder_id.in_(due_ids),
+            _claimable(now, stale_before),
+        )
+        .values(
+            status="claimed",
+            claim_token=token,
+            claimed_at=now,
+            attempts=ScheduledReminder.attempts + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    return ScheduledReminder.query.filter_by(claim_token=token).all()
+
+
+def dispatch_reminders(send, now=None, batch_size=None):
+    """
+    Claims due reminders in batches and hands each one to send(task_name, args).
+
+    Reminders whose send raises stay claimed and are retried once the claim
+    times out. Returns the number of reminders dispatched.
+    """
+    batch_size = batch_size or current_app.config.get(
+        "REMINDER_DISPATCH_BATCH_SIZE", 500
+    )
+    dispatched = 0
+
+    while True:
+        batch = claim_due_reminders(now=now, batch_size=batch_size)
+        if not batch:
+            break
+
+        token = batch[0].claim_token
+        sent_ids = []
+        for reminder in batch:
+            try:
+                send(reminder.task_name, reminder.task_args)
+                sent_ids.append(reminder.reminder_id)
+            except Exception as e:
+                print(f"Failed to dispatch reminder {reminder.dedupe_key}: {e}")
+
+        if sent_ids:
+            # Only finalise rows that were not rescheduled while we held them.
+            db.session.execute(
+                update(ScheduledReminder)
+                .where(
+                    ScheduledReminder.reminder_id.in_(sent_ids),
+                    ScheduledReminder.claim_token == token,
+                )
+                .values(status="dispatched", claim_token=None)
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+        dispatched += len(sent_ids)
+
+        if len(batch) < batch_size:
+            break
+
+    return dispatched
+
+
+def prune_dispatched_reminders(now=None, batch_size=None):
+    """
+    Deletes dispatched reminders that fell due more than
+    REMINDER_RETENTION_DAYS ago, in batches, so the table and its due-scan
+    index only hold recent history. Returns the number of rows deleted.
+    """
+    config = current_app.config
+    now = now or _utcnow()
+    batch_size = batch_size or config.get("REMINDER_DISPATCH_BATCH_SIZE", 500)
+    cutoff = now - timedelta(days=config.get("REMINDER_RETENTION_DAYS", 30))
+
+    deleted = 0
+    while True:
+        ids = (
+            db.session.execute(
+                select(ScheduledReminder.reminder_id)
+                .where(
+                    ScheduledReminder.status == "dispatched",
+                    ScheduledReminder.due_at < cutoff,
+                )
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            break
+        db.session.execute(
+            delete(ScheduledReminder)
+            .where(ScheduledReminder.reminder_id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        deleted += len(ids)
+        if len(ids) < batch_size:
+            break
+    return deleted
@@ -0,0 +1,52 @@
+import hashlib
+
+from sqlalchemy.exc import IntegrityError
+
+from models import ExtractedTextCache, SummaryCache, db
+from utils.ai_manager import PROMPT_VERSION
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def cached_text(content_hash):
+    """Previously extracted text for a file with this SHA-256, or None."""
+    if not content_hash:
+        return None
+    entry = db.session.get(ExtractedTextCache, content_hash)
+    return entry.extracted_text if entry else None
+
+
+def cached_summary(text):
+    """A previous analyze_report() result for this exact text and prompt, or None."""
+    if not text:
+        return None
+    entry = db.session.get(SummaryCache, (sha256_text(text), PROMPT_VERSION))
+    return entry.summary if entry else None
+
+
+def _store(entry):
+    # Two workers may finish the same content at once; either row is fine.
+    try:
+        db.session.merge(entry)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+
+
+def store_text(content_hash, text):
+    if content_hash and text:
+        _store(ExtractedTextCache(content_hash=content_hash, extracted_text=text))
+
+
+def store_summary(text, summary):
+    # analyze_report() reports failures as "Error..." strings; never cache those.
+    if text and summary and not summary.startswith("Error"):
+        _store(
+            SummaryCache(
+                text_hash=sha256_text(text),
+                prompt_version=PROMPT_VERSION,
+                summary=summary,
+            )
+        )
@@ -0,0 +1,127 @@
+import math
+import re
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+
+from models import ReportIndex, db
+from utils.report_cache import sha256_text
+
+# Bump when chunking or the stored layout changes; older rows are rebuilt.
+INDEX_VERSION = 1
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def chunk_text(text, chunk_words=150, overlap_words=30):
+    """
+    Splits text into chunks of at most chunk_words words. Paragraphs are
+    packed whole while they fit; longer ones are cut into windows that
+    overlap by overlap_words, so a finding on a boundary is in both.
+    """
+    step = max(1, chunk_words - overlap_words)
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        words = paragraph.split()
+        if len(words) <= chunk_words:
+            if words:
+                pieces.append(words)
+            continue
+        for start in range(0, len(words), step):
+            pieces.append(words[start : start + chunk_words])
+            if start + chunk_words >= len(words):
+                break
+
+    chunks = []
+    current = []
+    for words in pieces:
+        if current and len(current) + len(words) > chunk_words:
+            chunks.append(" ".join(current))
+            current = []
+        current = current + words
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def build_index(text, chunk_words=150, overlap_words=30):
+    """A JSON-serialisable BM25 index over the chunks of text."""
+    chunks = chunk_text(text, chunk_words, overlap_words)
+    term_counts = [Counter(tokenize(chunk)) for chunk in chunks]
+    doc_freq = Counter(term for counts in term_counts for term in counts)
+    lengths = [sum(counts.values()) for counts in term_counts]
+    return {
+        "version": INDEX_VERSION,
+        "chunks": chunks,
+        "term_counts": [dict(counts) for counts in term_counts],
+        "doc_freq": dict(doc_freq),
+        "lengths": lengths,
+        "avg_length": (sum(lengths) / len(lengths)) if lengths else 0,
+    }
+
+
+def search(index, query, k=4):
+    """
+    The k chunks most relevant to query by BM25, in document order. When no
+    query term occurs in the report, the opening chunks are returned.
+    """
+    chunks = index["chunks"]
+    if len(chunks) <= k:
+        return list(chunks)
+
+    n = len(chunks)
+    avg_length = index["avg_length"] or 1
+    scores = [0.0] * n
+    for term in set(tokenize(query)):
+        df = index["doc_freq"].get(term)
+        if not df:
+            continue
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for i, counts in enumerate(index["term_counts"]):
+            tf = counts.get(term)
+            if tf:
+                norm = 1 - BM25_B + BM25_B * index["lengths"][i] / avg_length
+                scores[i] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * norm)
+
+    ranked = sorted(range(n), key=lambda i: scores[i], reverse=True)[:k]
+    if not any(scores[i] for i in ranked):
+        ranked = range(k)
+    return [chunks[i] for i in sorted(ranked)]
+
+
+def index_for_text(text):
+    """
+    Loads the stored index of text, building and persisting it on a miss.
+    Indexes are keyed by the text's SHA-256, so identical reports share one.
+    """
+    text_hash = sha256_text(text)
+    row = db.session.get(ReportIndex, text_hash)
+    if row is not None and row.index.get("version") == INDEX_VERSION:
+        return row.index
+
+    config = current_app.config
+    index = build_index(
+        text,
+        chunk_words=config.get("REPORT_CHUNK_WORDS", 150),
+        overlap_words=config.get("REPORT_CHUNK_OVERLAP_WORDS", 30),
+    )
+    try:
+        db.session.merge(ReportIndex(text_hash=text_hash, index=index))
+        db.session.commit()
+    except IntegrityError:
+        # Built concurrently by another worker; theirs is equivalent.
+        db.session.rollback()
+    return index
+
+
+def relevant_chunks(text, question, k=None):
+    """The top-k chunks of a report's text for question."""
+    k = k or current_app.config.get("REPORT_CHAT_TOP_K", 4)
+    return search(index_for_text(text), question, k=k)
@@ -0,0 +1,206 @@
+import click
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+
+from db.types import BinaryUUID, as_uuid
+from extensions import db
+
+
+def add_missing_columns():
+    """
+    Brings existing tables up to date with the models for additive changes.
+
+    db.create_all() creates new tables but never alters existing ones, so a
+    nullable column (and its indexes) added to a model would be missing on
+    databases created before it. This adds them with ALTER TABLE. Returns the
+    "table.column" names that were added.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            missing = [c for c in table.columns if c.name not in present and c.nullable]
+            for column in missing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(
+                    text(
+                        f'ALTER TABLE "{table.name}" '
+                        f'ADD COLUMN "{column.name}" {column_type}'
+                    )
+                )
+                added.append(f"{table.name}.{column.name}")
+
+            if missing:
+                names = {c.name for c in missing}
+                for index in table.indexes:
+                    if names.intersection(c.name for c in index.columns):
+                        index.create(conn, checkfirst=True)
+
+    return added
+
+
+def missing_indexes():
+    """The model indexes that existing tables do not have yet."""
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(
+            index
+            for index in sorted(table.indexes, key=lambda index: index.name)
+            if index.name not in present
+        )
+    return missing
+
+
+def create_missing_indexes():
+    """
+    Builds the model indexes missing from existing tables, one at a time and
+    each in its own transaction. On PostgreSQL they are built CONCURRENTLY,
+    so the tables stay writable; on SQLite the build only blocks other
+    writers, and readers carry on under WAL. Returns the names created.
+    """
+    engine = db.engine
+    concurrently = engine.dialect.name == "postgresql"
+    created = []
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index in missing_indexes():
+            ddl = str(
+                CreateIndex(index, if_not_exists=True).compile(dialect=engine.dialect)
+            )
+            if concurrently:
+                # CONCURRENTLY cannot run inside a transaction block, hence
+                # the AUTOCOMMIT connection.
+                ddl = ddl.replace(" INDEX ", " INDEX CONCURRENTLY ", 1)
+            conn.execute(text(ddl))
+            created.append(index.name)
+
+    return created
+
+
+# Indexes that models.py replaced with a differently shaped one. They are
+# dropped by create-indexes once the replacement has been built.
+RETIRED_INDEXES = {
+    # Led with senior_id, so the missed-medication sweep could not seek
+    # its time range; replaced by ix_medication_pending_time_senior_id.
+    "medication": ["ix_medication_pending_senior_id_time"],
+}
+
+
+def drop_retired_indexes():
+    """
+    Drops the RETIRED_INDEXES still present, CONCURRENTLY on PostgreSQL.
+    Returns the names dropped.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    concurrently = " CONCURRENTLY" if engine.dialect.name == "postgresql" else ""
+    dropped = []
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for table, names in RETIRED_INDEXES.items():
+            if table not in existing_tables:
+                continue
+            present = {index["name"] for index in inspector.get_indexes(table)}
+            for name in names:
+                if name in present:
+                    conn.execute(text(f'DROP INDEX{concurrently} IF EXISTS "{name}"'))
+                    dropped.append(name)
+
+    return dropped
+
+
+def _uuid_columns(existing_tables):
+    for table in db.metadata.sorted_tables:
+        if table.name in existing_tables:
+            for column in table.columns:
+                if isinstance(column.type, BinaryUUID):
+                    yield table.name, column.name
+
+
+def _uuid_blob(value):
+    value = as_uuid(value)
+    return value.bytes if value is not None else None
+
+
+def convert_text_uuids():
+    """
+    Rewrites UUID keys stored as 36-character text, as they were before the
+    BinaryUUID columns, into their 16-byte form. SQLite stores any value in
+    any column, so the conversion happens in place, in one transaction, and
+    only touches rows still holding text. Returns {"table.column": rows
+    converted} for the columns that had any. Text that is not a UUID is
+    left as it is.
+
+    Other databases are created with native UUID columns and are left alone.
+    """
+    engine = db.engine
+    if engine.dialect.name != "sqlite":
+        return {}
+
+    existing_tables = set(inspect(engine).get_table_names())
+    converted = {}
+    with engine.begin() as conn:
+        conn.connection.driver_connection.create_function(
+            "uuid_blob", 1, _uuid_blob, deterministic=True
+        )
+        for table, column in _uuid_columns(existing_tables):
+            result = conn.execute(
+                text(
+                    f'UPDATE "{table}" SET "{column}" = uuid_blob("{column}") '
+                    f"WHERE typeof(\"{column}\") = 'text' "
+                    f'AND uuid_blob("{column}") IS NOT NULL'
+                )
+            )
+            if result.rowcount:
+                converted[f"{table}.{column}"] = result.rowcount
+    return converted
+
+
+def text_uuids_present():
+    """Whether the user table, converted with every other, still has text keys."""
+    if db.engine.dialect.name != "sqlite":
+        return False
+    if "user" not in inspect(db.engine).get_table_names():
+        return False
+    return (
+        db.session.execute(
+            text("SELECT 1 FROM \"user\" WHERE typeof(user_id) = 'text' LIMIT 1")
+        ).first()
+        is not None
+    )
+
+
+@click.command("create-indexes")
+def create_indexes_command():
+    """Build the indexes declared in models.py that the database lacks."""
+    created = create_missing_indexes()
+    for name in created:
+        click.echo(f"Created index {name}")
+    dropped = drop_retired_indexes()
+    for name in dropped:
+        click.echo(f"Dropped retired index {name}")
+    if not created and not dropped:
+        click.echo("All indexes are present.")
+
+
+@click.command("convert-uuids")
+def convert_uuids_command():
+    """Convert UUID keys stored as text to their binary form."""
+    converted = convert_text_uuids()
+    for column, rows in converted.items():
+        click.echo(f"Converted {rows} rows of {column}")
+    if not converted:
+        click.echo("No text UUIDs left.")
@@ -0,0 +1,221 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select
+from sqlalchemy.orm import joinedload
+
+from models import Appointment, EmergencyContact, Medication, SeniorCitizen, db
+from utils.cache import TTLCache
+
+
+def _context_cache():
+    cache = current_app.extensions.get("senior_context_cache")
+    if cache is None:
+        config = current_app.config
+        cache = TTLCache(
+            ttl=config.get("SENIOR_CONTEXT_CACHE_TTL_SECONDS", 30),
+            maxsize=10_000,
+            redis_url=config.get("SENIOR_CONTEXT_CACHE_REDIS_URL"),
+            namespace="senior-context",
+        )
+        current_app.extensions["senior_context_cache"] = cache
+    return cache
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive(value):
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _appointment(appointment):
+    return {
+        "title": appointment.title,
+        "date_time": _naive(appointment.date_time),
+        "status": appointment.status,
+    }
+
+
+def _medication(medication):
+    return {
+        "name": medication.name,
+        "time": _naive(medication.time),
+        "is_taken": bool(medication.isTaken),
+    }
+
+
+def _to_cached(context):
+    """The snapshot with its datetimes as ISO strings, as Redis stores JSON."""
+    return json.loads(json.dumps(context, default=datetime.isoformat))
+
+
+def _from_cached(context):
+    """Reverses _to_cached(), on a copy so cached entries stay untouched."""
+    if context is None:
+        return None
+
+    def parse(value):
+        return datetime.fromisoformat(value) if value is not None else None
+
+    def appointment(a):
+        return {**a, "date_time": parse(a["date_time"])}
+
+    def medication(m):
+        return {**m, "time": parse(m["time"])}
+
+    next_appointment = context["next_appointment"]
+    next_medication = context["next_medication"]
+    return {
+        **context,
+        "next_appointment": (
+            appointment(next_appointment) if next_appointment else None
+        ),
+        "pending_appointments": [
+            appointment(a) for a in context["pending_appointments"]
+        ],
+        "next_medication": (medication(next_medication) if next_medication else None),
+        "medications_taken_this_week": [
+            medication(m) for m in context["medications_taken_this_week"]
+        ],
+        "loaded_at": parse(context["loaded_at"]),
+    }
+
+
+def load_context(senior_id, now=None):
+    """
+    Everything the assistant intents need to know about one senior, read in
+    six queries: the senior with their user, their next appointment and next
+    medication however far ahead, appointments from the start of this month
+    and medications from a week ago, both up to SENIOR_CONTEXT_HORIZON_DAYS
+    ahead, and the emergency contacts. Returns None if there is no such
+    senior.
+
+    Rows are copied into plain dicts so the snapshot can outlive the session.
+    """
+    now = now or _utcnow()
+    senior = db.session.execute(
+        select(SeniorCitizen)
+        .options(joinedload(SeniorCitizen.user))
+        .where(SeniorCitizen.user_id == senior_id)
+    ).scalar_one_or_none()
+    if senior is None:
+        return None
+
+    start_of_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    week_ago = now - timedelta(weeks=1)
+    horizon = now + timedelta(
+        days=current_app.config.get("SENIOR_CONTEXT_HORIZON_DAYS", 31)
+    )
+
+    next_appointment = db.session.execute(
+        select(Appointment)
+        .where(Appointment.senior_id == senior_id, Appointment.date_time > now)
+        .order_by(Appointment.date_time.asc())
+        .limit(1)
+    ).scalar_one_or_none()
+    next_medication = db.session.execute(
+        select(Medication)
+        .where(Medication.senior_id == senior_id, Medication.time > now)
+        .order_by(Medication.time.asc())
+        .limit(1)
+    ).scalar_one_or_none()
+    appointments = [
+        _appointment(a)
+        for a in db.session.execute(
+            select(Appointment)
+            .where(
+                Appointment.senior_id == senior_id,
+                Appointment.date_time >= start_of_month,
+                Appointment.date_time < horizon,
+            )
+            .order_by(Appointment.date_time.asc())
+        ).scalars()
+    ]
+    medications = [
+        _medication(m)
+        for m in db.session.execute(
+            select(Medication)
+            .where(
+                Medication.senior_id == senior_id,
+                Medication.time >= week_ago,
+                Medication.time < horizon,
+            )
+            .order_by(Medication.time.asc())
+        ).scalars()
+    ]
+    contacts = [
+        {"name": c.name, "relation": c.relation, "phone": c.phone}
+        for c in db.session.execute(
+            select(EmergencyContact).where(EmergencyContact.senior_id == senior_id)
+        ).scalars()
+    ]
+
+    return {
+        "senior": {
+            "username": senior.user.username if senior.user else None,
+            "age": senior.age,
+            "topics_liked": senior.topics_liked,
+            "comments_posted": senior.comments_posted,
+            "appointments_missed": senior.appointments_missed,
+            "medications_missed": senior.medications_missed,
+            "total_screentime": senior.total_screentime,
+        },
+        "next_appointment": (
+            _appointment(next_appointment) if next_appointment else None
+        ),
+        "pending_appointments": [a for a in appointments if a["status"] != "Completed"],
+        "next_medication": (_medication(next_medication) if next_medication else None),
+        "medications_taken_this_week": [m for m in medications if m["is_taken"]],
+        "emergency_contacts": contacts,
+        "loaded_at": now,
+    }
+
+
+def get_context(senior_id):
+    """
+    The senior's context snapshot, shared through a short-lived cache
+    (SENIOR_CONTEXT_CACHE_TTL_SECONDS) that is cleared whenever one of the
+    senior's rows changes. The cache is in-process unless
+    SENIOR_CONTEXT_CACHE_REDIS_URL is set; only then do changes made by other
+    processes, such as the Celery sweeps, clear it before the TTL runs out.
+    """
+    senior_id = str(senior_id)
+    return _from_cached(
+        _context_cache().get_or_load(
+            senior_id, lambda: _to_cached(load_context(senior_id))
+        )
+    )
+
+
+def invalidate_context(senior_id):
+    """
+    Drops the senior's cached snapshot. Mapper events call this for ORM
+    writes; bulk UPDATEs bypass them and must call it themselves.
+    """
+    if not has_app_context() or senior_id is None:
+        return
+    _context_cache().delete(str(senior_id))
+
+
+@event.listens_for(Appointment, "after_insert")
+@event.listens_for(Appointment, "after_update")
+@event.listens_for(Appointment, "after_delete")
+@event.listens_for(Medication, "after_insert")
+@event.listens_for(Medication, "after_update")
+@event.listens_for(Medication, "after_delete")
+@event.listens_for(EmergencyContact, "after_insert")
+@event.listens_for(EmergencyContact, "after_update")
+@event.listens_for(EmergencyContact, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    invalidate_context(target.senior_id)
+
+
+@event.listens_for(SeniorCitizen, "after_update")
+@event.listens_for(SeniorCitizen, "after_delete")
+def _invalidate_senior(mapper, connection, target):
+    invalidate_context(target.user_id)
@@ -0,0 +1,23 @@
+import json
+
+from flask import Response, stream_with_context
+
+
+def sse_event(data, event=None):
+    """Formats one Server-Sent Event whose data is JSON."""
+    lines = [f"event: {event}"] if event else []
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def sse_response(events):
+    """
+    Streams an iterable of formatted events as text/event-stream. The
+    iterable runs inside the request context, and proxy buffering is
+    disabled so each event reaches the client as soon as it is yielded.
+    """
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
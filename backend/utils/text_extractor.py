@@ -1,34 +1,100 @@
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import pytesseract
 import PyPDF2
+from celery.exceptions import SoftTimeLimitExceeded
 from PIL import Image
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+
+# A page with less native text than this is treated as scanned and OCR'd.
+MIN_PAGE_TEXT_CHARS = 25
+OCR_DPI = 200
+
+
+def _ocr_page(filepath, page_number, dpi=OCR_DPI):
+    """Rasterises a single PDF page (1-based) and OCRs it."""
+    images = convert_from_path(
+        filepath, dpi=dpi, first_page=page_number, last_page=page_number
+    )
+    try:
+        return "".join(pytesseract.image_to_string(image) for image in images)
+    finally:
+        for image in images:
+            image.close()
+
+
+def _native_page_texts(filepath):
+    """
+    Native text of every page, or None if the PDF cannot be parsed.
+
+    The file is memory-mapped so PyPDF2 reads pages from the page cache
+    instead of copying the whole document into a buffer.
+    """
+    try:
+        with open(filepath, "rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as buffer:
+            reader = PyPDF2.PdfReader(buffer)
+            return [page.extract_text() or "" for page in reader.pages]
+    except Exception as e:
+        print(f"Native text extraction failed for {filepath}: {e}")
+        return None
+
+
+def extract_text_from_pdf(filepath, max_workers=None, dpi=OCR_DPI):
+    """
+    Extracts a PDF's text page by page, OCRing only the pages whose native
+    text is too short to be real content.
+
+    OCR pages are rasterised one at a time inside the workers, so at most
+    max_workers page images are in memory at once. Both pdftoppm and
+    tesseract run as subprocesses, so a thread pool is enough to use every
+    core.
+    """
+    page_texts = _native_page_texts(filepath)
+    if page_texts is None:
+        page_count = int(pdfinfo_from_path(filepath)["Pages"])
+        page_texts = [""] * page_count
+
+    scanned = [
+        number
+        for number, text in enumerate(page_texts, start=1)
+        if len(text.strip()) < MIN_PAGE_TEXT_CHARS
+    ]
+    if scanned:
+        print(f"OCR needed for {len(scanned)} of {len(page_texts)} page(s).")
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(scanned)))
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr")
+        try:
+            ocr_texts = pool.map(lambda n: _ocr_page(filepath, n, dpi), scanned)
+            for number, text in zip(scanned, ocr_texts):
+                page_texts[number - 1] = text
+        except BaseException:
+            # E.g. the task's soft time limit: drop the queued pages instead
+            # of waiting for them, so the caller can record the failure.
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown()
+
+    return "".join(text + "\n" for text in page_texts)
 
 
-def extract_text_from_file(filepath):
-    """Extract text from a file (PDF or image), using OCR for scanned PDFs."""
+def extract_text_from_file(filepath, max_workers=None):
+    """Extract text from a file (PDF or image), using OCR for scanned pages."""
     ext = filepath.rsplit(".", 1)[1].lower()
     text = ""
     try:
         if ext == "pdf":
-            # First, try to extract text directly
-            with open(filepath, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-
-            # If direct extraction yields little or no text, perform OCR
-            if len(text.strip()) < 100:  # Threshold to decide if we need OCR
-                print("Direct text extraction insufficient, performing OCR on PDF.")
-                text = ""
-                images = convert_from_path(filepath)
-                for i, image in enumerate(images):
-                    text += pytesseract.image_to_string(image) + "\n"
+            text = extract_text_from_pdf(filepath, max_workers=max_workers)
 
         elif ext in ["png", "jpg", "jpeg"]:
-            text = pytesseract.image_to_string(Image.open(filepath))
+            with Image.open(filepath) as image:
+                text = pytesseract.image_to_string(image)
 
+    except SoftTimeLimitExceeded:
+        raise
     except Exception as e:
         print(f"Error during text extraction from {filepath}: {e}")
         return None
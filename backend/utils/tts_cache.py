@@ -0,0 +1,206 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+
+from flask import current_app
+
+from utils.cache import TTLCache
+
+# File extension of the cached audio per TTS audio encoding.
+_EXTENSIONS = {"MP3": "mp3", "OGG_OPUS": "ogg", "LINEAR16": "wav", "MULAW": "wav"}
+
+
+class GoogleTTSBackend:
+    """Synthesizes speech with Google Cloud Text-to-Speech."""
+
+    name = "google"
+
+    def __init__(self):
+        # Imported here so the stub backend works without google-cloud installed.
+        from google.cloud import texttospeech
+
+        self._tts = texttospeech
+        self._client = texttospeech.TextToSpeechClient()
+
+    def synthesize(self, text, voice_name, language_code, encoding):
+        tts = self._tts
+        response = self._client.synthesize_speech(
+            input=tts.SynthesisInput(text=text),
+            voice=tts.VoiceSelectionParams(
+                language_code=language_code,
+                name=voice_name,
+                ssml_gender=tts.SsmlVoiceGender.NEUTRAL,
+            ),
+            audio_config=tts.AudioConfig(
+                audio_encoding=getattr(tts.AudioEncoding, encoding)
+            ),
+        )
+        return response.audio_content
+
+
+class StubTTSBackend:
+    """
+    Offline backend for tests and local development: returns deterministic
+    placeholder bytes and counts how often it was asked to synthesize.
+    """
+
+    name = "stub"
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text, voice_name, language_code, encoding):
+        self.calls += 1
+        return f"stub-tts:{voice_name}:{language_code}:{encoding}:{text}".encode()
+
+
+BACKENDS = {"google": GoogleTTSBackend, "stub": StubTTSBackend}
+
+
+class TTSCache:
+    """
+    Content-keyed speech audio cache. Audio is looked up in a bounded
+    in-memory LRU, then in folder (if set), and only synthesized by backend
+    when neither has it. The key covers the text, voice, language, encoding
+    and backend, so changing any of them never serves stale audio.
+    """
+
+    def __init__(
+        self,
+        backend,
+        folder=None,
+        maxsize=256,
+        voice_name="en-US-Wavenet-D",
+        language_code="en-US",
+        encoding="MP3",
+    ):
+        self.backend = backend
+        self.folder = folder
+        self.voice_name = voice_name
+        self.language_code = language_code
+        self.encoding = encoding
+        # Audio for a key never changes, so entries only leave by LRU eviction.
+        self._memory = TTLCache(ttl=math.inf, maxsize=maxsize, namespace="tts")
+
+    def key(self, text):
+        payload = json.dumps(
+            [
+                self.backend.name,
+                self.voice_name,
+                self.language_code,
+                self.encoding,
+                text,
+            ]
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        extension = _EXTENSIONS.get(self.encoding, "audio")
+        return os.path.join(self.folder, key[:2], f"{key}.{extension}")
+
+    def _read_disk(self, key):
+        if not self.folder:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key, audio):
+        if not self.folder:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written under a temporary name and renamed, so readers never see
+        # half a file.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+
+    def _load(self, key, text):
+        audio = self._read_disk(key)
+        if audio is not None:
+            return audio
+
+        audio = self.backend.synthesize(
+            text, self.voice_name, self.language_code, self.encoding
+        )
+        if not audio:
+            # Raised so that nothing is cached for a failed synthesis.
+            raise RuntimeError("TTS backend returned no audio.")
+        try:
+            self._write_disk(key, audio)
+        except OSError as e:
+            print(f"Could not write TTS audio to disk cache: {e}")
+        return audio
+
+    def synthesize(self, text):
+        """Returns the audio for text, or b"" if it cannot be synthesized."""
+        key = self.key(text)
+        try:
+            return self._memory.get_or_load(key, lambda: self._load(key, text))
+        except Exception as e:
+            print(f"Error during TTS: {e}")
+            return b""
+
+    def prewarm(self, phrases):
+        """Loads phrases into memory, synthesizing those not yet on disk."""
+        for phrase in phrases:
+            self.synthesize(phrase)
+
+    def prewarm_in_background(self, phrases):
+        threading.Thread(target=self.prewarm, args=(phrases,), daemon=True).start()
+
+
+_setup_lock = threading.Lock()
+
+
+def _create_tts_cache(config):
+    try:
+        backend = BACKENDS[config.get("TTS_BACKEND", "google")]()
+    except Exception as e:
+        print(f"Error configuring TTS backend: {e}")
+        return None
+
+    return TTSCache(
+        backend,
+        folder=config.get("TTS_CACHE_FOLDER"),
+        maxsize=config.get("TTS_CACHE_MAX_ENTRIES", 256),
+        voice_name=config.get("TTS_VOICE_NAME", "en-US-Wavenet-D"),
+        language_code=config.get("TTS_LANGUAGE_CODE", "en-US"),
+        encoding=config.get("TTS_AUDIO_ENCODING", "MP3"),
+    )
+
+
+def get_tts_cache(app=None):
+    """
+    The app's TTSCache, created from its TTS_* settings on first use, so
+    processes that never speak (Celery workers, scripts) never build a TTS
+    client. None if the backend cannot be set up.
+    """
+    app = app or current_app
+    with _setup_lock:
+        if "tts_cache" not in app.extensions:
+            app.extensions["tts_cache"] = _create_tts_cache(app.config)
+        return app.extensions["tts_cache"]
+
+
+def prewarm_tts_cache(app, phrases):
+    """
+    If TTS_PREWARM is set, starts loading phrases into the app's TTS cache in
+    the background. Called by the web entrypoint only.
+    """
+    if not app.config.get("TTS_PREWARM") or not phrases:
+        return
+    cache = get_tts_cache(app)
+    if cache is not None:
+        cache.prewarm_in_background(phrases)
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+CHUNK_SIZE = 64 * 1024
+
+
+class HashingUploadFile:
+    """
+    Destination for one multipart file part. Werkzeug writes the part into it
+    chunk by chunk while parsing the request; every chunk is counted against
+    max_bytes, hashed and written straight to a temporary file on disk, so
+    the upload is never held in memory.
+    """
+
+    def __init__(self, directory, max_bytes=None):
+        os.makedirs(directory, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(
+            dir=directory, prefix="upload-", delete=False
+        )
+        self.name = self._file.name
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.moved = False
+        self._digest = hashlib.sha256()
+
+    def __getattr__(self, name):
+        # read/seek/readline/close etc. go to the underlying file.
+        if name == "_file":
+            raise AttributeError(name)
+        return getattr(self._file, name)
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_bytes and self.size > self.max_bytes:
+            self.discard()
+            raise RequestEntityTooLarge(
+                f"Uploaded file exceeds the {self.max_bytes} byte limit."
+            )
+        self._digest.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self):
+        return self._digest.hexdigest()
+
+    def move_to(self, path):
+        """Moves the spooled file to path (a rename on the same volume)."""
+        self._file.close()
+        shutil.move(self.name, path)
+        self.moved = True
+        return self.sha256
+
+    def discard(self):
+        self._file.close()
+        if not self.moved:
+            try:
+                os.unlink(self.name)
+            except FileNotFoundError:
+                pass
+
+
+class UploadRequest(Request):
+    """
+    Request class that streams file uploads to UPLOAD_TMP_FOLDER through
+    HashingUploadFile, enforcing UPLOAD_MAX_BYTES per file while reading.
+    Spooled files that the view did not save are deleted when the request
+    closes, including those of a request whose parsing was aborted (e.g. by
+    a 413) before request.files was built.
+    """
+
+    def _get_file_stream(
+        self, total_content_length, content_type, filename=None, content_length=None
+    ):
+        config = current_app.config
+        upload = HashingUploadFile(
+            config["UPLOAD_TMP_FOLDER"], max_bytes=config.get("UPLOAD_MAX_BYTES")
+        )
+        self.__dict__.setdefault("_spooled_uploads", []).append(upload)
+        return upload
+
+    def close(self):
+        for upload in self.__dict__.pop("_spooled_uploads", ()):
+            upload.discard()
+        super().close()
+
+
+def save_upload(file, path, chunk_size=CHUNK_SIZE):
+    """
+    Saves an uploaded FileStorage to path and returns the SHA-256 hex digest
+    of its bytes.
+
+    Files spooled by UploadRequest were already hashed while the request was
+    read and are moved into place; any other stream is copied in chunks.
+    """
+    if isinstance(file.stream, HashingUploadFile):
+        return file.stream.move_to(path)
+
+    max_bytes = current_app.config.get("UPLOAD_MAX_BYTES")
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "wb") as out:
+        while chunk := file.stream.read(chunk_size):
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                out.close()
+                os.unlink(path)
+                raise RequestEntityTooLarge(
+                    f"Uploaded file exceeds the {max_bytes} byte limit."
+                )
+            digest.update(chunk)
+            out.write(chunk)
+    return digest.hexdigest()
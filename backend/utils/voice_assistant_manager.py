@@ -1,20 +1,44 @@
-from datetime import datetime, timezone
-from google.cloud import texttospeech
-from google.cloud import speech
-
-from utils.ai_manager import get_query_intent
-from models import Appointment, Medication, EmergencyContact
-
-# Configure Google Cloud TTS and STT Clients
+from utils.intent_classifier import classify_intent
+from utils.tts_cache import get_tts_cache
+from utils.action_resolver import (
+    NO_APPOINTMENTS_RESPONSE,
+    NO_CONTACTS_RESPONSE,
+    NO_MEDICATIONS_RESPONSE,
+    resolve_action,
+)
+
+# Configure the Google Cloud STT client; speech is synthesized through the
+# app's TTS cache (utils.tts_cache).
 # Ensure GOOGLE_APPLICATION_CREDENTIALS environment variable is set
 try:
-    tts_client = texttospeech.TextToSpeechClient()
+    from google.cloud import speech
+
     stt_client = speech.SpeechClient()
 except Exception as e:
     print(f"Error configuring Google Cloud clients: {e}")
-    tts_client = None
     stt_client = None
 
+# The intents a senior can ask about by voice.
+VOICE_INTENTS = (
+    "get_next_appointment",
+    "get_medication_schedule",
+    "get_emergency_contacts",
+)
+
+NO_SPEECH_MESSAGE = "I didn't catch that. Could you please repeat?"
+STT_ERROR_MESSAGE = "I had trouble understanding your voice. Please try again."
+UNKNOWN_INTENT_MESSAGE = "I'm sorry, I don't understand that request. Please try asking about appointments or medications."
+
+# Fixed answers that are synthesized into the TTS cache at startup.
+FALLBACK_PHRASES = (
+    NO_SPEECH_MESSAGE,
+    STT_ERROR_MESSAGE,
+    UNKNOWN_INTENT_MESSAGE,
+    NO_APPOINTMENTS_RESPONSE,
+    NO_MEDICATIONS_RESPONSE,
+    NO_CONTACTS_RESPONSE,
+)
+
 
 def process_voice_query(audio_content: bytes, user_id: str) -> bytes:
     """Processes a voice query (audio), gets intent, fetches data, and returns audio."""
@@ -33,90 +57,29 @@ def process_voice_query(audio_content: bytes, user_id: str) -> bytes:
     try:
         stt_response = stt_client.recognize(config=config, audio=audio)
         if not stt_response.results:
-            return _generate_tts_audio("I didn't catch that. Could you please repeat?")
+            return _generate_tts_audio(NO_SPEECH_MESSAGE)
         query_text = stt_response.results[0].alternatives[0].transcript
         print(f"STT recognized: {query_text}")
     except Exception as e:
         print(f"Error during STT: {e}")
-        return _generate_tts_audio(
-            "I had trouble understanding your voice. Please try again."
-        )
+        return _generate_tts_audio(STT_ERROR_MESSAGE)
 
-    # 2. Get intent from LLM
-    intent_data = get_query_intent(query_text)
+    # 2. Get intent, locally for common phrasings and from the LLM otherwise
+    intent_data = classify_intent(query_text)
     intent = intent_data.get("intent", "unknown")
 
-    response_text = ""
-
-    if intent == "get_next_appointment":
-        now = datetime.now(timezone.utc)
-        next_appointment = (
-            Appointment.query.filter(
-                Appointment.senior_id == user_id, Appointment.date_time > now
-            )
-            .order_by(Appointment.date_time.asc())
-            .first()
-        )
-
-        if next_appointment:
-            date_str = next_appointment.date_time.strftime("%A, %B %d at %I:%M %p")
-            response_text = (
-                f"Your next appointment is on {date_str} with {next_appointment.title}."
-            )
-        else:
-            response_text = "You have no upcoming appointments."
-
-    elif intent == "get_medication_schedule":
-        now = datetime.now(timezone.utc)
-        next_medication = (
-            Medication.query.filter(
-                Medication.senior_id == user_id, Medication.time > now
-            )
-            .order_by(Medication.time.asc())
-            .first()
-        )
-
-        if next_medication:
-            time_str = next_medication.time.strftime("%I:%M %p")
-            response_text = f"You need to take {next_medication.name} at {time_str}."
-        else:
-            response_text = "You have no upcoming medications scheduled."
-
-    elif intent == "get_emergency_contacts":
-        contacts = EmergencyContact.query.filter_by(senior_id=user_id).all()
-        if contacts:
-            contact_list = ", ".join([c.name for c in contacts])
-            response_text = f"Your emergency contacts are: {contact_list}."
-        else:
-            response_text = "You have not added any emergency contacts yet."
-
+    if intent in VOICE_INTENTS:
+        response_text = resolve_action(intent, user_id)
     else:  # unknown intent
-        response_text = "I'm sorry, I don't understand that request. Please try asking about appointments or medications."
+        response_text = UNKNOWN_INTENT_MESSAGE
 
-    # 3. Convert text response to audio using Google Cloud TTS
+    # 3. Convert text response to audio, reusing cached audio for repeated answers
     return _generate_tts_audio(response_text)
 
 
 def _generate_tts_audio(text: str) -> bytes:
-    """Helper function to generate TTS audio using Google Cloud TTS."""
-    if not tts_client:
-        return b""  # Return empty bytes if TTS client not configured
-
-    synthesis_input = texttospeech.SynthesisInput(text=text)
-    voice = texttospeech.VoiceSelectionParams(
-        language_code="en-US",
-        name="en-US-Wavenet-D",  # A high-quality voice
-        ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL,
-    )
-    audio_config = texttospeech.AudioConfig(
-        audio_encoding=texttospeech.AudioEncoding.MP3
-    )
-
-    try:
-        tts_response = tts_client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
-        )
-        return tts_response.audio_content
-    except Exception as e:
-        print(f"Error during TTS: {e}")
-        return b""
+    """Returns the speech audio for text from the app's TTS cache."""
+    tts_cache = get_tts_cache()
+    if tts_cache is None:
+        return b""  # Return empty bytes if TTS is not configured
+    return tts_cache.synthesize(text)
@@ -12,7 +12,7 @@ FRONTEND_PID=$!
 # Start Celery worker
 (
   cd backend
-  poetry run celery -A celery_app worker --loglevel=info
+  poetry run celery -A celery_app worker -Q celery,notifications --loglevel=info
 ) &
 CELERY_WORKER_PID=$!
 
@@ -36,4 +36,19 @@ apiClient.interceptors.response.use(
   },
 );
 
+// List endpoints return one page at a time and put the cursor for the next
+// page in the X-Next-Cursor header; this follows it and resolves like a
+// single response holding every item.
+export async function getAllPages(url, config = {}) {
+  const data = [];
+  let cursor = null;
+  do {
+    const params = cursor ? { ...config.params, cursor } : config.params;
+    const response = await apiClient.get(url, { ...config, params });
+    data.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return { data };
+}
+
 export default apiClient;
@@ -1,8 +1,8 @@
-import apiClient from './apiClient';
+import apiClient, { getAllPages } from './apiClient';
 
 export default {
   getAppointments(params = {}) {
-    return apiClient.get('/appointments', { params });
+    return getAllPages('/appointments', { params });
   },
   addAppointment(payload) {
     return apiClient.post('/appointments', payload);
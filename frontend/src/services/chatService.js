@@ -1,20 +1,35 @@
 import axios from 'axios';
+import streamEvents from './sse';
 
 const API_URL = 'http://localhost:5001/api/chat';
 
-const sendMessage = (reportId, message) => {
-  const token = localStorage.getItem('token');
-  return axios.post(
+const authHeaders = () => ({
+  Authorization: `Bearer ${localStorage.getItem('token')}`,
+});
+
+// The conversation is kept on the server; sessionId (from a previous
+// response) makes sure the expected conversation is continued.
+const sendMessage = (reportId, message, sessionId = null) =>
+  axios.post(
     `${API_URL}/${reportId}`,
-    { message },
-    {
-      headers: {
-        Authorization: `Bearer ${token}`,
-      },
-    },
+    { message, session_id: sessionId },
+    { headers: authHeaders() },
   );
-};
+
+// Like sendMessage, but the answer arrives as events: 'session', then one
+// 'answer' ({ delta }) per piece, then 'done' ({ response, session_id }) or 'error'.
+const streamMessage = (reportId, message, sessionId, onEvent) =>
+  streamEvents(
+    `${API_URL}/${reportId}/stream`,
+    { method: 'POST', body: { message, session_id: sessionId } },
+    onEvent,
+  );
+
+const getConversation = (reportId) =>
+  axios.get(`${API_URL}/${reportId}`, { headers: authHeaders() });
 
 export default {
   sendMessage,
+  streamMessage,
+  getConversation,
 };
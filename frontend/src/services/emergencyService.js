@@ -1,4 +1,4 @@
-import apiClient from './apiClient';
+import apiClient, { getAllPages } from './apiClient';
 
 export default {
   // This new function will trigger the alert
@@ -8,7 +8,7 @@ export default {
 
   getEmergencyContacts(seniorId) {
     const url = seniorId ? `/emergency-contacts?senior_id=${seniorId}` : '/emergency-contacts';
-    return apiClient.get(url);
+    return getAllPages(url);
   },
 
   addEmergencyContact(contactData, seniorId) {
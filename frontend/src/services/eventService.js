@@ -1,8 +1,8 @@
-import apiClient from './apiClient';
+import apiClient, { getAllPages } from './apiClient';
 
 export default {
   getEvents() {
-    return apiClient.get('/events');
+    return getAllPages('/events');
   },
   getAEvent(event_id) {
     return apiClient.get(`/events/${event_id}`);
@@ -1,9 +1,9 @@
-import apiClient from './apiClient';
+import apiClient, { getAllPages } from './apiClient';
 
 export default {
   getMedications(seniorId) {
     const url = seniorId ? `/medications?senior_id=${seniorId}` : '/medications';
-    return apiClient.get(url);
+    return getAllPages(url);
   },
   addMedication(medicationData, seniorId) {
     const url = seniorId ? `/medications?senior_id=${seniorId}` : '/medications';
@@ -17,4 +17,19 @@ export default {
     const url = seniorId ? `/medications/${id}?senior_id=${seniorId}` : `/medications/${id}`;
     return apiClient.delete(url);
   },
+  getMedicationSchedules(seniorId) {
+    const url = seniorId ? `/medications/schedules?senior_id=${seniorId}` : '/medications/schedules';
+    return apiClient.get(url);
+  },
+  // scheduleData: { name, dosage, rrule: 'FREQ=DAILY;BYHOUR=8,20;COUNT=60', start }
+  addMedicationSchedule(scheduleData, seniorId) {
+    const url = seniorId ? `/medications/schedules?senior_id=${seniorId}` : '/medications/schedules';
+    return apiClient.post(url, scheduleData);
+  },
+  stopMedicationSchedule(id, seniorId) {
+    const url = seniorId
+      ? `/medications/schedules/${id}?senior_id=${seniorId}`
+      : `/medications/schedules/${id}`;
+    return apiClient.delete(url);
+  },
 };
@@ -1,8 +1,8 @@
-import apiClient from './apiClient';
+import apiClient, { getAllPages } from './apiClient';
 
 export default {
   getProviders() {
-    return apiClient.get('/providers');
+    return getAllPages('/providers');
   },
   addProvider(providerData) {
     return apiClient.post('/providers', providerData);
@@ -14,7 +14,7 @@ export default {
     return apiClient.delete(`/providers/${id}`);
   },
   getEvents() {
-    return apiClient.get('/events');
+    return getAllPages('/events');
   },
   addEvent(eventData) {
     return apiClient.post('/events', eventData);
@@ -1,4 +1,5 @@
 import axios from 'axios';
+import streamEvents from './sse';
 
 const API_URL = 'http://localhost:5001/api/reports';
 
@@ -16,6 +17,21 @@ const uploadReport = (file) => {
   });
 };
 
+const getReport = (reportId) => {
+  const token = localStorage.getItem('token');
+
+  return axios.get(`${API_URL}/${reportId}`, {
+    headers: {
+      Authorization: `Bearer ${token}`,
+    },
+  });
+};
+
+// Streams a report's summary while it is generated: onEvent('summary', { delta })
+// for each new piece, then onEvent('status', { report_id, status }).
+const streamReport = (reportId, onEvent) =>
+  streamEvents(`${API_URL}/${reportId}/stream`, {}, onEvent);
+
 const downloadReport = (reportId, format = 'pdf') => {
   const token = localStorage.getItem('token');
   let url = `${API_URL}/${reportId}/download`;
@@ -36,5 +52,7 @@ const downloadReport = (reportId, format = 'pdf') => {
 
 export default {
   uploadReport,
+  getReport,
+  streamReport,
   downloadReport,
 };
@@ -1,9 +1,9 @@
-import apiClient from './apiClient';
+import { getAllPages } from './apiClient';
 
 export default {
   async getSocialHubStats() {
     try {
-      const eventsResponse = await apiClient.get('/events');
+      const eventsResponse = await getAllPages('/events');
       const events = eventsResponse.data || [];
 
       const now = new Date();
@@ -0,0 +1,42 @@
+// Reads a Server-Sent Events response with fetch, so that POST bodies and the
+// Authorization header can be used (EventSource supports neither). Calls
+// onEvent(event, data) for each event as it arrives and resolves when the
+// stream ends.
+const streamEvents = async (url, { method = 'GET', body } = {}, onEvent) => {
+  const response = await fetch(url, {
+    method,
+    headers: {
+      Authorization: `Bearer ${localStorage.getItem('token')}`,
+      ...(body ? { 'Content-Type': 'application/json' } : {}),
+    },
+    body: body ? JSON.stringify(body) : undefined,
+  });
+  if (!response.ok) {
+    const error = new Error(`Request failed with status ${response.status}`);
+    error.response = { status: response.status, data: await response.json().catch(() => ({})) };
+    throw error;
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+};
+
+export default streamEvents;